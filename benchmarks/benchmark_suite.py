@@ -0,0 +1,406 @@
+"""
+End-to-end benchmarks of the agent's capabilities against a large,
+synthetic ProjectContext, recorded to a JSON file comparable across runs.
+
+    PYTHONPATH=src python benchmarks/benchmark_suite.py --entries 10000 \
+        --output results.json
+    PYTHONPATH=src python benchmarks/benchmark_suite.py --entries 10000 \
+        --output new.json --compare results.json
+
+The context is data/sample_project_context.json grown to ``--entries`` key
+modules, coding standards and requirements (see synthetic_context.py), and
+validated code is a generated module of ``--file-lines`` lines. Each case
+reports latency percentiles over ``--iterations`` sequential calls,
+throughput with each ``--concurrency`` level of concurrent callers, and the
+peak memory allocated while it runs (tracemalloc, in a separate pass).
+
+With ``--backend mock`` (the default) capabilities use LLMInterface's mock
+responses, so the agent's own cost (context packing, static checks,
+response building) is measured; ``--backend stub`` sends model calls to a
+local StubModelServer answering after ``--stub-latency`` seconds.
+Proactive suggestions are measured per change batch, through
+ChangePipeline.process() on a temporary repository of generated files.
+
+With ``--compare``, cases whose p50/p99 latency grew, or whose throughput
+fell, by more than ``--threshold`` are reported and the exit status is 1.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from manager_agent.change_pipeline import ChangePipeline
+from manager_agent.context_manager import (
+    DEFAULT_CONTEXT_PATH,
+    ContextManager,
+    ProjectContext,
+    load_context_file,
+)
+from manager_agent.file_watcher import ChangeBatch, PollingWatcher
+from manager_agent.llm_backends import HTTPLLMBackend
+from manager_agent.llm_interface import LLMInterface
+from manager_agent.repo_scanner import RepositoryScanner
+from manager_agent.stub_model_server import StubModelServer
+from manager_agent.synthetic_context import (
+    scale_context,
+    synthetic_files,
+    synthetic_source,
+)
+
+PROJECT_ID = "benchmark"
+
+
+class Case(NamedTuple):
+    name: str
+    # Runs one call; the argument is a call number, unique within the run.
+    call: Callable[[int], Awaitable[Any]]
+    # Whether throughput under concurrency is meaningful (not CPU-bound).
+    concurrent: bool = True
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values))))
+    return sorted_values[index]
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    ordered = sorted(seconds)
+    return {
+        "p50": percentile(ordered, 0.50) * 1e3,
+        "p90": percentile(ordered, 0.90) * 1e3,
+        "p99": percentile(ordered, 0.99) * 1e3,
+        "mean": statistics.fmean(ordered) * 1e3,
+        "min": ordered[0] * 1e3,
+        "max": ordered[-1] * 1e3,
+    }
+
+
+async def measure_latency(
+    case: Case, calls: "itertools.count[int]", n: int
+) -> List[float]:
+    seconds = []
+    for _ in range(n):
+        started = time.perf_counter()
+        await case.call(next(calls))
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+async def measure_throughput(
+    case: Case, calls: "itertools.count[int]", total: int, concurrency: int
+) -> float:
+    """Calls per second with ``concurrency`` callers sharing ``total`` calls."""
+    remaining = iter(range(total))
+
+    async def caller() -> None:
+        for _ in remaining:
+            await case.call(next(calls))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+async def measure_peak_memory(case: Case, calls: "itertools.count[int]", n: int) -> int:
+    """Peak bytes allocated above the starting point during ``n`` calls."""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(n):
+            await case.call(next(calls))
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def varied_code(source: str, call: int) -> str:
+    # A distinct comment per call keeps the validation cache from answering.
+    return f"{source}\n# benchmark call {call}\n"
+
+
+async def build_cases(
+    args: argparse.Namespace,
+    context: ProjectContext,
+    context_path: str,
+    repository: str,
+    llm: LLMInterface,
+) -> List[Case]:
+    context_json = context.model_dump_json()
+    context_data = json.loads(context_json)
+    source = synthetic_source(args.file_lines, args.seed)
+    modules = context.key_modules
+
+    async def load(call: int) -> None:
+        load_context_file(context_path)
+
+    async def validate(call: int) -> None:
+        ProjectContext.model_validate(context_data)
+
+    async def serialize(call: int) -> None:
+        context.model_dump_json()
+
+    async def validate_code(call: int) -> None:
+        module = modules[call % len(modules)]
+        await llm.analyze_code_for_validation(
+            varied_code(source, call), module.path or "module.py", context
+        )
+
+    async def validate_code_cached(call: int) -> None:
+        await llm.analyze_code_for_validation(source, "cached.py", context)
+
+    async def advice(call: int) -> None:
+        module = modules[call % len(modules)]
+        await llm.generate_advice(
+            f"How should {module.name} handle retries? (call {call})",
+            context,
+            current_file_path=module.path,
+        )
+
+    async def task_context(call: int) -> None:
+        module = modules[call % len(modules)]
+        await llm.generate_task_starting_context(
+            f"Add pagination to {module.name} (call {call})",
+            module.path or "module.py",
+            context,
+        )
+
+    context_manager = ContextManager(context_path)
+    scanner = RepositoryScanner(repository, max_workers=0)
+    paths = sorted((await asyncio.to_thread(scanner.scan)).files)
+    pipeline = ChangePipeline(
+        PollingWatcher(repository),
+        scanner,
+        llm,
+        context_manager,
+        PROJECT_ID,
+        analyses_per_second=1e9,
+        analysis_burst=1 << 30,
+    )
+
+    async def proactive(call: int) -> None:
+        path = paths[call % len(paths)]
+        with open(os.path.join(repository, path), "a", encoding="utf-8") as file:
+            file.write(f"\n\ndef added_{call}():\n    return {call}\n")
+        batch = ChangeBatch(frozenset([path]), frozenset())
+        async for _ in pipeline.process(batch):
+            pass
+
+    return [
+        Case("context.load", load, concurrent=False),
+        Case("context.validate", validate, concurrent=False),
+        Case("context.serialize", serialize, concurrent=False),
+        Case("validate_code", validate_code),
+        Case("validate_code.cached", validate_code_cached),
+        Case("generate_advice", advice),
+        Case("generate_task_starting_context", task_context),
+        Case("proactive_suggestions.batch", proactive),
+    ]
+
+
+async def run_case(case: Case, args: argparse.Namespace) -> Dict[str, Any]:
+    calls = itertools.count()
+    for _ in range(args.warmup):
+        await case.call(next(calls))
+    result: Dict[str, Any] = {
+        "latency_ms": latency_summary(
+            await measure_latency(case, calls, args.iterations)
+        )
+    }
+    if case.concurrent:
+        result["throughput_per_second"] = {
+            str(level): await measure_throughput(case, calls, args.iterations, level)
+            for level in args.concurrency
+        }
+    result["peak_memory_bytes"] = await measure_peak_memory(
+        case, calls, args.memory_iterations
+    )
+    return result
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    started = time.perf_counter()
+    context = scale_context(
+        load_context_file(args.base_context),
+        modules=args.modules or args.entries,
+        standards=args.standards or args.entries,
+        requirements=args.requirements or args.entries,
+        file_annotations=args.annotations,
+        seed=args.seed,
+    )
+    generation_seconds = time.perf_counter() - started
+
+    server: Optional[StubModelServer] = None
+    backend = None
+    if args.backend == "stub":
+        server = StubModelServer(latency_seconds=args.stub_latency, seed=args.seed)
+        backend = HTTPLLMBackend(await server.start())
+
+    cases: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as workspace:
+        context_path = os.path.join(workspace, "context.json")
+        with open(context_path, "w", encoding="utf-8") as context_file:
+            context_file.write(context.model_dump_json())
+        repository = os.path.join(workspace, "repository")
+        for path, source in synthetic_files(
+            args.repository_files, args.file_lines, args.seed
+        ):
+            os.makedirs(os.path.dirname(os.path.join(repository, path)), exist_ok=True)
+            with open(os.path.join(repository, path), "w", encoding="utf-8") as file:
+                file.write(source)
+
+        llm = LLMInterface(backend=backend)
+        try:
+            for case in await build_cases(args, context, context_path, repository, llm):
+                if args.only and not any(name in case.name for name in args.only):
+                    continue
+                print(f"running {case.name} ...", file=sys.stderr)
+                cases[case.name] = await run_case(case, args)
+        finally:
+            await llm.close()
+            if server is not None:
+                await server.stop()
+        context_bytes = os.path.getsize(context_path)
+
+    return {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parameters": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("output", "compare")
+            },
+            "context": {
+                "key_modules": len(context.key_modules),
+                "coding_standards": len(context.coding_standards),
+                "requirements": len(context.requirements),
+                "file_annotations": len(context.file_annotations),
+                "json_bytes": context_bytes,
+                "generation_seconds": generation_seconds,
+            },
+        },
+        "cases": cases,
+    }
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    context = results["metadata"]["context"]
+    print(
+        f"{context['key_modules']:,} modules, "
+        f"{context['coding_standards']:,} standards, "
+        f"{context['requirements']:,} requirements "
+        f"({context['json_bytes'] / 1e6:,.1f} MB of JSON)"
+    )
+    levels = results["metadata"]["parameters"]["concurrency"]
+    header = f"{'case':<32}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'peak MB':>9}"
+    print(header + "".join(f"{f'x{level}/s':>10}" for level in levels))
+    for name, case in results["cases"].items():
+        latency = case["latency_ms"]
+        throughput = case.get("throughput_per_second", {})
+        print(
+            f"{name:<32}{latency['p50']:>10,.2f}{latency['p90']:>10,.2f}"
+            f"{latency['p99']:>10,.2f}{case['peak_memory_bytes'] / 1e6:>9,.1f}"
+            + "".join(
+                (
+                    f"{throughput[str(level)]:>10,.0f}"
+                    if str(level) in throughput
+                    else f"{'-':>10}"
+                )
+                for level in levels
+            )
+        )
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Regressions of ``results`` against ``baseline`` beyond ``threshold``."""
+    regressions = []
+    print(f"\n{'case':<32}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, case in results["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if before is None:
+            continue
+        metrics = [
+            (f"{metric} ms", before["latency_ms"][metric], case["latency_ms"][metric])
+            for metric in ("p50", "p99")
+        ]
+        metrics += [
+            (f"x{level}/s", before_rate, case["throughput_per_second"][level])
+            for level, before_rate in before.get("throughput_per_second", {}).items()
+            if level in case.get("throughput_per_second", {})
+        ]
+        for metric, old, new in metrics:
+            if not old:
+                continue
+            change = new / old - 1
+            # Latency regresses upwards, throughput downwards.
+            worse = -change if metric.endswith("/s") else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            print(
+                f"{name:<32}{metric:<16}{old:>12,.2f}{new:>12,.2f}"
+                f"{change:>+9.0%}{flag}"
+            )
+            if flag:
+                regressions.append(f"{name} {metric}: {old:,.2f} -> {new:,.2f}")
+    return regressions
+
+
+def parse_levels(text: str) -> List[int]:
+    return [int(level) for level in text.split(",") if level.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--modules", type=int, help="Defaults to --entries.")
+    parser.add_argument("--standards", type=int, help="Defaults to --entries.")
+    parser.add_argument("--requirements", type=int, help="Defaults to --entries.")
+    parser.add_argument("--annotations", type=int, default=1000)
+    parser.add_argument("--base-context", default=DEFAULT_CONTEXT_PATH)
+    parser.add_argument("--file-lines", type=int, default=200)
+    parser.add_argument("--repository-files", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--memory-iterations", type=int, default=3)
+    parser.add_argument("--concurrency", type=parse_levels, default=[1, 8, 32])
+    parser.add_argument("--backend", choices=["mock", "stub"], default="mock")
+    parser.add_argument("--stub-latency", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--only", action="append", help="Run cases whose name contains this."
+    )
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline results JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Compares ContextLookup indexes with the list scans they replace.
+
+    PYTHONPATH=src python benchmarks/context_lookup_bench.py --entries 10000
+
+For each lookup, reports the mean time of a linear scan over the context's
+lists and of the indexed lookup, plus the cost of building the indexes from
+scratch and of deriving them incrementally after one update.
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List, Optional
+
+from manager_agent.context_lookup import ContextLookup, module_prefix, path_parts
+from manager_agent.context_manager import (
+    CodingStandard,
+    KeyModule,
+    ProjectContext,
+    ProjectRequirement,
+    apply_update,
+)
+from manager_agent.enums import UpdateTypeEnum
+from manager_agent.models import UpdateManagerContextRequest
+
+CATEGORIES = ["Formatting", "Naming", "Security", "Testing", "Docs"]
+PRIORITIES = ["high", "medium", "low"]
+
+
+def make_context(entries: int, rng: random.Random) -> ProjectContext:
+    modules = [
+        KeyModule(
+            name=f"module_{i}",
+            description=f"Module {i}",
+            path=(
+                f"src/pkg_{i % 100}/sub_{i}/"
+                if i % 2
+                else f"src/pkg_{i % 100}/m_{i}.py"
+            ),
+        )
+        for i in range(entries)
+    ]
+    standards = [
+        CodingStandard(
+            id=f"CS-{i:05d}",
+            description=f"Standard {i}",
+            category=rng.choice(CATEGORIES),
+        )
+        for i in range(entries)
+    ]
+    requirements = [
+        ProjectRequirement(
+            id=f"REQ-{i:05d}",
+            description=f"Requirement {i}",
+            priority=rng.choice(PRIORITIES),
+        )
+        for i in range(entries)
+    ]
+    return ProjectContext(
+        project_name="benchmark",
+        key_modules=modules,
+        coding_standards=standards,
+        requirements=requirements,
+    )
+
+
+def scan_module_for_path(
+    context: ProjectContext, file_path: str
+) -> Optional[KeyModule]:
+    parts = path_parts(file_path)
+    best: Optional[KeyModule] = None
+    best_depth = -1
+    for module in context.key_modules:
+        if not module.path:
+            continue
+        if path_parts(module.path) == parts:
+            return module
+        prefix = module_prefix(module.path)
+        if prefix and parts[: len(prefix)] == prefix and len(prefix) > best_depth:
+            best, best_depth = module, len(prefix)
+    return best
+
+
+def timed(function: Callable[[], object], repeat: int) -> float:
+    """Mean seconds per call."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    context = make_context(args.entries, rng)
+    build = timed(lambda: ContextLookup(context), 5)
+    lookup = ContextLookup(context)
+
+    n = args.entries
+    file_path = f"src/pkg_{(n - 1) % 100}/sub_{n - 1}/deep/file.py"
+    name, standard_id, requirement_id = (
+        f"module_{n - 1}",
+        f"CS-{n - 1:05d}",
+        f"REQ-{n - 1:05d}",
+    )
+    cases = [
+        (
+            "module owning a path",
+            lambda: scan_module_for_path(context, file_path),
+            lambda: lookup.module_for_path(file_path),
+        ),
+        (
+            "module by name",
+            lambda: next(m for m in context.key_modules if m.name == name),
+            lambda: lookup.module(name),
+        ),
+        (
+            "standard by id",
+            lambda: next(s for s in context.coding_standards if s.id == standard_id),
+            lambda: lookup.standard(standard_id),
+        ),
+        (
+            "standards by category",
+            lambda: [s for s in context.coding_standards if s.category == "Security"],
+            lambda: lookup.standards_in_category("Security"),
+        ),
+        (
+            "requirement by id",
+            lambda: next(r for r in context.requirements if r.id == requirement_id),
+            lambda: lookup.requirement(requirement_id),
+        ),
+        (
+            "requirements by priority",
+            lambda: [r for r in context.requirements if r.priority == "high"],
+            lambda: lookup.requirements_with_priority("high"),
+        ),
+    ]
+
+    rows: List[List[str]] = []
+    for label, scan, indexed in cases:
+        assert scan() == indexed(), label
+        scan_seconds = timed(scan, args.repeat)
+        indexed_seconds = timed(indexed, args.repeat)
+        rows.append(
+            [
+                label,
+                f"{scan_seconds * 1e6:,.1f}",
+                f"{indexed_seconds * 1e6:,.1f}",
+                f"{scan_seconds / indexed_seconds:,.0f}x",
+            ]
+        )
+
+    update = UpdateManagerContextRequest(
+        update_type=UpdateTypeEnum.NEW_DEPENDENCY,
+        summary=f"module_{n // 2}",
+        details_uri_or_text="moved",
+        relevant_file_paths=["lib/moved/"],
+    )
+    updated = apply_update(context, update, "update-benchmark")
+    derive = timed(lambda: lookup.derive(updated), 20)
+
+    print(f"{args.entries:,} entries per list")
+    print(f"{'lookup':<26}{'scan (us)':>14}{'indexed (us)':>14}{'speedup':>10}")
+    for label, scan_us, indexed_us, speedup in rows:
+        print(f"{label:<26}{scan_us:>14}{indexed_us:>14}{speedup:>10}")
+    print(f"{'build indexes':<26}{build * 1e3:>13,.1f}ms")
+    print(f"{'derive after an update':<26}{derive * 1e3:>13,.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Compares encoding MCP responses with model_dump_json() each time they are
+sent against ResponseEncoder, and JSON against MessagePack.
+
+    PYTHONPATH=src python benchmarks/serialization_bench.py --subscribers 100
+
+Cases: re-sending a cached validation response and fanning one suggestion
+out to every subscriber. Also reports encoded sizes, and the cost of
+constructing responses with validation versus model_construct().
+"""
+
+import argparse
+import functools
+import time
+from typing import Callable, List
+
+from manager_agent.enums import (
+    EncodingEnum,
+    PriorityEnum,
+    SeverityEnum,
+    StatusEnum,
+    SuggestionTypeEnum,
+)
+from manager_agent.models import (
+    LineRange,
+    ProactiveSuggestionItem,
+    ValidateCodeResponse,
+    ValidationFeedbackItem,
+)
+from manager_agent.serialization import ResponseEncoder, encode, msgpack_available
+
+
+def timed(function: Callable[[], object], repeat: int) -> float:
+    """Mean seconds per call."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat
+
+
+def feedback_item(index: int) -> ValidationFeedbackItem:
+    return ValidationFeedbackItem(
+        item_id=f"static-line-length-L{index}",
+        severity=SeverityEnum.WARNING,
+        message=f"[CS-001] Line {index} is too long (93 > 79 characters).",
+        file_path="src/service/orders.py",
+        line_range=LineRange(start_line=index, end_line=index),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--feedback-items", type=int, default=20)
+    parser.add_argument("--references", type=int, default=5)
+    parser.add_argument("--subscribers", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    items = [feedback_item(i) for i in range(args.feedback_items)]
+    validation = ValidateCodeResponse(
+        validation_id="val-1", status=StatusEnum.NEEDS_REVISION, feedback_items=items
+    )
+    suggestion = ProactiveSuggestionItem(
+        suggestion_id="sug-1",
+        type=SuggestionTypeEnum.POTENTIAL_BUG,
+        message="[CS-004] Compare to None with 'is', not '=='.",
+        file_path="src/service/orders.py",
+        line_range=LineRange(start_line=12, end_line=12),
+        priority=PriorityEnum.HIGH,
+    )
+
+    encoder = ResponseEncoder()
+    rows: List[List[str]] = []
+
+    def compare(
+        label: str, current: Callable[[], object], fast: Callable[[], object]
+    ) -> None:
+        current_seconds = timed(current, args.repeat)
+        fast_seconds = timed(fast, args.repeat)
+        rows.append(
+            [
+                label,
+                f"{current_seconds * 1e6:,.2f}",
+                f"{fast_seconds * 1e6:,.2f}",
+                f"{current_seconds / fast_seconds:,.1f}x",
+            ]
+        )
+
+    compare(
+        "cached validation re-sent",
+        lambda: validation.model_dump_json(),
+        lambda: encoder.encode(validation),
+    )
+
+    def fan_out_current() -> object:
+        item = suggestion.model_copy()
+        return [item.model_dump_json() for _ in range(args.subscribers)]
+
+    def fan_out_fast() -> object:
+        item = suggestion.model_copy()
+        return [encoder.encode(item) for _ in range(args.subscribers)]
+
+    compare(f"suggestion to {args.subscribers} subs", fan_out_current, fan_out_fast)
+
+    print(f"{'encoding':<30}{'current (us)':>14}{'encoder (us)':>14}{'speedup':>10}")
+    for label, current_us, fast_us, speedup in rows:
+        print(f"{label:<30}{current_us:>14}{fast_us:>14}{speedup:>10}")
+
+    print(
+        f"\n{'payload':<22}{'JSON B':>9}{'msgpack B':>11}"
+        f"{'JSON us':>10}{'msgpack us':>12}"
+    )
+    for label, model in [
+        ("validation response", validation),
+        ("suggestion", suggestion),
+    ]:
+        packed_size = packed_us = "n/a"
+        if msgpack_available():
+            packed = functools.partial(encode, model, EncodingEnum.MSGPACK)
+            packed_size = f"{len(packed()):,}"
+            packed_us = f"{timed(packed, args.repeat) * 1e6:,.2f}"
+        plain = functools.partial(encode, model)
+        print(
+            f"{label:<22}{len(plain()):>9,}{packed_size:>11}"
+            f"{timed(plain, args.repeat) * 1e6:>10,.2f}{packed_us:>12}"
+        )
+
+    fields = {
+        "item_id": "static-line-length-L1",
+        "severity": SeverityEnum.WARNING,
+        "message": "[CS-001] Line 1 is too long (93 > 79 characters).",
+        "file_path": "src/service/orders.py",
+        "line_range": LineRange(start_line=1, end_line=1),
+    }
+    validated = timed(lambda: ValidationFeedbackItem(**fields), args.repeat)
+    constructed = timed(
+        lambda: ValidationFeedbackItem.model_construct(**fields), args.repeat
+    )
+    print(
+        f"\nfeedback item construction: validated {validated * 1e6:,.2f} us, "
+        f"model_construct {constructed * 1e6:,.2f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Compares routing suggestions to subscribers by evaluating FilterPreferences
+directly with compiled filters, per subscriber and grouped.
+
+    PYTHONPATH=src python benchmarks/subscription_filter_bench.py --subscribers 5000
+
+For each strategy, reports the mean time to find every subscriber accepting
+one suggestion, and its speedup over the direct evaluation.
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+from manager_agent.enums import PriorityEnum, SuggestionTypeEnum
+from manager_agent.models import FilterPreferences, ProactiveSuggestionItem
+from manager_agent.subscription_filters import (
+    PRIORITY_RANK,
+    TYPE_BITS,
+    FilterGroups,
+    compile_filters,
+    matches_filters,
+)
+
+TYPES = list(SuggestionTypeEnum)
+PRIORITIES = list(PriorityEnum)
+
+
+def random_filters(rng: random.Random) -> Optional[FilterPreferences]:
+    if rng.random() < 0.1:
+        return None
+    return FilterPreferences(
+        min_priority=rng.choice([None, *PRIORITIES]),
+        types_to_include=(
+            None if rng.random() < 0.3 else rng.sample(TYPES, rng.randint(1, 3))
+        ),
+    )
+
+
+def random_item(index: int, rng: random.Random) -> ProactiveSuggestionItem:
+    return ProactiveSuggestionItem(
+        suggestion_id=f"sug-{index}",
+        type=rng.choice(TYPES),
+        message="Benchmark suggestion",
+        priority=rng.choice(PRIORITIES),
+    )
+
+
+def timed(function: Callable[[ProactiveSuggestionItem], int], items) -> float:
+    """Mean seconds per item."""
+    started = time.perf_counter()
+    for item in items:
+        function(item)
+    return (time.perf_counter() - started) / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    subscribers: List[Tuple[str, Optional[FilterPreferences]]] = [
+        (f"sub-{i}", random_filters(rng)) for i in range(args.subscribers)
+    ]
+    items = [random_item(i, rng) for i in range(args.items)]
+    compiled = [(key, compile_filters(filters)) for key, filters in subscribers]
+    groups: FilterGroups[str] = FilterGroups()
+    for key, compiled_filter in compiled:
+        groups.add(key, compiled_filter, key)
+
+    def direct(item: ProactiveSuggestionItem) -> int:
+        return sum(1 for _, filters in subscribers if matches_filters(filters, item))
+
+    def per_subscriber(item: ProactiveSuggestionItem) -> int:
+        type_bit, rank = TYPE_BITS[item.type], PRIORITY_RANK[item.priority]
+        return sum(
+            1
+            for _, (type_mask, min_rank) in compiled
+            if type_mask & type_bit and rank >= min_rank
+        )
+
+    def grouped(item: ProactiveSuggestionItem) -> int:
+        return sum(len(members) for members in groups.route(item))
+
+    for item in items:
+        assert direct(item) == per_subscriber(item) == grouped(item)
+
+    baseline = timed(direct, items)
+    print(
+        f"{args.subscribers:,} subscribers, {groups.group_count} distinct filters, "
+        f"{args.items:,} suggestions"
+    )
+    print(f"{'strategy':<26}{'per item (us)':>16}{'speedup':>10}")
+    for label, function in [
+        ("direct evaluation", direct),
+        ("compiled, per subscriber", per_subscriber),
+        ("compiled, grouped", grouped),
+    ]:
+        seconds = timed(function, items)
+        print(f"{label:<26}{seconds * 1e6:>16,.1f}{baseline / seconds:>9,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
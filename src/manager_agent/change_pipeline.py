@@ -0,0 +1,289 @@
+import asyncio
+import os
+import uuid
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from .context_manager import ContextManager, ProjectContext, new_update_id
+from .enums import PriorityEnum, SeverityEnum, SuggestionTypeEnum
+from .file_watcher import ChangeBatch, FileWatcher
+from .incremental_validation import IncrementalValidator
+from .llm_interface import LLMInterface
+from .models import (
+    LineRange,
+    ProactiveSuggestionItem,
+    ValidateCodeRequest,
+    ValidateCodeResponse,
+)
+from .project_registry import ProjectRegistry
+from .repo_scanner import ModuleSummary, RepositoryScanner, ScanResult
+from .resilience import RateLimiter
+from .update_queue import UpdateQueue
+
+# Suggestion priority and type for each validation feedback severity.
+_FEEDBACK_SUGGESTIONS: Dict[SeverityEnum, Tuple[PriorityEnum, SuggestionTypeEnum]] = {
+    SeverityEnum.ERROR: (PriorityEnum.HIGH, SuggestionTypeEnum.POTENTIAL_BUG),
+    SeverityEnum.WARNING: (PriorityEnum.MEDIUM, SuggestionTypeEnum.POTENTIAL_BUG),
+    SeverityEnum.SUGGESTION: (
+        PriorityEnum.LOW,
+        SuggestionTypeEnum.REFACTORING_OPPORTUNITY,
+    ),
+    SeverityEnum.INFO: (PriorityEnum.LOW, SuggestionTypeEnum.BEST_PRACTICE_TIP),
+}
+
+
+def new_suggestion_id() -> str:
+    return f"sug-{uuid.uuid4().hex[:12]}"
+
+
+def suggestions_from_validation(
+    response: ValidateCodeResponse,
+) -> List[ProactiveSuggestionItem]:
+    """One ProactiveSuggestionItem per validation feedback item."""
+    suggestions = []
+    for item in response.feedback_items:
+        priority, suggestion_type = _FEEDBACK_SUGGESTIONS[item.severity]
+        suggestions.append(
+            ProactiveSuggestionItem(
+                suggestion_id=new_suggestion_id(),
+                type=suggestion_type,
+                message=item.message,
+                file_path=item.file_path,
+                line_range=item.line_range,
+                priority=priority,
+                supporting_context_snippets=(
+                    [item.suggested_code_fix] if item.suggested_code_fix else None
+                ),
+            )
+        )
+    return suggestions
+
+
+def documentation_reminders(
+    summary: ModuleSummary, previous: Optional[ModuleSummary]
+) -> List[ProactiveSuggestionItem]:
+    """
+    Reminders for public classes and functions that are new in ``summary``
+    (absent from ``previous``) and have no docstring.
+    """
+    known = {symbol.name for symbol in previous.symbols} if previous else set()
+    return [
+        ProactiveSuggestionItem(
+            suggestion_id=new_suggestion_id(),
+            type=SuggestionTypeEnum.DOCUMENTATION_REMINDER,
+            message=f"New public {symbol.kind} '{symbol.name}' has no docstring.",
+            file_path=summary.path,
+            line_range=LineRange(start_line=symbol.line, end_line=symbol.line),
+            priority=PriorityEnum.LOW,
+        )
+        for symbol in summary.symbols
+        if symbol.name not in known and not symbol.docstring
+    ]
+
+
+class ChangePipelineStats(BaseModel):
+    """Point-in-time counters of a ChangePipeline."""
+
+    batches: int = Field(0, description="Change batches processed.")
+    files_changed: int = Field(0, description="Changed files reported.")
+    files_deleted: int = Field(0, description="Deleted files reported.")
+    overflows: int = Field(0, description="Batches that lost events.")
+    context_updates: int = Field(0, description="Module updates submitted.")
+    analyzed: int = Field(0, description="Files sent through analysis.")
+    skipped: int = Field(0, description="Changed files left unanalyzed.")
+    failed: int = Field(0, description="Analyses that raised.")
+    suggestions: int = Field(0, description="Suggestions yielded.")
+
+
+class ChangePipeline:
+    """
+    Turns file changes into context updates and proactive suggestions.
+    For every debounced ChangeBatch from ``watcher``:
+
+    1. The scanner re-reads only the changed files, and the KeyModules of
+       their directories are updated as SOURCE_SCAN updates, through
+       ``update_queue`` when given (so they coalesce with other writes).
+       A batch that lost events triggers a full incremental scan instead.
+    2. Cached validation results for the changed files are dropped, as is
+       the incremental validator's baseline for deleted files.
+    3. New undocumented public symbols yield DOCUMENTATION_REMINDERs.
+    4. Changed files are validated against the updated context and the
+       feedback is yielded as suggestions. Files are analyzed most
+       recently modified first, at most ``max_files_per_batch`` per batch
+       (a branch switch touching thousands of files analyzes only the
+       newest), ``analysis_concurrency`` at a time and no more than
+       ``analyses_per_second`` (bursts of ``analysis_burst``) overall.
+    """
+
+    def __init__(
+        self,
+        watcher: FileWatcher,
+        scanner: RepositoryScanner,
+        llm_interface: LLMInterface,
+        context_manager: Union[ContextManager, ProjectRegistry],
+        project_id: str,
+        update_queue: Optional[UpdateQueue] = None,
+        incremental_validator: Optional[IncrementalValidator] = None,
+        max_files_per_batch: int = 16,
+        analysis_concurrency: int = 4,
+        analyses_per_second: float = 2.0,
+        analysis_burst: int = 4,
+        max_file_bytes: int = 256 * 1024,
+    ):
+        if max_files_per_batch < 0:
+            raise ValueError("max_files_per_batch must be >= 0")
+        if analysis_concurrency < 1:
+            raise ValueError("analysis_concurrency must be >= 1")
+        self.watcher = watcher
+        self.scanner = scanner
+        self.llm_interface = llm_interface
+        self.context_manager = context_manager
+        self.project_id = project_id
+        self.update_queue = update_queue
+        self.incremental_validator = incremental_validator
+        self.max_files_per_batch = max_files_per_batch
+        self.analysis_concurrency = analysis_concurrency
+        # Larger files are not sent through analysis.
+        self.max_file_bytes = max_file_bytes
+        self.rate_limiter = RateLimiter(analyses_per_second, analysis_burst)
+        self._stats = ChangePipelineStats()
+
+    async def suggestions(self) -> AsyncIterator[ProactiveSuggestionItem]:
+        """Processes batches from the watcher until it is closed."""
+        async for batch in self.watcher.batches():
+            async for suggestion in self.process(batch):
+                yield suggestion
+
+    async def process(
+        self, batch: ChangeBatch
+    ) -> AsyncIterator[ProactiveSuggestionItem]:
+        """Refreshes the context for one batch and yields its suggestions."""
+        self._stats.batches += 1
+        self._stats.files_changed += len(batch.changed)
+        self._stats.files_deleted += len(batch.deleted)
+        self._stats.overflows += batch.overflow
+
+        previous = {path: self.scanner.summary(path) for path in batch.changed}
+        if batch.overflow:
+            result = await asyncio.to_thread(self.scanner.scan)
+        else:
+            result = await asyncio.to_thread(self.scanner.refresh, batch.paths)
+        await self._update_context(result)
+        self._invalidate(batch)
+
+        for path in sorted(batch.changed & result.files.keys()):
+            for suggestion in documentation_reminders(
+                result.files[path], previous.get(path)
+            ):
+                self._stats.suggestions += 1
+                yield suggestion
+
+        # After lost events, any scanned file may have changed.
+        analyzable = (
+            list(result.files)
+            if batch.overflow
+            else [path for path in batch.changed if path in result.files]
+        )
+        files = await asyncio.to_thread(self.prioritize, analyzable)
+        self._stats.skipped += len(analyzable) - len(files)
+        if files:
+            project_context = (
+                await self.context_manager.get_version(self.project_id)
+            ).context
+            async for suggestion in self._analyze(files, project_context):
+                self._stats.suggestions += 1
+                yield suggestion
+
+    def prioritize(self, paths: Iterable[str]) -> List[str]:
+        """
+        Existing, analyzable files among ``paths``, most recently modified
+        first, cut to ``max_files_per_batch``.
+        """
+        candidates: List[Tuple[int, str]] = []
+        for path in paths:
+            try:
+                stat = os.stat(os.path.join(self.scanner.root, path))
+            except OSError:
+                continue
+            if 0 < stat.st_size <= self.max_file_bytes:
+                candidates.append((stat.st_mtime_ns, path))
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        return [path for _, path in candidates[: self.max_files_per_batch]]
+
+    def stats(self) -> ChangePipelineStats:
+        return self._stats.model_copy()
+
+    async def _update_context(self, result: ScanResult) -> None:
+        updates = result.context_updates()
+        if not updates:
+            return
+        self._stats.context_updates += len(updates)
+        if self.update_queue is not None:
+            for update in updates:
+                self.update_queue.submit(self.project_id, update)
+            await self.update_queue.flush(self.project_id)
+        else:
+            await self.context_manager.apply_updates(
+                self.project_id, [(new_update_id(), update) for update in updates]
+            )
+
+    def _invalidate(self, batch: ChangeBatch) -> None:
+        cache = self.llm_interface.validation_cache
+        for path in batch.paths:
+            cache.invalidate_file(path)
+        if self.incremental_validator is not None:
+            for path in batch.deleted:
+                self.incremental_validator.forget(path)
+
+    async def _analyze(
+        self, files: Sequence[str], project_context: ProjectContext
+    ) -> AsyncIterator[ProactiveSuggestionItem]:
+        pending: "asyncio.Queue[str]" = asyncio.Queue()
+        for path in files:
+            pending.put_nowait(path)
+        results: "asyncio.Queue[List[ProactiveSuggestionItem]]" = asyncio.Queue()
+
+        async def worker() -> None:
+            while not pending.empty():
+                path = pending.get_nowait()
+                await self.rate_limiter.acquire()
+                try:
+                    suggestions = await self._analyze_file(path, project_context)
+                except Exception:  # One failing file must not stop the stream.
+                    self._stats.failed += 1
+                    suggestions = []
+                results.put_nowait(suggestions)
+
+        workers = [
+            asyncio.ensure_future(worker())
+            for _ in range(min(self.analysis_concurrency, len(files)))
+        ]
+        try:
+            for _ in range(len(files)):
+                for suggestion in await results.get():
+                    yield suggestion
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def _read(self, path: str) -> str:
+        with open(os.path.join(self.scanner.root, path), "rb") as source_file:
+            return source_file.read().decode("utf-8", "replace")
+
+    async def _analyze_file(
+        self, path: str, project_context: ProjectContext
+    ) -> List[ProactiveSuggestionItem]:
+        code_content = await asyncio.to_thread(self._read, path)
+        self._stats.analyzed += 1
+        if self.incremental_validator is not None:
+            response = await self.incremental_validator.validate(
+                ValidateCodeRequest(code_content=code_content, file_path=path),
+                project_context,
+            )
+        else:
+            response = await self.llm_interface.analyze_code_for_validation(
+                code_content, path, project_context
+            )
+        return suggestions_from_validation(response)
@@ -0,0 +1,226 @@
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+from .code_units import extract_code_units, import_lines, parse_module, top_level_units
+from .context_manager import ProjectContext
+from .enums import StatusEnum
+from .feedback import (
+    new_validation_id,
+    ranges_overlap,
+    sort_feedback,
+    status_for_feedback,
+)
+from .llm_interface import LLMInterface
+from .models import (
+    LineRange,
+    ValidateCodeRequest,
+    ValidateCodeResponse,
+    ValidationFeedbackItem,
+)
+
+
+class CodeChunk:
+    """
+    A slice of a file validated on its own. The chunk's code is the file's
+    import header followed by lines ``start_line``..``end_line`` of the file.
+    """
+
+    __slots__ = ("start_line", "end_line", "header_lines", "code_content")
+
+    def __init__(
+        self,
+        start_line: int,
+        end_line: int,
+        header_lines: List[int],
+        code_content: str,
+    ):
+        self.start_line = start_line
+        self.end_line = end_line
+        self.header_lines = header_lines
+        self.code_content = code_content
+
+    def to_file_line(self, chunk_line: int) -> int:
+        """Maps a 1-based line of the chunk's code to the whole file."""
+        header_length = len(self.header_lines)
+        if chunk_line <= header_length:
+            return self.header_lines[max(chunk_line, 1) - 1]
+        return min(self.start_line + chunk_line - header_length - 1, self.end_line)
+
+    def to_file_range(self, line_range: Optional[LineRange]) -> LineRange:
+        if line_range is None:
+            return LineRange(start_line=self.start_line, end_line=self.end_line)
+        start = self.to_file_line(line_range.start_line)
+        end = self.to_file_line(line_range.end_line)
+        return LineRange(start_line=min(start, end), end_line=max(start, end))
+
+
+def split_into_chunks(code_content: str, max_chunk_lines: int) -> List[CodeChunk]:
+    """
+    Splits Python source along top-level definition boundaries. Module-level
+    imports form a header shared by every chunk; other module-level code is
+    kept with the definition that follows it. Consecutive definitions are
+    packed together up to ``max_chunk_lines``; a single larger definition is
+    never split. Returns an empty list if the source does not parse.
+    """
+    tree = parse_module(code_content)
+    if tree is None:
+        return []
+    lines = code_content.splitlines()
+    header_lines = import_lines(tree)
+    header_set = set(header_lines)
+
+    # Each top-level definition forms a segment together with any module-level
+    # code preceding it; trailing module-level code joins the last segment.
+    segments: List[Tuple[int, int]] = []
+    segment_start = 1
+    for unit in top_level_units(extract_code_units(tree)):
+        segments.append((segment_start, unit.end_line))
+        segment_start = unit.end_line + 1
+    if segment_start <= len(lines):
+        if segments:
+            segments[-1] = (segments[-1][0], len(lines))
+        else:
+            segments.append((segment_start, len(lines)))
+    if not segments:
+        return []
+
+    chunks: List[CodeChunk] = []
+    chunk_start, chunk_end = segments[0]
+    for start, end in segments[1:]:
+        if end - chunk_start + 1 > max_chunk_lines:
+            chunks.append(
+                _make_chunk(lines, chunk_start, chunk_end, header_lines, header_set)
+            )
+            chunk_start = start
+        chunk_end = end
+    chunks.append(_make_chunk(lines, chunk_start, chunk_end, header_lines, header_set))
+    return [chunk for chunk in chunks if chunk.code_content.strip()]
+
+
+def _make_chunk(
+    lines: List[str],
+    start_line: int,
+    end_line: int,
+    header_lines: List[int],
+    header_set: Set[int],
+) -> CodeChunk:
+    body = [
+        line if index not in header_set else ""
+        for index, line in enumerate(lines[start_line - 1 : end_line], start_line)
+    ]
+    header = [lines[line - 1] for line in header_lines]
+    return CodeChunk(start_line, end_line, header_lines, "\n".join(header + body))
+
+
+def merge_chunk_feedback(
+    items: List[ValidationFeedbackItem],
+) -> List[ValidationFeedbackItem]:
+    """
+    Deduplicates feedback produced by several chunks. Items with the same
+    severity, message and fix whose line ranges overlap (typically findings
+    about the shared import header) are collapsed into one spanning both.
+    """
+    groups: Dict[Tuple[str, str, Optional[str]], List[ValidationFeedbackItem]] = {}
+    for item in items:
+        key = (item.severity.value, item.message, item.suggested_code_fix)
+        groups.setdefault(key, []).append(item)
+
+    merged: List[ValidationFeedbackItem] = []
+    for group in groups.values():
+        group.sort(
+            key=lambda item: item.line_range.start_line if item.line_range else 0
+        )
+        current = group[0]
+        for item in group[1:]:
+            if (
+                current.line_range is not None
+                and item.line_range is not None
+                and ranges_overlap(current.line_range, item.line_range)
+            ):
+                current = current.model_copy(
+                    update={
+                        "line_range": LineRange(
+                            start_line=current.line_range.start_line,
+                            end_line=max(
+                                current.line_range.end_line, item.line_range.end_line
+                            ),
+                        )
+                    }
+                )
+            else:
+                merged.append(current)
+                current = item
+        merged.append(current)
+    return sort_feedback(merged)
+
+
+class ChunkedValidator:
+    """
+    Validates large Python files as independent chunks in parallel.
+    Files under ``min_lines_to_chunk`` lines, or that are not valid Python,
+    are validated in one call. Otherwise the file is split along top-level
+    definitions, chunks are analyzed concurrently (at most
+    ``max_concurrency`` at a time) and the per-chunk feedback is merged back
+    into one response in whole-file coordinates.
+    """
+
+    def __init__(
+        self,
+        llm_interface: LLMInterface,
+        max_concurrency: int = 4,
+        min_lines_to_chunk: int = 600,
+        max_chunk_lines: int = 300,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.llm_interface = llm_interface
+        self.max_concurrency = max_concurrency
+        self.min_lines_to_chunk = min_lines_to_chunk
+        self.max_chunk_lines = max_chunk_lines
+
+    async def validate(
+        self, request: ValidateCodeRequest, project_context: ProjectContext
+    ) -> ValidateCodeResponse:
+        chunks: List[CodeChunk] = []
+        if request.code_content.count("\n") + 1 >= self.min_lines_to_chunk:
+            chunks = split_into_chunks(request.code_content, self.max_chunk_lines)
+        if len(chunks) <= 1:
+            return await self.llm_interface.analyze_code_for_validation(
+                request.code_content,
+                request.file_path,
+                project_context,
+                request.developer_intent,
+            )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def validate_chunk(chunk: CodeChunk) -> ValidateCodeResponse:
+            async with semaphore:
+                return await self.llm_interface.analyze_code_for_validation(
+                    chunk.code_content,
+                    request.file_path,
+                    project_context,
+                    request.developer_intent,
+                )
+
+        responses = await asyncio.gather(*(validate_chunk(chunk) for chunk in chunks))
+
+        feedback_items: List[ValidationFeedbackItem] = []
+        failed = False
+        for chunk, response in zip(chunks, responses):
+            failed = failed or response.status == StatusEnum.ERROR
+            feedback_items.extend(
+                item.model_copy(
+                    update={
+                        "item_id": f"{item.item_id}:L{chunk.start_line}",
+                        "line_range": chunk.to_file_range(item.line_range),
+                    }
+                )
+                for item in response.feedback_items
+            )
+        feedback_items = merge_chunk_feedback(feedback_items)
+        return ValidateCodeResponse(
+            validation_id=new_validation_id(),
+            status=StatusEnum.ERROR if failed else status_for_feedback(feedback_items),
+            feedback_items=feedback_items,
+        )
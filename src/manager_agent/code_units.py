@@ -0,0 +1,95 @@
+import ast
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class CodeUnit(NamedTuple):
+    """A syntactic unit (function, class or method) of a Python source file."""
+
+    name: str
+    kind: str  # "function", "class" or "method"
+    start_line: int  # 1-based, includes decorators
+    end_line: int  # 1-based, inclusive
+
+    def contains(self, line: int) -> bool:
+        return self.start_line <= line <= self.end_line
+
+    @property
+    def length(self) -> int:
+        return self.end_line - self.start_line + 1
+
+
+_DEF_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _unit_for_node(node: ast.AST, kind: str, name: str) -> CodeUnit:
+    decorators = getattr(node, "decorator_list", [])
+    start_line = min([node.lineno] + [d.lineno for d in decorators])
+    end_line = getattr(node, "end_lineno", None) or node.lineno
+    return CodeUnit(name=name, kind=kind, start_line=start_line, end_line=end_line)
+
+
+def parse_module(code_content: str) -> Optional[ast.Module]:
+    """Parses Python source, returning None if it is not valid Python."""
+    try:
+        return ast.parse(code_content)
+    except (SyntaxError, ValueError):
+        return None
+
+
+def extract_code_units(tree: ast.Module) -> List[CodeUnit]:
+    """
+    Returns the top-level functions and classes of a module, plus the methods
+    of top-level classes, ordered by start line.
+    """
+    units: List[CodeUnit] = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            units.append(_unit_for_node(node, "class", node.name))
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    units.append(
+                        _unit_for_node(child, "method", f"{node.name}.{child.name}")
+                    )
+        elif isinstance(node, _DEF_NODES):
+            units.append(_unit_for_node(node, "function", node.name))
+    units.sort(key=lambda unit: (unit.start_line, -unit.end_line))
+    return units
+
+
+def top_level_units(units: List[CodeUnit]) -> List[CodeUnit]:
+    """Filters extract_code_units output down to module-level definitions."""
+    return [unit for unit in units if unit.kind != "method"]
+
+
+def innermost_unit(units: List[CodeUnit], line: int) -> Optional[CodeUnit]:
+    """Returns the smallest unit that contains the given line, if any."""
+    best: Optional[CodeUnit] = None
+    for unit in units:
+        if unit.start_line > line:
+            break
+        if unit.contains(line) and (best is None or unit.length < best.length):
+            best = unit
+    return best
+
+
+def statement_spans(tree: ast.Module) -> List[Tuple[int, int]]:
+    """
+    Returns the (start, end) lines of each module-level statement, in order;
+    start lines include decorators.
+    """
+    spans: List[Tuple[int, int]] = []
+    for node in tree.body:
+        decorators = getattr(node, "decorator_list", [])
+        start_line = min([node.lineno] + [d.lineno for d in decorators])
+        spans.append((start_line, getattr(node, "end_lineno", None) or node.lineno))
+    return spans
+
+
+def import_lines(tree: ast.Module) -> List[int]:
+    """Returns the 1-based line numbers of the module-level import statements."""
+    lines: List[int] = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            end_line = getattr(node, "end_lineno", None) or node.lineno
+            lines.extend(range(node.lineno, end_line + 1))
+    return lines
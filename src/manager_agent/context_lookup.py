@@ -0,0 +1,465 @@
+import weakref
+from itertools import compress
+from operator import is_not
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .context_manager import (
+    CodingStandard,
+    KeyModule,
+    ProjectContext,
+    ProjectRequirement,
+)
+
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+def path_parts(path: str) -> Tuple[str, ...]:
+    """Splits a file path into its components ("./src//a.py" -> src, a.py)."""
+    return tuple(
+        part for part in path.replace("\\", "/").split("/") if part not in ("", ".")
+    )
+
+
+def module_prefix(path: str) -> Tuple[str, ...]:
+    """
+    Directory a KeyModule owns: its path when that is a directory, or the
+    directory containing it when it names a file ("src/db/models.py").
+    """
+    parts = path_parts(path)
+    if parts and not path.endswith("/") and "." in parts[-1]:
+        return parts[:-1]
+    return parts
+
+
+class _TrieNode(Generic[V]):
+    __slots__ = ("children", "values")
+
+    def __init__(
+        self,
+        children: Optional[Dict[str, "_TrieNode[V]"]] = None,
+        values: Tuple[V, ...] = (),
+    ):
+        self.children: Dict[str, "_TrieNode[V]"] = children or {}
+        self.values = values
+
+
+class PathTrie(Generic[V]):
+    """
+    Persistent trie over path components mapping directory prefixes to
+    values. insert() and remove() return a new trie that copies only the
+    nodes along the changed path and shares every other node, so each
+    context version can keep its own trie at little cost.
+    Values stored at the same prefix are kept sorted by ``order``, so a
+    trie's content does not depend on the order of the edits building it.
+    """
+
+    __slots__ = ("_root", "_size", "order")
+
+    def __init__(
+        self,
+        order: Callable[[V], Any],
+        root: Optional[_TrieNode[V]] = None,
+        size: int = 0,
+    ):
+        self.order = order
+        self._root: _TrieNode[V] = root or _TrieNode()
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def build(
+        cls, order: Callable[[V], Any], items: Iterable[Tuple[Sequence[str], V]]
+    ) -> "PathTrie[V]":
+        """Builds a trie from (prefix, value) pairs in one pass."""
+        root: _TrieNode[V] = _TrieNode()
+        values: Dict[int, Tuple[_TrieNode[V], List[V]]] = {}
+        size = 0
+        for prefix, value in items:
+            node = root
+            for part in prefix:
+                child = node.children.get(part)
+                if child is None:
+                    child = node.children[part] = _TrieNode()
+                node = child
+            values.setdefault(id(node), (node, []))[1].append(value)
+            size += 1
+        for node, node_values in values.values():
+            node.values = tuple(sorted(node_values, key=order))
+        return cls(order, root, size)
+
+    def values(self, prefix: Sequence[str]) -> Tuple[V, ...]:
+        """Values stored at exactly ``prefix``."""
+        node = self._root
+        for part in prefix:
+            child = node.children.get(part)
+            if child is None:
+                return ()
+            node = child
+        return node.values
+
+    def insert(self, prefix: Sequence[str], value: V) -> "PathTrie[V]":
+        return self._update(
+            prefix, lambda values: tuple(sorted(values + (value,), key=self.order))
+        )
+
+    def remove(self, prefix: Sequence[str], value: V) -> "PathTrie[V]":
+        """Removes ``value`` (compared by identity) from ``prefix``, if there."""
+        return self._update(
+            prefix, lambda values: tuple(v for v in values if v is not value)
+        )
+
+    def replace(self, prefix: Sequence[str], old: V, new: V) -> "PathTrie[V]":
+        """Puts ``new`` in the place of ``old``, which it must sort like."""
+        return self._update(
+            prefix, lambda values: tuple(new if v is old else v for v in values)
+        )
+
+    def _update(
+        self,
+        prefix: Sequence[str],
+        change: Callable[[Tuple[V, ...]], Tuple[V, ...]],
+    ) -> "PathTrie[V]":
+        path = [self._root]
+        for part in prefix:
+            path.append(path[-1].children.get(part) or _TrieNode())
+        previous = path[-1].values
+        values = change(previous)
+        if len(values) == len(previous) and all(
+            new is old for new, old in zip(values, previous)
+        ):
+            return self
+        size = self._size + len(values) - len(previous)
+
+        # Copy the path bottom-up, dropping nodes left empty.
+        node = _TrieNode(dict(path[-1].children), values)
+        for depth in range(len(prefix) - 1, -1, -1):
+            parent = _TrieNode(dict(path[depth].children), path[depth].values)
+            if node.children or node.values:
+                parent.children[prefix[depth]] = node
+            else:
+                parent.children.pop(prefix[depth], None)
+            node = parent
+        return PathTrie(self.order, node, size)
+
+    def matches(self, path: Sequence[str]) -> List[V]:
+        """Values of every prefix of ``path``, the longest prefix first."""
+        found: List[V] = list(self._root.values)
+        node = self._root
+        for part in path:
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            found[:0] = node.values
+        return found
+
+    def longest_match(self, path: Sequence[str]) -> Optional[V]:
+        """The first value stored at the longest prefix of ``path``."""
+        match = self._root.values[0] if self._root.values else None
+        node = self._root
+        for part in path:
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            if node.values:
+                match = node.values[0]
+        return match
+
+
+class _KeyedIndex(Generic[T]):
+    """
+    Entries of one context list by key (first occurrence wins), and
+    optionally grouped by an attribute such as category. Groups list their
+    entries in the order they joined; replacements keep their place.
+    """
+
+    __slots__ = ("key", "group", "by_key", "groups")
+
+    def __init__(
+        self,
+        key: Callable[[T], str],
+        group: Optional[Callable[[T], Optional[str]]] = None,
+        items: Iterable[T] = (),
+    ):
+        self.key = key
+        self.group = group
+        self.by_key: Dict[str, T] = {}
+        self.groups: Dict[Optional[str], Dict[str, T]] = {}
+        for item in items:
+            item_key = key(item)
+            if item_key in self.by_key:
+                continue
+            self.by_key[item_key] = item
+            if group is not None:
+                self.groups.setdefault(group(item), {})[item_key] = item
+
+    def derive(self, removed: List[T], added: List[T]) -> "Optional[_KeyedIndex[T]]":
+        """
+        Index of the items with ``removed`` taken out and ``added`` put in.
+        Dictionaries the change does not touch are shared with this index.
+        Returns None when duplicate keys are involved; rebuild instead.
+        """
+        key, group = self.key, self.group
+        removed_by_key = {key(item): item for item in removed}
+        if len(removed_by_key) != len(removed) or any(
+            self.by_key.get(item_key) is not item
+            for item_key, item in removed_by_key.items()
+        ):
+            return None
+        derived: _KeyedIndex[T] = _KeyedIndex(key, group)
+        derived.by_key = dict(self.by_key)
+        derived.groups = dict(self.groups)
+        copied = set()
+
+        def bucket(name: Optional[str]) -> Dict[str, T]:
+            if name not in copied:
+                derived.groups[name] = dict(derived.groups.get(name, {}))
+                copied.add(name)
+            return derived.groups[name]
+
+        for item in added:
+            item_key = key(item)
+            previous = removed_by_key.pop(item_key, None)
+            if previous is None and item_key in derived.by_key:
+                return None
+            # Replacements keep their place in by_key and in their group.
+            derived.by_key[item_key] = item
+            if group is not None:
+                if previous is not None and group(previous) != group(item):
+                    del bucket(group(previous))[item_key]
+                bucket(group(item))[item_key] = item
+        for item_key, item in removed_by_key.items():
+            del derived.by_key[item_key]
+            if group is not None:
+                del bucket(group(item))[item_key]
+        for name in copied:
+            if not derived.groups[name]:
+                del derived.groups[name]
+        return derived
+
+
+def _diff(previous: Sequence[T], current: Sequence[T]) -> Tuple[List[T], List[T]]:
+    """
+    Entries of ``previous`` not at their place in ``current`` and the
+    entries taking their place. apply_update() replaces entries in place or
+    appends, so this compares positions by identity; an entry that merely
+    moved shows up on both sides, which the indexes treat as a replacement
+    by itself.
+    """
+    changed = list(compress(range(len(current)), map(is_not, previous, current)))
+    removed = [previous[index] for index in changed]
+    removed.extend(previous[len(current) :])
+    added = [current[index] for index in changed]
+    added.extend(current[len(previous) :])
+    return removed, added
+
+
+def _module_name(module: KeyModule) -> str:
+    return module.name
+
+
+def _entry_id(entry: Union[CodingStandard, ProjectRequirement]) -> str:
+    return entry.id
+
+
+def _category(standard: CodingStandard) -> Optional[str]:
+    return standard.category.lower() if standard.category else None
+
+
+def _priority(requirement: ProjectRequirement) -> Optional[str]:
+    return requirement.priority.lower() if requirement.priority else None
+
+
+class ContextLookup:
+    """
+    Indexes over one ProjectContext version: key modules by name, by exact
+    path and by owned directory (a PathTrie), coding standards by id and
+    category, and requirements by id and priority. Category and priority
+    lookups are case-insensitive. Entries with a duplicate key are indexed
+    once, the first occurrence winning, like everywhere else in the agent.
+    Modules claiming the same directory are ordered by name.
+    Build one with context_lookup(); advance_lookup() derives the next
+    version's indexes from the previous ones, touching only what changed.
+    """
+
+    __slots__ = (
+        "key_modules",
+        "coding_standards",
+        "requirements",
+        "modules",
+        "module_files",
+        "module_tree",
+        "standards",
+        "requirements_index",
+    )
+
+    def __init__(self, project_context: Optional[ProjectContext] = None):
+        self.key_modules: List[KeyModule] = []
+        self.coding_standards: List[CodingStandard] = []
+        self.requirements: List[ProjectRequirement] = []
+        self.modules: _KeyedIndex[KeyModule] = _KeyedIndex(_module_name)
+        # Modules by their exact path, and by the directory they own.
+        self.module_files: PathTrie[KeyModule] = PathTrie(_module_name)
+        self.module_tree: PathTrie[KeyModule] = PathTrie(_module_name)
+        self.standards: _KeyedIndex[CodingStandard] = _KeyedIndex(_entry_id, _category)
+        self.requirements_index: _KeyedIndex[ProjectRequirement] = _KeyedIndex(
+            _entry_id, _priority
+        )
+        if project_context is not None:
+            self._index_modules(project_context.key_modules)
+            self.coding_standards = project_context.coding_standards
+            self.standards = _KeyedIndex(
+                _entry_id, _category, project_context.coding_standards
+            )
+            self.requirements = project_context.requirements
+            self.requirements_index = _KeyedIndex(
+                _entry_id, _priority, project_context.requirements
+            )
+
+    def _index_modules(self, modules: List[KeyModule]) -> None:
+        self.key_modules = modules
+        self.modules = _KeyedIndex(_module_name, items=modules)
+        files: List[Tuple[Tuple[str, ...], KeyModule]] = []
+        directories: List[Tuple[Tuple[str, ...], KeyModule]] = []
+        for module in modules:
+            if module.path:
+                files.append((path_parts(module.path), module))
+                prefix = module_prefix(module.path)
+                if prefix:
+                    directories.append((prefix, module))
+        self.module_files = PathTrie.build(_module_name, files)
+        self.module_tree = PathTrie.build(_module_name, directories)
+
+    def _move_module(
+        self, previous: Optional[KeyModule], module: Optional[KeyModule]
+    ) -> None:
+        """Replaces ``previous`` with ``module`` (either may be None) in the tries."""
+        for attribute, key in (
+            ("module_files", path_parts),
+            ("module_tree", module_prefix),
+        ):
+            trie: PathTrie[KeyModule] = getattr(self, attribute)
+            old = key(previous.path) if previous and previous.path else ()
+            new = key(module.path) if module and module.path else ()
+            if previous is not None and module is not None and old == new:
+                if new:
+                    trie = trie.replace(new, previous, module)
+            else:
+                if old:
+                    trie = trie.remove(old, previous)
+                if new:
+                    trie = trie.insert(new, module)
+            setattr(self, attribute, trie)
+
+    def derive(self, project_context: ProjectContext) -> "ContextLookup":
+        """Indexes of a newer version, updated for the entries that changed."""
+        derived = ContextLookup()
+        derived.key_modules = modules = project_context.key_modules
+        derived.modules = self.modules
+        derived.module_files = self.module_files
+        derived.module_tree = self.module_tree
+        if modules is not self.key_modules:
+            removed, added = _diff(self.key_modules, modules)
+            index = self.modules.derive(removed, added)
+            if index is None:
+                derived._index_modules(modules)
+            else:
+                derived.modules = index
+                removed_by_name = {module.name: module for module in removed}
+                for module in added:
+                    derived._move_module(removed_by_name.pop(module.name, None), module)
+                for module in removed_by_name.values():
+                    derived._move_module(module, None)
+
+        derived.coding_standards = standards = project_context.coding_standards
+        derived.standards = self.standards
+        if standards is not self.coding_standards:
+            derived.standards = self.standards.derive(
+                *_diff(self.coding_standards, standards)
+            ) or _KeyedIndex(_entry_id, _category, standards)
+
+        derived.requirements = requirements = project_context.requirements
+        derived.requirements_index = self.requirements_index
+        if requirements is not self.requirements:
+            derived.requirements_index = self.requirements_index.derive(
+                *_diff(self.requirements, requirements)
+            ) or _KeyedIndex(_entry_id, _priority, requirements)
+        return derived
+
+    def module(self, name: str) -> Optional[KeyModule]:
+        return self.modules.by_key.get(name)
+
+    def module_for_path(self, file_path: str) -> Optional[KeyModule]:
+        """
+        The key module owning a file: the module whose path is the file
+        itself, else the one owning the deepest directory containing it.
+        """
+        parts = path_parts(file_path)
+        exact = self.module_files.values(parts)
+        return exact[0] if exact else self.module_tree.longest_match(parts)
+
+    def modules_for_path(self, file_path: str) -> List[KeyModule]:
+        """Every key module whose directory contains the file, deepest first."""
+        return self.module_tree.matches(path_parts(file_path))
+
+    def standard(self, standard_id: str) -> Optional[CodingStandard]:
+        return self.standards.by_key.get(standard_id)
+
+    def standards_in_category(self, category: str) -> List[CodingStandard]:
+        return list(self.standards.groups.get(category.lower(), {}).values())
+
+    def requirement(self, requirement_id: str) -> Optional[ProjectRequirement]:
+        return self.requirements_index.by_key.get(requirement_id)
+
+    def requirements_with_priority(self, priority: str) -> List[ProjectRequirement]:
+        return list(self.requirements_index.groups.get(priority.lower(), {}).values())
+
+
+# Lookups of live ProjectContext objects, by id(); see context_lookup.
+_lookups: Dict[int, ContextLookup] = {}
+
+
+def _remember(project_context: ProjectContext, lookup: ContextLookup) -> None:
+    key = id(project_context)
+    _lookups[key] = lookup
+    weakref.finalize(project_context, _lookups.pop, key, None)
+
+
+def context_lookup(project_context: ProjectContext) -> ContextLookup:
+    """
+    Returns the indexes of a ProjectContext, building them on first use.
+    Contexts are immutable, so they are kept until the context is garbage
+    collected.
+    """
+    lookup = _lookups.get(id(project_context))
+    if lookup is None:
+        lookup = ContextLookup(project_context)
+        _remember(project_context, lookup)
+    return lookup
+
+
+def advance_lookup(previous: ProjectContext, current: ProjectContext) -> None:
+    """
+    Derives the indexes of ``current`` from those of ``previous``, if they
+    were built, so lookups on a frequently updated context never rebuild
+    from scratch. ContextManager calls this for every new version.
+    """
+    lookup = _lookups.get(id(previous))
+    if lookup is not None and id(current) not in _lookups:
+        _remember(current, lookup.derive(current))
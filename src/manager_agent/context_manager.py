@@ -1,11 +1,41 @@
-from typing import List, Optional
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from .context_snapshot import SnapshotTracker
+from .enums import StatusEnum, UpdateTypeEnum
+from .models import UpdateManagerContextRequest, UpdateManagerContextResponse
+from .single_flight import SingleFlight
+
+# Context every project starts from until it has been updated.
+DEFAULT_CONTEXT_PATH = os.path.join("data", "sample_project_context.json")
+
+# An identifier such as "CS-001" or "[REQ-12]" leading an update's summary.
+_LEADING_ID_RE = re.compile(r"^\[?([A-Za-z]+-[A-Za-z0-9_.-]+)\]?\s*:?\s*")
 
 
 class KeyModule(BaseModel):
     """Represents a key module or component in the project."""
 
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="The name of the module.")
     description: str = Field(
         ...,
@@ -21,6 +51,8 @@ class KeyModule(BaseModel):
 class CodingStandard(BaseModel):
     """Represents a specific coding standard or convention."""
 
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(
         ...,
         description="A unique identifier for the standard (e.g., 'CS-001').",
@@ -36,6 +68,8 @@ class CodingStandard(BaseModel):
 class ProjectRequirement(BaseModel):
     """Represents a specific project requirement."""
 
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(
         ...,
         description="A unique identifier for the requirement (e.g., 'REQ-001').",
@@ -54,8 +88,13 @@ class ProjectContext(BaseModel):
     Represents the comprehensive context of a software project.
     This model stores architecture details, key modules, coding standards,
     requirements, and overall project goals.
+    Instances are immutable versions: derive a new version with
+    model_copy(update=...) or apply_update(), which share every unchanged
+    list with the previous version. Lists must never be mutated in place.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     project_name: str = Field(..., description="The official name of the project.")
     project_goals: List[str] = Field(
         default_factory=list,
@@ -77,8 +116,352 @@ class ProjectContext(BaseModel):
         description="A list of functional and non-functional requirements for "
         "the project.",
     )
+    file_annotations: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Notes about individual files, keyed by file path.",
+    )
     # Future fields could include:
     # - technology_stack: List[str]
     # - external_dependencies: List[Dependency]
     # - data_models_overview: str
     # - deployment_environment: str
+
+
+# Fingerprints of live ProjectContext objects, by id(); see context_fingerprint.
+_fingerprints: Dict[int, str] = {}
+
+
+def context_fingerprint(project_context: ProjectContext) -> str:
+    """
+    Returns a stable version fingerprint of a ProjectContext.
+    Two contexts with identical content share a fingerprint, so it can be
+    used to key derived data (caches, indexes) that must be invalidated
+    whenever the context changes.
+    Contexts are immutable, so the fingerprint is computed once per object
+    and remembered until the object is garbage collected.
+    """
+    key = id(project_context)
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        payload = project_context.model_dump_json().encode("utf-8")
+        fingerprint = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        _fingerprints[key] = fingerprint
+        weakref.finalize(project_context, _fingerprints.pop, key, None)
+    return fingerprint
+
+
+class ContextVersion(NamedTuple):
+    """A ProjectContext together with its version number."""
+
+    version: int
+    context: ProjectContext
+
+
+def new_update_id() -> str:
+    return f"update-{uuid.uuid4().hex[:12]}"
+
+
+def _split_leading_id(summary: str) -> Tuple[Optional[str], str]:
+    match = _LEADING_ID_RE.match(summary.strip())
+    if match is None:
+        return None, summary.strip()
+    return match.group(1), summary.strip()[match.end() :]
+
+
+def _describe(text: str, details: str) -> str:
+    parts = [part for part in (text.strip(), details.strip()) if part]
+    if len(parts) == 2 and parts[0] == parts[1]:
+        parts.pop()
+    return ": ".join(parts)
+
+
+def apply_update(
+    project_context: ProjectContext,
+    update: UpdateManagerContextRequest,
+    update_id: str,
+) -> ProjectContext:
+    """
+    Returns a new ProjectContext with one update applied; the given context
+    is not modified, and lists the update does not touch are shared with it.
+    The result depends only on the arguments, so replaying a log of updates
+    always rebuilds the same context.
+
+    - FILE_ANNOTATION sets the note of every path in relevant_file_paths.
+    - ARCHITECTURAL_DECISION appends a paragraph to architecture_overview.
+    - STYLE_GUIDE_CHANGE and FEATURE_SPECIFICATION replace the coding
+      standard / requirement whose id leads the summary ("CS-001: ..."), or
+      add a new one (with ``update_id`` as id when the summary has none).
+    - NEW_DEPENDENCY adds or replaces the key module named by the summary.
+    - SOURCE_SCAN sets the key module named by the summary to what a source
+      scan found (details as description, first path as path); empty
+      details remove the module.
+    """
+    changes: Dict[str, Any] = {}
+    update_type = update.update_type
+    if update_type == UpdateTypeEnum.FILE_ANNOTATION:
+        note = _describe(update.summary, update.details_uri_or_text)
+        annotations = dict(project_context.file_annotations)
+        for path in update.relevant_file_paths or ():
+            annotations[path] = note
+        changes["file_annotations"] = annotations
+    elif update_type == UpdateTypeEnum.ARCHITECTURAL_DECISION:
+        paragraph = _describe(update.summary, update.details_uri_or_text)
+        overview = project_context.architecture_overview
+        changes["architecture_overview"] = (
+            f"{overview}\n\n{paragraph}" if overview else paragraph
+        )
+    elif update_type == UpdateTypeEnum.STYLE_GUIDE_CHANGE:
+        entry_id, text = _split_leading_id(update.summary)
+        description = _describe(text, update.details_uri_or_text)
+        standards = list(project_context.coding_standards)
+        for index, standard in enumerate(standards):
+            if standard.id == entry_id:
+                standards[index] = standard.model_copy(
+                    update={"description": description}
+                )
+                break
+        else:
+            standards.append(
+                CodingStandard(id=entry_id or update_id, description=description)
+            )
+        changes["coding_standards"] = standards
+    elif update_type == UpdateTypeEnum.FEATURE_SPECIFICATION:
+        entry_id, text = _split_leading_id(update.summary)
+        description = _describe(text, update.details_uri_or_text)
+        requirements = list(project_context.requirements)
+        for index, requirement in enumerate(requirements):
+            if requirement.id == entry_id:
+                requirements[index] = requirement.model_copy(
+                    update={"description": description}
+                )
+                break
+        else:
+            requirements.append(
+                ProjectRequirement(id=entry_id or update_id, description=description)
+            )
+        changes["requirements"] = requirements
+    elif update_type == UpdateTypeEnum.NEW_DEPENDENCY:
+        name = update.summary.strip()
+        module = KeyModule(
+            name=name,
+            description=f"External dependency: "
+            f"{update.details_uri_or_text.strip() or name}",
+            path=(update.relevant_file_paths or [None])[0],
+        )
+        modules = list(project_context.key_modules)
+        for index, existing in enumerate(modules):
+            if existing.name == name:
+                modules[index] = module
+                break
+        else:
+            modules.append(module)
+        changes["key_modules"] = modules
+    elif update_type == UpdateTypeEnum.SOURCE_SCAN:
+        name = update.summary.strip()
+        description = update.details_uri_or_text.strip()
+        modules = list(project_context.key_modules)
+        position = next(
+            (index for index, module in enumerate(modules) if module.name == name),
+            None,
+        )
+        if not description:
+            if position is not None:
+                del modules[position]
+        else:
+            module = KeyModule(
+                name=name,
+                description=description,
+                path=(update.relevant_file_paths or [None])[0],
+            )
+            if position is None:
+                modules.append(module)
+            else:
+                modules[position] = module
+        changes["key_modules"] = modules
+    return project_context.model_copy(update=changes)
+
+
+def apply_updates(
+    project_context: ProjectContext,
+    updates: Sequence[Tuple[str, UpdateManagerContextRequest]],
+) -> ProjectContext:
+    """Applies (update_id, update) pairs in order; see apply_update()."""
+    for update_id, update in updates:
+        project_context = apply_update(project_context, update, update_id)
+    return project_context
+
+
+def update_targets(update: UpdateManagerContextRequest) -> FrozenSet[Tuple[str, str]]:
+    """
+    Returns the context entries an update overwrites as a whole, as
+    (kind, key) pairs. A later update whose targets include all of an
+    earlier one's makes the earlier one redundant. Updates that add to
+    the context rather than overwrite (such as architectural decisions)
+    have no targets.
+    """
+    update_type = update.update_type
+    if update_type == UpdateTypeEnum.FILE_ANNOTATION:
+        return frozenset(
+            ("file_annotation", path) for path in update.relevant_file_paths or ()
+        )
+    if update_type in (UpdateTypeEnum.NEW_DEPENDENCY, UpdateTypeEnum.SOURCE_SCAN):
+        return frozenset([("key_module", update.summary.strip())])
+    kind = {
+        UpdateTypeEnum.STYLE_GUIDE_CHANGE: "coding_standard",
+        UpdateTypeEnum.FEATURE_SPECIFICATION: "requirement",
+    }.get(update_type)
+    entry_id = _split_leading_id(update.summary)[0] if kind else None
+    return frozenset([(kind, entry_id)]) if kind and entry_id else frozenset()
+
+
+def load_context_file(path: str) -> ProjectContext:
+    """Reads a ProjectContext from a JSON file."""
+    with open(path, encoding="utf-8") as context_file:
+        return ProjectContext.model_validate_json(context_file.read())
+
+
+class ContextManager:
+    """
+    Owns the ProjectContext of every project the agent serves.
+    A project's context is seeded from ``initial_context_path`` the first
+    time it is loaded. With ``store_directory``, each project is backed by a
+    ContextStore (an append-only update log plus snapshots) and survives
+    restarts; without it, updates are kept in memory only.
+    Returned contexts are shared, immutable versions: readers use them
+    without copying, and pinned() holds one version for a whole request
+    while updates publish newer ones. ``snapshots`` tracks which versions
+    are still referenced and reports those that are reclaimed.
+    """
+
+    def __init__(
+        self,
+        initial_context_path: str = DEFAULT_CONTEXT_PATH,
+        store_directory: Optional[str] = None,
+        **store_options: Any,
+    ):
+        self.initial_context_path = initial_context_path
+        self.store_directory = store_directory
+        self.store_options = store_options
+        self._versions: Dict[str, ContextVersion] = {}
+        self._stores: Dict[str, Any] = {}
+        # Stores of unloaded projects that are still being closed.
+        self._closing: Dict[str, "asyncio.Future[None]"] = {}
+        self._loads = SingleFlight()
+        self.snapshots = SnapshotTracker()
+
+    async def load_context(self, project_id: str) -> ProjectContext:
+        """Loads a project's context (once) and returns its current version."""
+        return (await self.get_version(project_id)).context
+
+    async def get_context(self, project_id: str) -> ProjectContext:
+        return (await self.get_version(project_id)).context
+
+    async def get_version(self, project_id: str) -> ContextVersion:
+        store = self._stores.get(project_id)
+        if store is not None:
+            return store.current
+        current = self._versions.get(project_id)
+        if current is not None:
+            return current
+        await self._loads.run(project_id, lambda: self._load(project_id))
+        return await self.get_version(project_id)
+
+    @asynccontextmanager
+    async def pinned(self, project_id: str) -> AsyncIterator[ContextVersion]:
+        """Pins the current version of a project's context for a request."""
+        version = await self.get_version(project_id)
+        with self.snapshots.pin(project_id, version):
+            yield version
+
+    def is_loaded(self, project_id: str) -> bool:
+        return project_id in self._stores or project_id in self._versions
+
+    async def unload(self, project_id: str) -> None:
+        """
+        Drops a project's context from memory. Its store is compacted first,
+        so the next load reads one snapshot and replays nothing. Contexts
+        without a store cannot be unloaded (they would be lost).
+        """
+        store = self._stores.pop(project_id, None)
+        if store is None:
+            if project_id in self._versions:
+                raise ValueError("In-memory contexts cannot be unloaded")
+            return
+        closing = asyncio.ensure_future(self._close_store(store))
+        self._closing[project_id] = closing
+        try:
+            await asyncio.shield(closing)
+        finally:
+            if self._closing.get(project_id) is closing:
+                del self._closing[project_id]
+
+    @staticmethod
+    async def _close_store(store: Any) -> None:
+        if store.stats().log_entries:
+            await store.compact()
+        await store.close()
+
+    async def _load(self, project_id: str) -> None:
+        closing = self._closing.get(project_id)
+        if closing is not None:
+            # Reopen only once the previous store has released its files.
+            await asyncio.wait([closing])
+        initial = await asyncio.to_thread(load_context_file, self.initial_context_path)
+        if self.store_directory is None:
+            self._versions[project_id] = ContextVersion(0, initial)
+            self.snapshots.track(project_id, self._versions[project_id])
+            return
+        from .context_store import ContextStore
+
+        directory = os.path.join(
+            self.store_directory, re.sub(r"[^\w.-]", "_", project_id)
+        )
+        store = ContextStore(directory, initial, **self.store_options)
+        await store.open()
+        self._stores[project_id] = store
+        self.snapshots.track(project_id, store.current)
+
+    async def update_context(
+        self, project_id: str, update_details: UpdateManagerContextRequest
+    ) -> UpdateManagerContextResponse:
+        """Applies an update; with a store, returns once it is durable."""
+        update_id = new_update_id()
+        _, current = await self.apply_updates(project_id, [(update_id, update_details)])
+        version = current.version
+        return UpdateManagerContextResponse(
+            update_id=update_id,
+            status=StatusEnum.CONTEXT_UPDATED,
+            message=f"Context updated to version {version}.",
+        )
+
+    async def apply_updates(
+        self,
+        project_id: str,
+        updates: Sequence[Tuple[str, UpdateManagerContextRequest]],
+    ) -> Tuple[ContextVersion, ContextVersion]:
+        """
+        Applies (update_id, update) pairs as one new context version.
+        Returns the previous and the new version.
+        """
+        await self.get_version(project_id)
+        store = self._stores.get(project_id)
+        if store is not None:
+            previous, current = await store.append_many(updates)
+        else:
+            previous = self._versions[project_id]
+            current = ContextVersion(
+                previous.version + 1, apply_updates(previous.context, updates)
+            )
+            self._versions[project_id] = current
+        self.snapshots.track(project_id, current)
+        # Imported here: context_lookup imports this module.
+        from .context_lookup import advance_lookup
+
+        advance_lookup(previous.context, current.context)
+        return previous, current
+
+    async def close(self) -> None:
+        """Flushes and closes every project's store."""
+        stores, self._stores = list(self._stores.values()), {}
+        for store in stores:
+            await store.close()
@@ -0,0 +1,569 @@
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import AbstractSet, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .context_lookup import context_lookup
+from .context_manager import (
+    CodingStandard,
+    KeyModule,
+    ProjectContext,
+    ProjectRequirement,
+)
+from .prompts import render_context_prompt, render_context_sections
+from .vector_index import HashingEmbedder, VectorIndex
+
+_WORD_RE = re.compile(r"[A-Za-z][a-z0-9]*|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or should "
+    "that the this to use used uses using was were will with".split()
+)
+
+# Entry kinds, in the order unmatched entries fill leftover budget.
+ENTRY_KINDS = (
+    "goal",
+    "architecture",
+    "coding_standard",
+    "key_module",
+    "requirement",
+    "file_annotation",
+)
+
+# The ProjectContext field each entry kind is read from.
+KIND_FIELDS = {
+    "goal": "project_goals",
+    "architecture": "architecture_overview",
+    "key_module": "key_modules",
+    "coding_standard": "coding_standards",
+    "requirement": "requirements",
+    "file_annotation": "file_annotations",
+}
+
+# Entry kinds embedded for semantic matching.
+VECTOR_KINDS = frozenset(
+    ("architecture", "key_module", "coding_standard", "requirement", "file_annotation")
+)
+
+# Score added to a key module whose directory contains the request's file.
+PATH_MATCH_BONUS = 5.0
+
+# Semantic matching: the best SEMANTIC_TOP_K entries by cosine similarity
+# add SEMANTIC_WEIGHT * similarity to their score, if at least MIN_SIMILARITY.
+SEMANTIC_WEIGHT = 4.0
+SEMANTIC_TOP_K = 16
+MIN_SIMILARITY = 0.12
+
+# Identifiers taken from code when building a query, most frequent first.
+MAX_CODE_QUERY_TERMS = 64
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase terms, breaking snake_case, camelCase and
+    paths into their words and dropping common stopwords.
+    """
+    return [
+        word
+        for word in (match.lower() for match in _WORD_RE.findall(text))
+        if word not in _STOPWORDS
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap model-token estimate (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def code_query_terms(code_content: Optional[str]) -> str:
+    """Returns the most frequent identifier words in a piece of code."""
+    if not code_content:
+        return ""
+    counts = Counter(tokenize(code_content))
+    return " ".join(term for term, _ in counts.most_common(MAX_CODE_QUERY_TERMS))
+
+
+class ContextEntry(NamedTuple):
+    """One rankable piece of a ProjectContext."""
+
+    kind: str  # One of ENTRY_KINDS
+    position: int  # Index within its kind, for stable rendering order
+    key: str  # Module name, standard/requirement id, or a positional key
+    text: str  # Text the entry is ranked on
+    tokens: int  # Estimated prompt tokens when rendered
+    item: Any  # The KeyModule/CodingStandard/ProjectRequirement, a str, or a
+    # (path, note) pair for file annotations
+
+
+# Term frequencies of an entry's text, and its length in terms.
+_TermCounts = Tuple[Dict[str, int], int]
+
+
+def _term_counts(text: str) -> _TermCounts:
+    terms = tokenize(text)
+    return Counter(terms), len(terms)
+
+
+class ScoredEntry(NamedTuple):
+    entry: ContextEntry
+    score: float
+
+
+def _goal_entries(project_context: ProjectContext) -> List[ContextEntry]:
+    return [
+        ContextEntry(
+            "goal", position, f"goal-{position}", goal, estimate_tokens(goal), goal
+        )
+        for position, goal in enumerate(project_context.project_goals)
+    ]
+
+
+def _architecture_entries(project_context: ProjectContext) -> List[ContextEntry]:
+    paragraphs = [
+        paragraph.strip()
+        for paragraph in (project_context.architecture_overview or "").split("\n\n")
+        if paragraph.strip()
+    ]
+    return [
+        ContextEntry(
+            "architecture",
+            position,
+            f"architecture-{position}",
+            paragraph,
+            estimate_tokens(paragraph),
+            paragraph,
+        )
+        for position, paragraph in enumerate(paragraphs)
+    ]
+
+
+def _key_module_entries(project_context: ProjectContext) -> List[ContextEntry]:
+    entries = []
+    for position, module in enumerate(project_context.key_modules):
+        text = f"{module.name} {module.path or ''} {module.description}"
+        entries.append(
+            ContextEntry(
+                "key_module",
+                position,
+                module.name,
+                text,
+                estimate_tokens(text) + 4,
+                module,
+            )
+        )
+    return entries
+
+
+def _coding_standard_entries(project_context: ProjectContext) -> List[ContextEntry]:
+    entries = []
+    for position, standard in enumerate(project_context.coding_standards):
+        text = f"{standard.id} {standard.category or ''} {standard.description}"
+        entries.append(
+            ContextEntry(
+                "coding_standard",
+                position,
+                standard.id,
+                text,
+                estimate_tokens(text) + 4,
+                standard,
+            )
+        )
+    return entries
+
+
+def _requirement_entries(project_context: ProjectContext) -> List[ContextEntry]:
+    entries = []
+    for position, requirement in enumerate(project_context.requirements):
+        text = (
+            f"{requirement.id} {requirement.priority or ''} {requirement.description}"
+        )
+        entries.append(
+            ContextEntry(
+                "requirement",
+                position,
+                requirement.id,
+                text,
+                estimate_tokens(text) + 4,
+                requirement,
+            )
+        )
+    return entries
+
+
+def _file_annotation_entries(project_context: ProjectContext) -> List[ContextEntry]:
+    entries = []
+    for position, (path, note) in enumerate(project_context.file_annotations.items()):
+        text = f"{path} {note}"
+        entries.append(
+            ContextEntry(
+                "file_annotation",
+                position,
+                path,
+                text,
+                estimate_tokens(text) + 2,
+                (path, note),
+            )
+        )
+    return entries
+
+
+# Entry builders, in the order entries are laid out in a ContextIndex.
+_ENTRY_BUILDERS = {
+    "goal": _goal_entries,
+    "architecture": _architecture_entries,
+    "key_module": _key_module_entries,
+    "coding_standard": _coding_standard_entries,
+    "requirement": _requirement_entries,
+    "file_annotation": _file_annotation_entries,
+}
+
+
+class ContextIndex:
+    """
+    BM25 inverted index over the entries of one ProjectContext version.
+    Per-posting BM25 weights are precomputed at build time, so scoring a
+    query only sums ``idf * weight`` over the postings of its terms.
+    Given the index of the previous version and the ProjectContext fields
+    that changed since (see update_queue.changed_fields), the entries of
+    unchanged fields are reused as they are, and entries whose text did not
+    change are not tokenized again; only the BM25 weights are recomputed.
+    """
+
+    def __init__(
+        self,
+        project_context: ProjectContext,
+        k1: float = 1.2,
+        b: float = 0.75,
+        previous: Optional["ContextIndex"] = None,
+        changed_fields: Optional[AbstractSet[str]] = None,
+    ):
+        self.project_name = project_context.project_name
+        if previous is not None and previous.project_name != self.project_name:
+            previous = None
+        # Entries of each kind, with the term counts and length of their texts.
+        self._kinds: Dict[str, Tuple[List[ContextEntry], List[_TermCounts]]] = {}
+        for kind, builder in _ENTRY_BUILDERS.items():
+            if (
+                previous is not None
+                and changed_fields is not None
+                and KIND_FIELDS[kind] not in changed_fields
+            ):
+                self._kinds[kind] = previous._kinds[kind]
+                continue
+            entries = builder(project_context)
+            known: Dict[str, _TermCounts] = {}
+            if previous is not None:
+                known = dict(
+                    zip(
+                        (entry.text for entry in previous._kinds[kind][0]),
+                        previous._kinds[kind][1],
+                    )
+                )
+            self._kinds[kind] = (
+                entries,
+                [
+                    known.get(entry.text) or _term_counts(entry.text)
+                    for entry in entries
+                ],
+            )
+        self.entries = [
+            entry for kind in _ENTRY_BUILDERS for entry in self._kinds[kind][0]
+        ]
+        documents = [
+            counts for kind in _ENTRY_BUILDERS for counts in self._kinds[kind][1]
+        ]
+        self.total_tokens = sum(entry.tokens for entry in self.entries)
+        self.full_prompt = render_context_prompt(project_context)
+
+        average_length = (
+            sum(length for _, length in documents) / len(documents)
+            if documents
+            else 0.0
+        )
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for index, (counts, length) in enumerate(documents):
+            length_norm = k1 * (
+                1 - b + b * (length / average_length if average_length else 0)
+            )
+            for term, frequency in counts.items():
+                weight = frequency * (k1 + 1) / (frequency + length_norm)
+                self._postings.setdefault(term, []).append((index, weight))
+        entry_count = len(self.entries)
+        self._idf = {
+            term: math.log(
+                1 + (entry_count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for term, postings in self._postings.items()
+        }
+        # Entry positions by "<kind>:<key>", the keys used in vector indexes.
+        self.positions: Dict[str, int] = {}
+        for position, entry in enumerate(self.entries):
+            self.positions.setdefault(f"{entry.kind}:{entry.key}", position)
+        self._lookup = context_lookup(project_context)
+
+    def score(self, query: str, file_path: Optional[str] = None) -> Dict[int, float]:
+        """Returns BM25 scores of the entries matching the query, by index."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for index, weight in self._postings[term]:
+                scores[index] = scores.get(index, 0.0) + idf * weight
+        if file_path:
+            for module in self._lookup.modules_for_path(file_path):
+                index = self.positions[f"key_module:{module.name}"]
+                scores[index] = scores.get(index, 0.0) + PATH_MATCH_BONUS
+        return scores
+
+    def vector_documents(
+        self, kinds: AbstractSet[str] = VECTOR_KINDS
+    ) -> Dict[str, str]:
+        """Texts of the entries to embed, keyed like ``positions``."""
+        return {
+            key: self.entries[position].text
+            for key, position in self.positions.items()
+            if self.entries[position].kind in kinds
+        }
+
+
+class PackedContext:
+    """
+    The entries of a ProjectContext selected for one request, with their
+    relevance scores, and the prompt text rendered from them.
+    """
+
+    def __init__(
+        self,
+        selected: List[ScoredEntry],
+        prompt: str,
+        tokens_used: int,
+        token_budget: int,
+        complete: bool,
+    ):
+        self.selected = selected
+        self.prompt = prompt
+        self.tokens_used = tokens_used
+        self.token_budget = token_budget
+        # True when every entry of the context fit into the budget.
+        self.complete = complete
+
+    def ranked(self, kind: str, matched_only: bool = False) -> List[ScoredEntry]:
+        """
+        Selected entries of one kind, most relevant first. With
+        ``matched_only``, entries that did not match the request are left out.
+        """
+        entries = [
+            scored
+            for scored in self.selected
+            if scored.entry.kind == kind and (scored.score > 0 or not matched_only)
+        ]
+        entries.sort(key=lambda scored: (-scored.score, scored.entry.position))
+        return entries
+
+    def ranked_modules(self, matched_only: bool = False) -> List[KeyModule]:
+        return [scored.entry.item for scored in self.ranked("key_module", matched_only)]
+
+    def ranked_standards(self, matched_only: bool = False) -> List[CodingStandard]:
+        return [
+            scored.entry.item for scored in self.ranked("coding_standard", matched_only)
+        ]
+
+    def ranked_requirements(
+        self, matched_only: bool = False
+    ) -> List[ProjectRequirement]:
+        return [
+            scored.entry.item for scored in self.ranked("requirement", matched_only)
+        ]
+
+    def ranked_file_annotations(
+        self, matched_only: bool = False
+    ) -> List[Tuple[str, str]]:
+        return [
+            scored.entry.item for scored in self.ranked("file_annotation", matched_only)
+        ]
+
+    def included_keys(self) -> List[str]:
+        return [scored.entry.key for scored in self.selected]
+
+
+class ContextPacker:
+    """
+    Selects the ProjectContext entries most relevant to a request under a
+    prompt token budget. Entries are ranked with BM25 against the request's
+    text (query, task description, file path, code identifiers) and added
+    best first until the budget is spent; unmatched entries then fill any
+    remaining room in a fixed kind order. The selection is rendered in the
+    context's own order, so when everything fits the prompt is identical to
+    render_context_prompt() and can be shared across requests.
+    Indexes are built once per context fingerprint.
+    With ``semantic=True``, entries are also matched by embedding similarity
+    through a VectorIndex kept per project, which is updated incrementally
+    when the context changes, so paraphrased queries find their entries.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        max_indexes: int = 8,
+        embedder: Optional[HashingEmbedder] = None,
+    ):
+        self.token_budget = token_budget
+        self.max_indexes = max_indexes
+        self.embedder = embedder or HashingEmbedder()
+        self._indexes: "OrderedDict[str, ContextIndex]" = OrderedDict()
+        self._vector_indexes: Dict[str, VectorIndex] = {}
+        # Fingerprint each project's vector index was last synced to.
+        self._vector_fingerprints: Dict[str, str] = {}
+        # Index lookups served from / missing from the index cache.
+        self.index_hits = 0
+        self.index_misses = 0
+
+    def index_for(
+        self, project_context: ProjectContext, fingerprint: str
+    ) -> ContextIndex:
+        index = self._indexes.get(fingerprint)
+        if index is None:
+            self.index_misses += 1
+            index = ContextIndex(project_context)
+            self._store_index(fingerprint, index)
+        else:
+            self.index_hits += 1
+            self._indexes.move_to_end(fingerprint)
+        return index
+
+    def advance(
+        self,
+        project_context: ProjectContext,
+        fingerprint: str,
+        previous_fingerprint: str,
+        changed_fields: AbstractSet[str],
+    ) -> ContextIndex:
+        """
+        Prepares the index (and the project's vector index, if it is synced
+        to the previous version) of a context version derived from the
+        version ``previous_fingerprint`` by replacing ``changed_fields``.
+        Only the entries of the changed fields are rebuilt or re-embedded.
+        """
+        index = self._indexes.get(fingerprint)
+        if index is None:
+            self.index_misses += 1
+            previous = self._indexes.get(previous_fingerprint)
+            index = ContextIndex(
+                project_context, previous=previous, changed_fields=changed_fields
+            )
+            self._store_index(fingerprint, index)
+        else:
+            self._indexes.move_to_end(fingerprint)
+
+        project_name = project_context.project_name
+        vectors = self._vector_indexes.get(project_name)
+        if (
+            vectors is not None
+            and self._vector_fingerprints.get(project_name) == previous_fingerprint
+        ):
+            kinds = {
+                kind for kind in VECTOR_KINDS if KIND_FIELDS[kind] in changed_fields
+            }
+            if kinds:
+                vectors.sync(
+                    index.vector_documents(kinds),
+                    prefixes=tuple(f"{kind}:" for kind in kinds),
+                )
+            self._vector_fingerprints[project_name] = fingerprint
+        else:
+            self.vector_index_for(project_context, fingerprint)
+        return index
+
+    def _store_index(self, fingerprint: str, index: ContextIndex) -> None:
+        self._indexes[fingerprint] = index
+        while len(self._indexes) > self.max_indexes:
+            self._indexes.popitem(last=False)
+
+    def vector_index_for(
+        self, project_context: ProjectContext, fingerprint: str
+    ) -> VectorIndex:
+        """Returns the project's vector index, synced to the given version."""
+        project_name = project_context.project_name
+        vectors = self._vector_indexes.get(project_name)
+        if vectors is None:
+            vectors = self._vector_indexes[project_name] = VectorIndex(self.embedder)
+        if self._vector_fingerprints.get(project_name) != fingerprint:
+            index = self.index_for(project_context, fingerprint)
+            vectors.sync(index.vector_documents())
+            self._vector_fingerprints[project_name] = fingerprint
+        return vectors
+
+    def pack(
+        self,
+        project_context: ProjectContext,
+        fingerprint: str,
+        query: str,
+        file_path: Optional[str] = None,
+        token_budget: Optional[int] = None,
+        semantic: bool = False,
+    ) -> PackedContext:
+        index = self.index_for(project_context, fingerprint)
+        budget = token_budget if token_budget is not None else self.token_budget
+        scores = index.score(query, file_path)
+        if semantic:
+            vectors = self.vector_index_for(project_context, fingerprint)
+            for hit in vectors.search(query, SEMANTIC_TOP_K, MIN_SIMILARITY):
+                position = index.positions[hit.key]
+                scores[position] = scores.get(position, 0.0) + (
+                    SEMANTIC_WEIGHT * hit.score
+                )
+
+        if index.total_tokens <= budget:
+            selected = [
+                ScoredEntry(entry, scores.get(position, 0.0))
+                for position, entry in enumerate(index.entries)
+            ]
+            return PackedContext(
+                selected, index.full_prompt, index.total_tokens, budget, True
+            )
+
+        kind_order = {kind: order for order, kind in enumerate(ENTRY_KINDS)}
+        candidates = sorted(
+            range(len(index.entries)),
+            key=lambda position: (
+                -scores.get(position, 0.0),
+                kind_order[index.entries[position].kind],
+                index.entries[position].position,
+            ),
+        )
+        chosen: List[int] = []
+        tokens_used = 0
+        for position in candidates:
+            entry = index.entries[position]
+            if tokens_used + entry.tokens > budget:
+                continue
+            chosen.append(position)
+            tokens_used += entry.tokens
+
+        chosen.sort()
+        selected = [
+            ScoredEntry(index.entries[position], scores.get(position, 0.0))
+            for position in chosen
+        ]
+        return PackedContext(
+            selected,
+            _render_selection(index.project_name, selected),
+            tokens_used,
+            budget,
+            len(chosen) == len(index.entries),
+        )
+
+
+def _render_selection(project_name: str, selected: Iterable[ScoredEntry]) -> str:
+    by_kind: Dict[str, List[Any]] = {kind: [] for kind in ENTRY_KINDS}
+    for scored in selected:
+        by_kind[scored.entry.kind].append(scored.entry.item)
+    return render_context_sections(
+        project_name,
+        by_kind["goal"],
+        by_kind["architecture"],
+        by_kind["key_module"],
+        by_kind["coding_standard"],
+        by_kind["requirement"],
+        by_kind["file_annotation"],
+    )
@@ -0,0 +1,90 @@
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Tuple
+
+from pydantic import BaseModel, Field
+
+if TYPE_CHECKING:  # context_manager imports this module.
+    from .context_manager import ContextVersion
+
+# Called with (project_id, version) when a context version is reclaimed.
+ReclaimListener = Callable[[str, int], None]
+
+
+class SnapshotStats(BaseModel):
+    """Point-in-time counters of a SnapshotTracker."""
+
+    published: int = Field(0, description="Versions registered with track().")
+    reclaimed: int = Field(0, description="Versions garbage collected since.")
+    live: int = Field(0, description="Versions still referenced somewhere.")
+    pinned: int = Field(0, description="Versions currently pinned by readers.")
+
+
+class SnapshotTracker:
+    """
+    Tracks the lifetime of immutable ProjectContext versions.
+    Versions share every unchanged list with their predecessor, so keeping
+    several alive is cheap, and readers pin one by reference with no copy:
+    pin() only counts the reader. Nothing here keeps a version alive; once
+    the current version has moved on and the last reader drops its
+    reference, the version is garbage collected and reclaim listeners are
+    told, so data derived from it (indexes, caches) can be released too.
+    """
+
+    def __init__(self) -> None:
+        self._live: Dict[Tuple[str, int], "weakref.finalize"] = {}
+        self._pins: "Counter[Tuple[str, int]]" = Counter()
+        self._listeners: List[ReclaimListener] = []
+        self._published = 0
+        self._reclaimed = 0
+
+    def add_reclaim_listener(self, listener: ReclaimListener) -> None:
+        self._listeners.append(listener)
+
+    def track(self, project_id: str, version: "ContextVersion") -> None:
+        """Registers a newly published version."""
+        key = (project_id, version.version)
+        if key in self._live:
+            return
+        self._live[key] = weakref.finalize(version.context, self._reclaim, key)
+        self._published += 1
+
+    @contextmanager
+    def pin(
+        self, project_id: str, version: "ContextVersion"
+    ) -> Iterator["ContextVersion"]:
+        """Marks ``version`` as in use by a reader for the duration of the block."""
+        key = (project_id, version.version)
+        self._pins[key] += 1
+        try:
+            yield version
+        finally:
+            self._pins[key] -= 1
+            if not self._pins[key]:
+                del self._pins[key]
+
+    def live_versions(self, project_id: str) -> List[int]:
+        """Versions of a project that have not been reclaimed yet."""
+        return sorted(
+            version for project, version in self._live if project == project_id
+        )
+
+    def pinned_versions(self, project_id: str) -> List[int]:
+        return sorted(
+            version for project, version in self._pins if project == project_id
+        )
+
+    def stats(self) -> SnapshotStats:
+        return SnapshotStats(
+            published=self._published,
+            reclaimed=self._reclaimed,
+            live=len(self._live),
+            pinned=len(self._pins),
+        )
+
+    def _reclaim(self, key: Tuple[str, int]) -> None:
+        self._live.pop(key, None)
+        self._reclaimed += 1
+        for listener in list(self._listeners):
+            listener(*key)
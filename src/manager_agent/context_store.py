@@ -0,0 +1,350 @@
+import asyncio
+import json
+import os
+import time
+from typing import IO, Any, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from .context_manager import ContextVersion, ProjectContext, apply_updates
+from .models import UpdateManagerContextRequest
+
+SNAPSHOT_FILE = "snapshot.json"
+LOG_FILE = "updates.log"
+
+
+class ContextStoreStats(BaseModel):
+    """Point-in-time counters of a ContextStore."""
+
+    version: int = Field(..., description="Latest durable context version.")
+    snapshot_version: int = Field(..., description="Version of the last snapshot.")
+    log_entries: int = Field(..., description="Batches logged since the snapshot.")
+    log_bytes: int = Field(..., description="Current size of the update log.")
+    replayed_entries: int = Field(0, description="Log entries replayed at startup.")
+    replay_seconds: float = Field(0.0, description="Startup load and replay time.")
+    appends: int = Field(0, description="Batches appended since startup.")
+    fsyncs: int = Field(0, description="Log fsyncs since startup.")
+    snapshots: int = Field(0, description="Snapshots written since startup.")
+
+
+def _fsync_directory(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # Directories cannot be opened on some platforms.
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_durably(path: str, data: bytes) -> None:
+    """Replaces ``path`` with ``data`` via fsync'ed temp file and rename."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    os.replace(temp_path, path)
+    _fsync_directory(os.path.dirname(path))
+
+
+class ContextStore:
+    """
+    Persistent, versioned ProjectContext of one project.
+
+    Every batch of updates is appended to ``updates.log`` as one JSON line,
+    under one version number, and is durable once append_many() returns.
+    Concurrent appends share fsyncs (group commit): each fsync runs in a
+    worker thread and covers every line written before it started;
+    ``fsync_delay`` can hold it back a little to gather larger groups.
+    Every ``snapshot_every`` batches the context is written to
+    ``snapshot.json`` and the log is truncated to the batches after it, so
+    startup loads the snapshot and replays only that tail. A torn last line
+    (an interrupted write) is dropped at startup; a corrupt line followed by
+    further records, or a complete line that is not a valid record, makes
+    open() raise ValueError instead.
+
+    ``current`` is the latest durable ContextVersion. Versions are immutable
+    and swapped in atomically, so readers always see one consistent version
+    while writes are in progress.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        initial_context: Optional[ProjectContext] = None,
+        snapshot_every: int = 1000,
+        fsync: bool = True,
+        fsync_delay: float = 0.0,
+    ):
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be >= 1")
+        self.directory = directory
+        self.initial_context = initial_context
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.fsync_delay = fsync_delay
+        self._log: Optional[IO[bytes]] = None
+        self._head: Optional[ContextVersion] = None
+        self._committed: Optional[ContextVersion] = None
+        self._durable_version = 0
+        self._snapshot_version = 0
+        # Log lines after the snapshot, with their versions.
+        self._tail: List[Tuple[int, bytes]] = []
+        self._log_bytes = 0
+        self._lock = asyncio.Lock()
+        self._sync_task: "Optional[asyncio.Future[None]]" = None
+        self._compaction: "Optional[asyncio.Future[int]]" = None
+        # Held for a whole compaction, so snapshots are written in order.
+        self._compaction_lock = asyncio.Lock()
+        self._replayed_entries = 0
+        self._replay_seconds = 0.0
+        self._appends = 0
+        self._fsyncs = 0
+        self._snapshots = 0
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.directory, LOG_FILE)
+
+    @property
+    def current(self) -> ContextVersion:
+        """The latest durable version of the context."""
+        if self._committed is None:
+            raise RuntimeError("ContextStore is not open")
+        return self._committed
+
+    async def open(self) -> "ContextStore":
+        """Loads the latest snapshot and replays the log after it."""
+        started = time.perf_counter()
+        await asyncio.to_thread(self._load)
+        self._replay_seconds = time.perf_counter() - started
+        return self
+
+    def _load(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as snapshot_file:
+                snapshot = json.loads(snapshot_file.read())
+            version = snapshot["version"]
+            context = ProjectContext.model_validate(snapshot["project_context"])
+        elif self.initial_context is not None:
+            version, context = 0, self.initial_context
+        else:
+            raise FileNotFoundError(
+                f"No context snapshot in {self.directory} and no initial context"
+            )
+        self._snapshot_version = version
+
+        valid_bytes = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as log_file:
+                for line in log_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    if record is None or not line.endswith(b"\n"):
+                        if log_file.read().strip():
+                            # Only the last write can be torn; anything
+                            # else is corruption that must not be dropped.
+                            raise ValueError(
+                                f"Corrupt record at byte {valid_bytes} of "
+                                f"{self.log_path}, followed by more records"
+                            )
+                        break  # A torn write at the end of the log; drop it.
+                    offset = valid_bytes
+                    valid_bytes += len(line)
+                    if not (
+                        isinstance(record, dict)
+                        and isinstance(record.get("version"), int)
+                        and isinstance(record.get("updates"), list)
+                    ):
+                        raise ValueError(
+                            f"Malformed record at byte {offset} of {self.log_path}"
+                        )
+                    if record["version"] <= version:
+                        continue  # Already covered by the snapshot.
+                    if record["version"] != version + 1:
+                        raise ValueError(
+                            f"Gap in {self.log_path}: expected version "
+                            f"{version + 1}, found {record['version']}"
+                        )
+                    try:
+                        updates = [
+                            (
+                                entry["update_id"],
+                                UpdateManagerContextRequest.model_validate(
+                                    entry["update"]
+                                ),
+                            )
+                            for entry in record["updates"]
+                        ]
+                    except (KeyError, TypeError, ValueError) as exc:
+                        raise ValueError(
+                            f"Malformed update in the record at byte {offset} "
+                            f"of {self.log_path}: {exc}"
+                        ) from exc
+                    context = apply_updates(context, updates)
+                    version += 1
+                    self._tail.append((version, line))
+            self._replayed_entries = len(self._tail)
+
+        self._log = open(self.log_path, "ab")
+        self._log.truncate(valid_bytes)
+        self._log_bytes = valid_bytes
+        self._head = self._committed = ContextVersion(version, context)
+        self._durable_version = version
+
+    async def append(
+        self, update: UpdateManagerContextRequest, update_id: str
+    ) -> ContextVersion:
+        """Applies and logs an update; returns the new version once durable."""
+        return (await self.append_many([(update_id, update)]))[1]
+
+    async def append_many(
+        self, updates: Sequence[Tuple[str, UpdateManagerContextRequest]]
+    ) -> Tuple[ContextVersion, ContextVersion]:
+        """
+        Applies and logs (update_id, update) pairs as a single new version.
+        Returns the previous and the new version once the batch is durable.
+        """
+        async with self._lock:
+            if self._log is None:
+                raise RuntimeError("ContextStore is not open")
+            assert self._head is not None
+            previous = self._head
+            head = ContextVersion(
+                previous.version + 1, apply_updates(previous.context, updates)
+            )
+            line = (
+                json.dumps(
+                    {
+                        "version": head.version,
+                        "updates": [
+                            {
+                                "update_id": update_id,
+                                "update": update.model_dump(mode="json"),
+                            }
+                            for update_id, update in updates
+                        ],
+                    },
+                    separators=(",", ":"),
+                ).encode("utf-8")
+                + b"\n"
+            )
+            self._log.write(line)
+            self._log.flush()
+            self._head = head
+            self._tail.append((head.version, line))
+            self._log_bytes += len(line)
+            self._appends += 1
+
+        if len(self._tail) >= self.snapshot_every and self._compaction is None:
+            self._compaction = asyncio.ensure_future(self.compact())
+            self._compaction.add_done_callback(self._compaction_done)
+        await self._wait_durable(head.version)
+        return previous, head
+
+    async def _wait_durable(self, version: int) -> None:
+        while self._durable_version < version:
+            if self._sync_task is None:
+                self._sync_task = asyncio.ensure_future(self._sync())
+            await asyncio.shield(self._sync_task)
+
+    async def _sync(self) -> None:
+        try:
+            if self.fsync_delay:
+                await asyncio.sleep(self.fsync_delay)
+            assert self._head is not None and self._log is not None
+            head = self._head
+            if self.fsync:
+                # A duplicate descriptor stays valid even if compaction swaps
+                # the log file while the fsync is running.
+                fd = os.dup(self._log.fileno())
+                try:
+                    await asyncio.to_thread(os.fsync, fd)
+                finally:
+                    os.close(fd)
+                self._fsyncs += 1
+            self._publish(head)
+        finally:
+            self._sync_task = None
+
+    def _publish(self, head: ContextVersion) -> None:
+        self._durable_version = max(self._durable_version, head.version)
+        assert self._committed is not None
+        if head.version > self._committed.version:
+            self._committed = head
+
+    async def compact(self) -> int:
+        """
+        Writes a snapshot of the latest version and truncates the log to
+        the updates after it. Returns the snapshot's version. Compactions
+        run one at a time, so an older one cannot overwrite a newer snapshot.
+        """
+        async with self._compaction_lock:
+            assert self._head is not None
+            head = self._head
+            if head.version == self._snapshot_version:
+                return head.version
+            snapshot = json.dumps(
+                {
+                    "version": head.version,
+                    "project_context": head.context.model_dump(mode="json"),
+                }
+            ).encode("utf-8")
+            await asyncio.to_thread(_write_durably, self.snapshot_path, snapshot)
+            self._snapshots += 1
+
+            # Appends wait while the log is swapped for its remaining tail.
+            async with self._lock:
+                assert self._log is not None
+                tail = [entry for entry in self._tail if entry[0] > head.version]
+                data = b"".join(line for _, line in tail)
+                await asyncio.to_thread(_write_durably, self.log_path, data)
+                self._log.close()
+                self._log = open(self.log_path, "ab")
+                self._tail = tail
+                self._log_bytes = len(data)
+                self._snapshot_version = head.version
+                # The rewritten log was fsync'ed, so everything is durable.
+                self._publish(self._head)
+            return head.version
+
+    def _compaction_done(self, task: "asyncio.Future[int]") -> None:
+        self._compaction = None
+
+    def stats(self) -> ContextStoreStats:
+        return ContextStoreStats(
+            version=self._durable_version,
+            snapshot_version=self._snapshot_version,
+            log_entries=len(self._tail),
+            log_bytes=self._log_bytes,
+            replayed_entries=self._replayed_entries,
+            replay_seconds=self._replay_seconds,
+            appends=self._appends,
+            fsyncs=self._fsyncs,
+            snapshots=self._snapshots,
+        )
+
+    async def close(self) -> None:
+        if self._compaction is not None:
+            await self._compaction
+        async with self._lock:
+            if self._head is not None:
+                await self._wait_durable(self._head.version)
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    async def __aenter__(self) -> "ContextStore":
+        return await self.open()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
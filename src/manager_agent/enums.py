@@ -23,6 +23,13 @@ class SeverityEnum(str, Enum):
     ERROR = "error"  # Also a StatusEnum, contextually different here
 
 
+class ValidationStageEnum(str, Enum):
+    # For ValidationStreamFrame, in the order frames arrive
+    STATIC_CHECKS = "static_checks"
+    MODEL = "model"
+    COMPLETE = "complete"  # The final frame
+
+
 class ReferenceTypeEnum(str, Enum):
     # For ReferenceItem in GetProjectAdviceResponse
     DOCUMENTATION = "documentation"
@@ -37,6 +44,7 @@ class UpdateTypeEnum(str, Enum):
     STYLE_GUIDE_CHANGE = "style_guide_change"
     FEATURE_SPECIFICATION = "feature_specification"
     FILE_ANNOTATION = "file_annotation"
+    SOURCE_SCAN = "source_scan"
 
 
 class SuggestionTypeEnum(str, Enum):
@@ -58,6 +66,12 @@ class PriorityEnum(str, Enum):
     HIGH = "high"
 
 
+class EncodingEnum(str, Enum):
+    # For StreamProactiveSuggestionsSubscriptionRequest and ResponseEncoder
+    JSON = "json"
+    MSGPACK = "msgpack"  # Smaller; requires the msgpack package
+
+
 class SubscriptionActionEnum(str, Enum):
     # For StreamProactiveSuggestionsSubscriptionRequest
     SUBSCRIBE = "subscribe"
@@ -0,0 +1,108 @@
+import uuid
+from typing import AsyncIterable, Iterable, List, Optional
+
+from .enums import SeverityEnum, StatusEnum, ValidationStageEnum
+from .models import (
+    LineRange,
+    ValidateCodeResponse,
+    ValidationFeedbackItem,
+    ValidationStreamFrame,
+)
+
+# Severities ordered from least to most serious.
+SEVERITY_RANK = {
+    SeverityEnum.INFO: 0,
+    SeverityEnum.SUGGESTION: 1,
+    SeverityEnum.WARNING: 2,
+    SeverityEnum.ERROR: 3,
+}
+
+
+def new_validation_id() -> str:
+    return f"validation-{uuid.uuid4().hex[:12]}"
+
+
+def worst_severity(
+    items: Iterable[ValidationFeedbackItem],
+) -> Optional[SeverityEnum]:
+    worst: Optional[SeverityEnum] = None
+    for item in items:
+        if worst is None or SEVERITY_RANK[item.severity] > SEVERITY_RANK[worst]:
+            worst = item.severity
+    return worst
+
+
+def status_for_feedback(items: Iterable[ValidationFeedbackItem]) -> StatusEnum:
+    """
+    Derives the overall validation status from the most severe feedback item:
+    errors need revision, warnings and suggestions are valid with suggestions
+    (see the workflow example in docs/blueprints.md), and informational
+    notes alone leave the code valid.
+    """
+    worst = worst_severity(items)
+    if worst == SeverityEnum.ERROR:
+        return StatusEnum.NEEDS_REVISION
+    if worst in (SeverityEnum.WARNING, SeverityEnum.SUGGESTION):
+        return StatusEnum.VALID_WITH_SUGGESTIONS
+    return StatusEnum.VALID
+
+
+def ranges_overlap(first: LineRange, second: LineRange) -> bool:
+    return first.start_line <= second.end_line and second.start_line <= first.end_line
+
+
+def offset_feedback_item(
+    item: ValidationFeedbackItem,
+    line_offset: int,
+    default_range: Optional[LineRange] = None,
+    item_id_suffix: Optional[str] = None,
+) -> ValidationFeedbackItem:
+    """
+    Returns a copy of a feedback item produced for a code fragment, with its
+    line range moved into whole-file coordinates. Items without a line range
+    are attached to ``default_range`` (usually the fragment itself).
+    """
+    if item.line_range is not None:
+        line_range: Optional[LineRange] = LineRange(
+            start_line=item.line_range.start_line + line_offset,
+            end_line=item.line_range.end_line + line_offset,
+        )
+    else:
+        line_range = default_range
+    update = {"line_range": line_range}
+    if item_id_suffix:
+        update["item_id"] = f"{item.item_id}:{item_id_suffix}"
+    return item.model_copy(update=update)
+
+
+def sort_feedback(items: List[ValidationFeedbackItem]) -> List[ValidationFeedbackItem]:
+    """Orders feedback by position, file-level items (no line range) first."""
+    return sorted(
+        items,
+        key=lambda item: (
+            item.line_range.start_line if item.line_range is not None else 0,
+            -SEVERITY_RANK[item.severity],
+        ),
+    )
+
+
+async def collect_validation_stream(
+    frames: AsyncIterable[ValidationStreamFrame],
+) -> ValidateCodeResponse:
+    """Collects a validation stream into the equivalent ValidateCodeResponse."""
+    validation_id = new_validation_id()
+    items: List[ValidationFeedbackItem] = []
+    status: Optional[StatusEnum] = None
+    async for frame in frames:
+        validation_id = frame.validation_id
+        if frame.feedback_item is not None:
+            items.append(frame.feedback_item)
+        if frame.stage == ValidationStageEnum.COMPLETE:
+            status = frame.status
+    if status is None:
+        raise ValueError("Validation stream ended without a final frame")
+    return ValidateCodeResponse(
+        validation_id=validation_id,
+        status=status,
+        feedback_items=sort_feedback(items),
+    )
@@ -0,0 +1,455 @@
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from pydantic import BaseModel, Field
+
+from .repo_scanner import DEFAULT_EXCLUDED_DIRS, is_excluded, walk_files
+
+# inotify(7) constants.
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+_WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class ChangeBatch(NamedTuple):
+    """Files changed during one burst, as paths relative to the watched root."""
+
+    changed: FrozenSet[str]  # Created or modified
+    deleted: FrozenSet[str]  # Deleted files; deleted directories end with "/"
+    # Events were lost (kernel queue overflow); anything may have changed.
+    overflow: bool = False
+
+    @property
+    def paths(self) -> FrozenSet[str]:
+        return self.changed | self.deleted
+
+
+class WatcherStats(BaseModel):
+    """Point-in-time counters of a FileWatcher."""
+
+    backend: str
+    watched_directories: int = Field(0, description="Directories being watched.")
+    events: int = Field(0, description="File events received.")
+    coalesced: int = Field(0, description="Events merged into a pending one.")
+    batches: int = Field(0, description="Batches delivered.")
+    overflows: int = Field(0, description="Times events were lost.")
+
+
+class FileWatcher(ABC):
+    """
+    Watches a directory tree and delivers changes as ChangeBatches.
+    Events are debounced: a batch is delivered once no event has arrived
+    for ``debounce`` seconds, or ``max_delay`` seconds after its first
+    event while changes keep coming. Repeated events for one file within a
+    batch are coalesced into one entry, so a burst (an editor's save, a
+    ``git checkout``) becomes a single batch naming each file once.
+    Only files ending with one of ``suffixes`` (any file when None) and
+    outside ``excluded_dirs`` are reported.
+    """
+
+    backend = "abstract"
+
+    def __init__(
+        self,
+        root: str,
+        debounce: float = 0.2,
+        max_delay: float = 2.0,
+        excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+        suffixes: Optional[Tuple[str, ...]] = (".py",),
+    ):
+        if debounce < 0 or max_delay < debounce:
+            raise ValueError("Expected 0 <= debounce <= max_delay")
+        self.root = os.path.abspath(root)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.excluded_dirs = frozenset(excluded_dirs)
+        self.suffixes = suffixes
+        # Pending changes by path: True if the last event was a deletion.
+        self._pending: Dict[str, bool] = {}
+        self._overflow = False
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._stats = WatcherStats(backend=self.backend)
+
+    @abstractmethod
+    async def start(self) -> "FileWatcher":
+        """Starts watching; changes are recorded from this point on."""
+
+    async def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+
+    async def __aenter__(self) -> "FileWatcher":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def stats(self) -> WatcherStats:
+        return self._stats.model_copy()
+
+    def _wanted(self, path: str) -> bool:
+        if self.suffixes is not None and not path.endswith(self.suffixes):
+            return False
+        return not is_excluded(path, self.excluded_dirs)
+
+    def _record(self, path: str, deleted: bool) -> None:
+        """Called by backends for each change to a file (or deleted directory)."""
+        if path.endswith("/"):
+            if is_excluded(path, self.excluded_dirs):
+                return
+        elif not self._wanted(path):
+            return
+        self._stats.events += 1
+        if path in self._pending:
+            self._stats.coalesced += 1
+        self._note_event()
+        self._pending[path] = deleted
+
+    def _record_overflow(self) -> None:
+        self._stats.overflows += 1
+        self._note_event()
+        self._overflow = True
+
+    def _note_event(self) -> None:
+        now = time.monotonic()
+        if not self._pending and not self._overflow:
+            self._first_event = now
+        self._last_event = now
+        self._wakeup.set()
+
+    async def next_batch(self) -> Optional[ChangeBatch]:
+        """Waits for the next debounced batch; None once the watcher is closed."""
+        while not self._pending and not self._overflow:
+            if self._closed:
+                return None
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        while not self._closed:
+            quiet_at = self._last_event + self.debounce
+            deadline = self._first_event + self.max_delay
+            delay = min(quiet_at, deadline) - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+
+        pending, self._pending = self._pending, {}
+        overflow, self._overflow = self._overflow, False
+        self._stats.batches += 1
+        return ChangeBatch(
+            changed=frozenset(path for path, deleted in pending.items() if not deleted),
+            deleted=frozenset(path for path, deleted in pending.items() if deleted),
+            overflow=overflow,
+        )
+
+    async def batches(self) -> AsyncIterator[ChangeBatch]:
+        """Yields debounced batches until the watcher is closed."""
+        while True:
+            batch = await self.next_batch()
+            if batch is None:
+                return
+            yield batch
+
+
+_libc: Optional[Any] = None
+
+
+def _load_libc() -> Optional[Any]:
+    global _libc
+    if _libc is None and sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(
+                ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+            )
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError):
+            return None
+        _libc = libc
+    return _libc
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    FileWatcher on Linux inotify, through libc via ctypes. Every directory
+    of the tree gets a watch, and the inotify descriptor is read from the
+    event loop, so no polling is involved. Directories are walked in a
+    worker thread: the tree at start(), and each new directory as it
+    appears (one at a time, in order). Raises OSError from start() when
+    inotify is unavailable or the watch limit (fs.inotify.max_user_watches)
+    is hit.
+    """
+
+    backend = "inotify"
+
+    def __init__(self, root: str, **options: Any):
+        super().__init__(root, **options)
+        self._fd = -1
+        self._directories: Dict[int, str] = {}  # Watch descriptor -> relative dir
+        self._buffer = b""
+        # New directories waiting to be walked, and the task walking them.
+        self._new_directories: "asyncio.Queue[str]" = asyncio.Queue()
+        self._walker: "Optional[asyncio.Future[None]]" = None
+        self._walk: "Optional[asyncio.Future[None]]" = None
+        # Events of unknown watches that arrived during a walk; they may
+        # belong to watches the walk added, so they are replayed after it.
+        self._early_events: List[Tuple[int, int, str]] = []
+
+    @staticmethod
+    def available() -> bool:
+        return _load_libc() is not None
+
+    async def start(self) -> "InotifyWatcher":
+        libc = _load_libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._fd = fd
+        watches: Dict[int, str] = {}
+        try:
+            await asyncio.to_thread(self._watch_tree, "", watches, None)
+        except OSError:
+            os.close(fd)
+            self._fd = -1
+            raise
+        self._adopt(watches, [])
+        asyncio.get_running_loop().add_reader(fd, self._read_events)
+        self._walker = asyncio.ensure_future(self._walk_new_directories())
+        return self
+
+    async def close(self) -> None:
+        if self._walker is not None:
+            self._walker.cancel()
+            await asyncio.gather(self._walker, return_exceptions=True)
+            self._walker = None
+        if self._walk is not None:
+            # The worker thread cannot be interrupted; let it finish before
+            # its descriptor is closed.
+            await asyncio.gather(self._walk, return_exceptions=True)
+        if self._fd >= 0:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = -1
+            self._directories.clear()
+        await super().close()
+
+    async def _walk_new_directories(self) -> None:
+        while True:
+            relative = await self._new_directories.get()
+            watches: Dict[int, str] = {}
+            files: List[str] = []
+            self._walk = asyncio.ensure_future(
+                asyncio.to_thread(self._watch_tree, relative, watches, files)
+            )
+            try:
+                await asyncio.shield(self._walk)
+            except OSError:
+                # Out of watches: the tree can no longer be followed.
+                self._record_overflow()
+            finally:
+                self._walk = None
+            self._adopt(watches, files)
+            early, self._early_events = self._early_events, []
+            for wd, mask, name in early:
+                if wd in self._directories:
+                    self._handle_event(wd, mask, name)
+
+    def _adopt(self, watches: Dict[int, str], files: List[str]) -> None:
+        """Takes over the watches and files found by _watch_tree()."""
+        self._directories.update(watches)
+        self._stats.watched_directories = len(self._directories)
+        for path in files:
+            self._record(path, False)
+
+    def _watch_tree(
+        self, relative: str, watches: Dict[int, str], files: Optional[List[str]]
+    ) -> None:
+        """
+        Watches ``relative`` and its subdirectories, adding each watch to
+        ``watches``. Files found in a directory that appeared after start()
+        are added to ``files``, as they may have been written before its
+        watch existed. Runs in a worker thread, so it leaves the watcher's
+        state to _adopt().
+        """
+        libc = _load_libc()
+        assert libc is not None
+        top = os.path.join(self.root, relative)
+        for directory, subdirectories, filenames in os.walk(top):
+            subdirectories[:] = [
+                name
+                for name in subdirectories
+                if name not in self.excluded_dirs and not name.endswith(".egg-info")
+            ]
+            path = os.path.relpath(directory, self.root).replace(os.sep, "/")
+            path = "" if path == "." else path
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    continue  # Removed while walking.
+                raise OSError(error, f"{os.strerror(error)}: {directory}")
+            watches[wd] = path
+            if files is not None:
+                files.extend(
+                    f"{path}/{filename}" if path else filename for filename in filenames
+                )
+
+    def _read_events(self) -> None:
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError:
+                return
+            if not data:
+                break
+            self._buffer += data
+        buffer, offset = self._buffer, 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            end = offset + _EVENT_HEADER.size + length
+            if end > len(buffer):
+                break
+            name = buffer[offset + _EVENT_HEADER.size : end].rstrip(b"\0")
+            offset = end
+            self._handle_event(wd, mask, os.fsdecode(name))
+        self._buffer = buffer[offset:]
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            self._record_overflow()
+            return
+        if mask & IN_IGNORED:
+            self._directories.pop(wd, None)
+            self._stats.watched_directories = len(self._directories)
+            return
+        directory = self._directories.get(wd)
+        if directory is None and self._walk is not None:
+            self._early_events.append((wd, mask, name))
+            return
+        if directory is None or not name:
+            return
+        path = f"{directory}/{name}" if directory else name
+        if mask & IN_ISDIR:
+            if name in self.excluded_dirs or name.endswith(".egg-info"):
+                return
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._new_directories.put_nowait(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._record(path + "/", True)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self._record(path, True)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MODIFY):
+            self._record(path, False)
+
+
+class PollingWatcher(FileWatcher):
+    """
+    Portable FileWatcher that stats the tree every ``interval`` seconds (in
+    a worker thread) and reports files whose mtime or size changed. Costs
+    one stat per file per interval, so prefer InotifyWatcher on Linux.
+    """
+
+    backend = "polling"
+
+    def __init__(self, root: str, interval: float = 1.0, **options: Any):
+        super().__init__(root, **options)
+        self.interval = interval
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._task: "Optional[asyncio.Future[None]]" = None
+
+    async def start(self) -> "PollingWatcher":
+        self._snapshot = await asyncio.to_thread(self._take_snapshot)
+        self._task = asyncio.ensure_future(self._poll())
+        return self
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await super().close()
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        found = walk_files(self.root, self.excluded_dirs, self.suffixes)
+        self._stats.watched_directories = len({os.path.dirname(path) for path in found})
+        return {path: (stat.st_mtime_ns, stat.st_size) for path, stat in found.items()}
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            snapshot = await asyncio.to_thread(self._take_snapshot)
+            previous, self._snapshot = self._snapshot, snapshot
+            for path, signature in snapshot.items():
+                if previous.get(path) != signature:
+                    self._record(path, False)
+            for path in previous.keys() - snapshot.keys():
+                self._record(path, True)
+
+
+async def open_watcher(root: str, **options: Any) -> FileWatcher:
+    """
+    Starts an InotifyWatcher where inotify works, and a PollingWatcher
+    otherwise (other platforms, or inotify watch limits exhausted).
+    Options are passed to the watcher (``interval`` only to polling).
+    """
+    interval = options.pop("interval", None)
+    if InotifyWatcher.available():
+        try:
+            return await InotifyWatcher(root, **options).start()
+        except OSError:
+            pass
+    if interval is not None:
+        options["interval"] = interval
+    return await PollingWatcher(root, **options).start()
@@ -0,0 +1,316 @@
+import asyncio
+import bisect
+import difflib
+import textwrap
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .code_units import (
+    CodeUnit,
+    extract_code_units,
+    innermost_unit,
+    parse_module,
+    statement_spans,
+)
+from .context_manager import ProjectContext, context_fingerprint
+from .enums import StatusEnum
+from .feedback import (
+    new_validation_id,
+    offset_feedback_item,
+    ranges_overlap,
+    sort_feedback,
+    status_for_feedback,
+)
+from .llm_interface import LLMInterface
+from .models import (
+    LineRange,
+    SelectionRange,
+    ValidateCodeRequest,
+    ValidateCodeResponse,
+    ValidationFeedbackItem,
+)
+
+
+class _Submission:
+    """The last fully validated version of a file."""
+
+    __slots__ = ("lines", "feedback_items", "fingerprint", "developer_intent")
+
+    def __init__(
+        self,
+        lines: List[str],
+        feedback_items: List[ValidationFeedbackItem],
+        fingerprint: str,
+        developer_intent: Optional[str],
+    ):
+        self.lines = lines
+        self.feedback_items = feedback_items
+        self.fingerprint = fingerprint
+        self.developer_intent = developer_intent
+
+
+def _diff_lines(
+    old_lines: List[str], new_lines: List[str]
+) -> Tuple[Dict[int, int], Set[int]]:
+    """
+    Diffs two versions of a file. Returns a map from unchanged old line
+    numbers to their new line numbers, and the set of new line numbers that
+    were inserted or modified (or border a deletion). Lines are 1-based.
+    """
+    line_map: Dict[int, int] = {}
+    changed_lines: Set[int] = set()
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for offset in range(i2 - i1):
+                line_map[i1 + offset + 1] = j1 + offset + 1
+        elif tag == "delete":
+            changed_lines.update(
+                line for line in (j1, j1 + 1) if 1 <= line <= len(new_lines)
+            )
+        else:
+            changed_lines.update(range(j1 + 1, j2 + 1))
+    return line_map, changed_lines
+
+
+def _shift_feedback(
+    items: List[ValidationFeedbackItem],
+    line_map: Dict[int, int],
+    keep_file_level: bool,
+) -> List[ValidationFeedbackItem]:
+    """
+    Moves previous feedback to new line positions. Items whose range touches
+    changed lines are dropped. Items without a line range are file-level;
+    region validation cannot re-derive them, so they are only kept while
+    ``keep_file_level`` (nothing changed).
+    """
+    shifted: List[ValidationFeedbackItem] = []
+    for item in items:
+        if item.line_range is None:
+            if keep_file_level:
+                shifted.append(item)
+            continue
+        start = line_map.get(item.line_range.start_line)
+        end = line_map.get(item.line_range.end_line)
+        if start is None or end is None:
+            continue
+        if end - start != item.line_range.end_line - item.line_range.start_line:
+            continue  # Lines were inserted or removed inside the range.
+        if start == item.line_range.start_line:
+            shifted.append(item)
+        else:
+            shifted.append(
+                item.model_copy(
+                    update={"line_range": LineRange(start_line=start, end_line=end)}
+                )
+            )
+    return shifted
+
+
+def _dirty_regions(
+    lines: List[str],
+    units: List[CodeUnit],
+    statements: List[Tuple[int, int]],
+    changed_lines: Set[int],
+) -> List[LineRange]:
+    """
+    Expands changed lines to the innermost function, method or class that
+    contains them. Other changed lines are expanded to the module-level
+    statement around them (so that a region is valid code on its own);
+    changed lines between statements are kept as single lines, unless they
+    are blank or only a comment. Overlapping regions are merged.
+    """
+    statement_starts = [start for start, _ in statements]
+    spans: List[Tuple[int, int]] = []
+    for line in sorted(changed_lines):
+        unit = innermost_unit(units, line)
+        if unit is not None:
+            spans.append((unit.start_line, unit.end_line))
+            continue
+        index = bisect.bisect_right(statement_starts, line) - 1
+        if index >= 0 and statements[index][1] >= line:
+            spans.append(statements[index])
+        elif line <= len(lines) and lines[line - 1].strip()[:1] not in ("", "#"):
+            spans.append((line, line))
+    spans.sort()
+    merged: List[List[int]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [LineRange(start_line=start, end_line=end) for start, end in merged]
+
+
+def _selected_lines(
+    selection_range: Optional[SelectionRange], line_count: int
+) -> Set[int]:
+    if selection_range is None:
+        return set()
+    start = max(1, selection_range.start_line)
+    end = min(line_count, selection_range.end_line)
+    return set(range(start, end + 1))
+
+
+class IncrementalValidator:
+    """
+    Region-scoped re-validation on top of LLMInterface.
+    The last validated version of each file is kept, and a new submission is
+    diffed against it so that only the functions, methods or classes that
+    changed are sent to the model. Feedback for unchanged code is carried
+    over with its line range shifted to the new positions.
+    A request's ``selection_range`` marks its lines as changed, so the units
+    it covers are always re-analyzed. Without a previous version, only the
+    selection is analyzed and the result is not kept as a baseline.
+    """
+
+    def __init__(
+        self,
+        llm_interface: LLMInterface,
+        max_files: int = 256,
+        full_revalidation_ratio: float = 0.5,
+    ):
+        self.llm_interface = llm_interface
+        self.max_files = max_files
+        # Above this fraction of changed lines, re-validating the whole file
+        # is cheaper than stitching many region results together.
+        self.full_revalidation_ratio = full_revalidation_ratio
+        self._submissions: "OrderedDict[str, _Submission]" = OrderedDict()
+
+    def forget(self, file_path: str) -> None:
+        """Drops the stored version of a file, forcing a full validation."""
+        self._submissions.pop(file_path, None)
+
+    async def validate(
+        self, request: ValidateCodeRequest, project_context: ProjectContext
+    ) -> ValidateCodeResponse:
+        lines = request.code_content.splitlines()
+        fingerprint = context_fingerprint(project_context)
+        previous = self._submissions.get(request.file_path)
+        if previous is not None and (
+            previous.fingerprint != fingerprint
+            or previous.developer_intent != request.developer_intent
+        ):
+            previous = None
+
+        selected_lines = _selected_lines(request.selection_range, len(lines))
+        if previous is None:
+            if not selected_lines:
+                return await self._validate_full(
+                    request, project_context, lines, fingerprint
+                )
+            carried_items: List[ValidationFeedbackItem] = []
+            changed_lines = selected_lines
+        else:
+            line_map, changed_lines = _diff_lines(previous.lines, lines)
+            changed_lines |= selected_lines
+            if len(changed_lines) > self.full_revalidation_ratio * len(lines):
+                return await self._validate_full(
+                    request, project_context, lines, fingerprint
+                )
+            carried_items = _shift_feedback(
+                previous.feedback_items, line_map, keep_file_level=not changed_lines
+            )
+
+        tree = parse_module(request.code_content)
+        if tree is None:
+            # Regions of code that does not parse cannot be checked on their
+            # own; the full validation reports the syntax error.
+            return await self._validate_full(
+                request, project_context, lines, fingerprint
+            )
+        regions = _dirty_regions(
+            lines, extract_code_units(tree), statement_spans(tree), changed_lines
+        )
+        carried_items = [
+            item
+            for item in carried_items
+            if item.line_range is None
+            or not any(ranges_overlap(item.line_range, region) for region in regions)
+        ]
+
+        region_responses = await asyncio.gather(
+            *(
+                self._validate_region(request, project_context, lines, region)
+                for region in regions
+            )
+        )
+        feedback_items = list(carried_items)
+        for region_items in region_responses:
+            if region_items is None:
+                # A region failed; do not stitch a partial result together.
+                return await self._validate_full(
+                    request, project_context, lines, fingerprint
+                )
+            feedback_items.extend(region_items)
+        feedback_items = sort_feedback(feedback_items)
+
+        if previous is not None:
+            self._remember(request, lines, feedback_items, fingerprint)
+        return ValidateCodeResponse(
+            validation_id=new_validation_id(),
+            status=status_for_feedback(feedback_items),
+            feedback_items=feedback_items,
+        )
+
+    async def _validate_full(
+        self,
+        request: ValidateCodeRequest,
+        project_context: ProjectContext,
+        lines: List[str],
+        fingerprint: str,
+    ) -> ValidateCodeResponse:
+        response = await self.llm_interface.analyze_code_for_validation(
+            request.code_content,
+            request.file_path,
+            project_context,
+            request.developer_intent,
+        )
+        if response.status == StatusEnum.ERROR:
+            self.forget(request.file_path)
+        else:
+            self._remember(request, lines, response.feedback_items, fingerprint)
+        return response
+
+    async def _validate_region(
+        self,
+        request: ValidateCodeRequest,
+        project_context: ProjectContext,
+        lines: List[str],
+        region: LineRange,
+    ) -> Optional[List[ValidationFeedbackItem]]:
+        # Methods are indented; dedenting keeps line numbers unchanged.
+        snippet = textwrap.dedent(
+            "\n".join(lines[region.start_line - 1 : region.end_line])
+        )
+        response = await self.llm_interface.analyze_code_for_validation(
+            snippet,
+            request.file_path,
+            project_context,
+            request.developer_intent,
+        )
+        if response.status == StatusEnum.ERROR:
+            return None
+        return [
+            offset_feedback_item(
+                item,
+                region.start_line - 1,
+                default_range=region,
+                item_id_suffix=f"L{region.start_line}",
+            )
+            for item in response.feedback_items
+        ]
+
+    def _remember(
+        self,
+        request: ValidateCodeRequest,
+        lines: List[str],
+        feedback_items: List[ValidationFeedbackItem],
+        fingerprint: str,
+    ) -> None:
+        self._submissions[request.file_path] = _Submission(
+            lines, list(feedback_items), fingerprint, request.developer_intent
+        )
+        self._submissions.move_to_end(request.file_path)
+        while len(self._submissions) > self.max_files:
+            self._submissions.popitem(last=False)
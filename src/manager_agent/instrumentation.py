@@ -0,0 +1,380 @@
+"""
+Metrics and tracing for LLMInterface: per-capability latency histograms,
+queue wait versus model time, token counts, payload sizes and cache hit
+rates, exposed in the Prometheus text format, plus tracing hooks notified
+of timed spans (context packing, static checks, model calls, response
+building). A disabled Instrumentation turns every call into a no-op.
+"""
+
+import bisect
+import logging
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .llm_backends import LLMCompletion
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "manager_agent_"
+
+# Upper bounds of histogram buckets, by metric name suffix.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+_HELP = {
+    "request_seconds": "Time to answer a capability request.",
+    "stage_seconds": "Time spent in one stage (span) of a request.",
+    "queue_wait_seconds": "Time a request waited for a free slot.",
+    "model_seconds": "Time the model took to answer, excluding queue wait.",
+    "prompt_tokens": "Prompt tokens per model call.",
+    "completion_tokens": "Completion tokens per model call.",
+    "prompt_bytes": "Prompt size per model call.",
+    "completion_bytes": "Model response payload size per model call.",
+    "requests_total": "Capability requests received.",
+    "request_errors_total": "Capability requests that raised an exception.",
+    "cache_hits_total": "Lookups answered by a cache.",
+    "cache_misses_total": "Lookups a cache could not answer.",
+    "cache_hit_ratio": "Fraction of lookups answered by a cache.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar(
+    "manager_agent_span", default=None
+)
+
+
+def _buckets_for(name: str) -> Sequence[float]:
+    if name.endswith("_bytes"):
+        return SIZE_BUCKETS
+    if name.endswith("_tokens"):
+        return TOKEN_BUCKETS
+    return LATENCY_BUCKETS
+
+
+class Histogram:
+    """Counts of observations per bucket, with their sum (Prometheus style)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # The last is +Inf.
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(upper bound, observations <= bound) pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(
+            [*map(_format_value, self.bounds), "+Inf"], self.counts
+        ):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """Upper bound of the bucket holding the quantile; None if empty."""
+        if not self.count:
+            return None
+        rank = quantile * self.count
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class Sample(NamedTuple):
+    """One value reported by a collector at exposition time."""
+
+    name: str  # Without PREFIX.
+    labels: Dict[str, str]
+    value: float
+    kind: str = "gauge"  # Or "counter".
+
+
+class Span:
+    """
+    One timed stage of a request. ``parent`` is the span that was open
+    when this one started (the request span, for stages).
+    """
+
+    __slots__ = ("name", "capability", "attributes", "parent", "started", "ended")
+
+    def __init__(
+        self,
+        name: str,
+        capability: str,
+        attributes: Dict[str, Any],
+        parent: Optional["Span"],
+    ):
+        self.name = name
+        self.capability = capability
+        self.attributes = attributes
+        self.parent = parent
+        self.started = 0.0
+        self.ended: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        ended = self.ended if self.ended is not None else time.perf_counter()
+        return ended - self.started
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class TracingHook:
+    """
+    Receives spans as they start and end, e.g. to forward them to a tracing
+    system. Hooks run inline with requests and must be quick; exceptions
+    they raise are logged and ignored.
+    """
+
+    def span_started(self, span: Span) -> None:
+        """Called when a span starts."""
+
+    def span_ended(self, span: Span) -> None:
+        """
+        Called when a span ends. If it raised, ``attributes["error"]`` names
+        the exception type.
+        """
+
+
+class _SpanScope:
+    __slots__ = ("_instrumentation", "_span", "_token")
+
+    def __init__(self, instrumentation: "Instrumentation", span: Span):
+        self._instrumentation = instrumentation
+        self._span = span
+
+    def __enter__(self) -> Span:
+        span = self._span
+        span.started = time.perf_counter()
+        self._token = _current_span.set(span)
+        self._instrumentation._notify("span_started", span)
+        return span
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        span = self._span
+        span.ended = time.perf_counter()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            span.attributes["error"] = exc_type.__name__
+        self._instrumentation._span_ended(span)
+
+
+class Instrumentation:
+    """
+    Collects the metrics of one or more LLMInterfaces. Histograms and
+    counters are labelled by capability (and stage, queue, ...) and created
+    on first use; collectors add values read at exposition time, such as
+    cache hit rates. render_prometheus() returns everything in the
+    Prometheus text exposition format.
+    span() times a stage: the duration is recorded as ``stage_seconds``
+    (``request_seconds`` for the "request" span) and every TracingHook is
+    notified. With ``enabled=False`` nothing is recorded and span() returns
+    a shared no-op context manager.
+    """
+
+    def __init__(self, enabled: bool = True, hooks: Iterable[TracingHook] = ()):
+        self.enabled = enabled
+        self.hooks: List[TracingHook] = list(hooks)
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def add_hook(self, hook: TracingHook) -> None:
+        self.hooks.append(hook)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Registers a function reporting Samples when metrics are rendered."""
+        self._collectors.append(collector)
+
+    def span(
+        self, name: str, capability: str, **attributes: Any
+    ) -> ContextManager[Optional[Span]]:
+        if not self.enabled:
+            return _DISABLED
+        return _SpanScope(self, Span(name, capability, attributes, _current_span.get()))
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Adds an observation to a histogram (buckets chosen by name suffix)."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(_buckets_for(name))
+        histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def record_model_call(
+        self, capability: str, prompt: str, completion: LLMCompletion, seconds: float
+    ) -> None:
+        """Records tokens, payload sizes and queue wait versus model time."""
+        if not self.enabled:
+            return
+        self.observe(
+            "queue_wait_seconds",
+            completion.queue_seconds,
+            capability=capability,
+            queue="backend",
+        )
+        self.observe(
+            "model_seconds",
+            max(0.0, seconds - completion.queue_seconds),
+            capability=capability,
+        )
+        self.observe("prompt_tokens", completion.prompt_tokens, capability=capability)
+        self.observe(
+            "completion_tokens", completion.completion_tokens, capability=capability
+        )
+        self.observe("prompt_bytes", len(prompt.encode("utf-8")), capability=capability)
+        self.observe(
+            "completion_bytes",
+            len(completion.text.encode("utf-8")),
+            capability=capability,
+        )
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def reset(self) -> None:
+        """Drops recorded histograms and counters (collectors are kept)."""
+        self._histograms.clear()
+        self._counters.clear()
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        histograms: Dict[str, List[Tuple[Labels, Histogram]]] = {}
+        for (name, labels), histogram in self._histograms.items():
+            histograms.setdefault(name, []).append((labels, histogram))
+        for name in sorted(histograms):
+            _describe(lines, name, "histogram")
+            for labels, histogram in sorted(histograms[name], key=lambda h: h[0]):
+                metric = PREFIX + name
+                for bound, count in histogram.cumulative():
+                    lines.append(
+                        f"{metric}_bucket{_labels(labels, ('le', bound))} {count}"
+                    )
+                lines.append(
+                    f"{metric}_sum{_labels(labels)} {_format_value(histogram.sum)}"
+                )
+                lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+
+        samples: Dict[str, List[Tuple[Labels, float, str]]] = {}
+        for (name, labels), value in self._counters.items():
+            samples.setdefault(name, []).append((labels, value, "counter"))
+        for collector in self._collectors:
+            try:
+                collected = list(collector())
+            except Exception:
+                logger.exception("Metrics collector %r failed", collector)
+                continue
+            for sample in collected:
+                samples.setdefault(sample.name, []).append(
+                    (tuple(sorted(sample.labels.items())), sample.value, sample.kind)
+                )
+        for name in sorted(samples):
+            _describe(lines, name, samples[name][0][2])
+            for labels, value, _ in sorted(samples[name], key=lambda s: s[0]):
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _span_ended(self, span: Span) -> None:
+        if span.name == "request":
+            self.observe("request_seconds", span.duration, capability=span.capability)
+            self.increment("requests_total", capability=span.capability)
+            if "error" in span.attributes:
+                self.increment("request_errors_total", capability=span.capability)
+        else:
+            self.observe(
+                "stage_seconds",
+                span.duration,
+                capability=span.capability,
+                stage=span.name,
+            )
+        self._notify("span_ended", span)
+
+    def _notify(self, event: str, span: Span) -> None:
+        for hook in self.hooks:
+            try:
+                getattr(hook, event)(span)
+            except Exception:
+                logger.exception("Tracing hook %r failed", hook)
+
+
+_DISABLED: ContextManager[Optional[Span]] = nullcontext()
+
+
+def _describe(lines: List[str], name: str, kind: str) -> None:
+    help_text = _HELP.get(name)
+    if help_text:
+        lines.append(f"# HELP {PREFIX}{name} {help_text}")
+    lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+
+def _labels(labels: Labels, *extra: Tuple[str, str]) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    rendered = ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs)
+    return "{" + rendered + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,150 @@
+import asyncio
+import itertools
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel, Field
+
+
+class LLMCompletion(BaseModel):
+    """The raw result of one model call."""
+
+    text: str = Field(..., description="The model's output text.")
+    prompt_tokens: int = Field(0, description="Tokens consumed by the prompt.")
+    completion_tokens: int = Field(0, description="Tokens produced by the model.")
+    queue_seconds: float = Field(
+        0.0, description="Time waiting for a free connection slot before sending."
+    )
+
+
+class LLMBackendError(Exception):
+    """Raised when a model call fails and retrying will not help."""
+
+
+class TransientLLMBackendError(LLMBackendError):
+    """Raised when a model call failed in a way that may succeed on retry."""
+
+
+class LLMBackend(ABC):
+    """
+    A model provider used by LLMInterface.
+    Implementations own any network resources they open; LLMInterface.close()
+    releases them through close().
+    """
+
+    @abstractmethod
+    async def complete(self, capability: str, prompt: str) -> LLMCompletion:
+        """Sends a prompt for the given MCP capability to the model."""
+
+    async def close(self) -> None:  # noqa: B027 - optional hook
+        """Releases resources held by the backend."""
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPLLMBackend(LLMBackend):
+    """
+    Talks to one or more model servers over a pooled, keep-alive async HTTP
+    client, so capabilities reuse connections instead of paying TCP/TLS setup
+    per call. Requests are spread round-robin over ``base_urls`` and each
+    host is limited to ``per_host_limit`` concurrent requests. HTTP/2 is
+    used when requested and the ``h2`` package is installed.
+    The expected protocol is ``POST {base_url}/v1/complete`` with a JSON
+    body ``{"capability": ..., "prompt": ...}``, answered by
+    ``{"text": ..., "usage": {"prompt_tokens": ..., "completion_tokens": ...}}``
+    (see stub_model_server.py).
+    """
+
+    def __init__(
+        self,
+        base_urls: Union[str, Sequence[str]],
+        api_key: Optional[str] = None,
+        pool_size: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        per_host_limit: Optional[int] = None,
+        http2: bool = True,
+        timeout: float = 60.0,
+        endpoint: str = "/v1/complete",
+    ):
+        try:
+            import httpx
+        except ImportError as exc:  # pragma: no cover - dependency is declared
+            raise ImportError("HTTPLLMBackend requires the 'httpx' package") from exc
+
+        self._httpx = httpx
+        self.base_urls: List[str] = (
+            [base_urls] if isinstance(base_urls, str) else list(base_urls)
+        )
+        if not self.base_urls:
+            raise ValueError("At least one base URL is required")
+        self.endpoint = endpoint
+        self.http2 = http2 and _http2_available()
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=self.http2,
+            timeout=timeout,
+            headers=headers,
+        )
+        self._next_url = itertools.cycle(self.base_urls)
+        self._host_slots: Dict[str, asyncio.Semaphore] = (
+            {url: asyncio.Semaphore(per_host_limit) for url in self.base_urls}
+            if per_host_limit
+            else {}
+        )
+
+    async def complete(self, capability: str, prompt: str) -> LLMCompletion:
+        base_url = next(self._next_url)
+        slot = self._host_slots.get(base_url)
+        if slot is None:
+            return await self._post(base_url, capability, prompt)
+        started = time.perf_counter()
+        async with slot:
+            queue_seconds = time.perf_counter() - started
+            completion = await self._post(base_url, capability, prompt)
+        completion.queue_seconds = queue_seconds
+        return completion
+
+    async def _post(self, base_url: str, capability: str, prompt: str) -> LLMCompletion:
+        httpx = self._httpx
+        try:
+            response = await self._client.post(
+                base_url.rstrip("/") + self.endpoint,
+                json={"capability": capability, "prompt": prompt},
+            )
+        except httpx.TimeoutException as exc:
+            raise TransientLLMBackendError(f"Model request timed out: {exc}") from exc
+        except httpx.TransportError as exc:
+            raise TransientLLMBackendError(f"Model request failed: {exc}") from exc
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientLLMBackendError(
+                f"Model server returned HTTP {response.status_code}"
+            )
+        if response.status_code >= 400:
+            raise LLMBackendError(f"Model server returned HTTP {response.status_code}")
+        try:
+            payload: Dict[str, Any] = response.json()
+            usage = payload.get("usage") or {}
+            return LLMCompletion(
+                text=payload["text"],
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            raise LLMBackendError(f"Malformed model server response: {exc}") from exc
+
+    async def close(self) -> None:
+        await self._client.aclose()
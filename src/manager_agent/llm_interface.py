@@ -1,23 +1,167 @@
-from typing import AsyncGenerator, List, Optional
+import asyncio
+import itertools
+import random
+import time
+import uuid
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pydantic import BaseModel, ValidationError
 
-from .context_manager import ProjectContext
+from .context_manager import KeyModule, ProjectContext, context_fingerprint
+from .context_packing import ContextPacker, PackedContext, code_query_terms
 from .enums import (
+    EncodingEnum,
     PriorityEnum,
     ReferenceTypeEnum,
     SeverityEnum,
     StatusEnum,
     SuggestionTypeEnum,
+    ValidationStageEnum,
 )
+from .feedback import new_validation_id, sort_feedback, status_for_feedback
+from .instrumentation import Instrumentation, Sample
+from .llm_backends import LLMBackend, LLMBackendError, LLMCompletion
 from .models import (
+    BatchValidateCodeRequest,
+    BatchValidateCodeResponse,
+    BatchValidationResultItem,
     DataModelToUse,
     GetProjectAdviceResponse,
     GetTaskStartingContextResponse,
     ProactiveSuggestionItem,
     ReferenceItem,
     RelevantModuleOrInterface,
+    ValidateCodeRequest,
     ValidateCodeResponse,
     ValidationFeedbackItem,
+    ValidationStreamFrame,
+)
+from .persistent_cache import PersistentResponseCache
+from .prompts import (
+    render_advice_prompt,
+    render_task_context_prompt,
+    render_validation_prompt,
 )
+from .resilience import (
+    HedgingPolicy,
+    LatencyTracker,
+    RetryPolicy,
+    call_with_retries,
+    deadline_scope,
+    run_within_deadline,
+    without_deadline,
+)
+from .serialization import ResponseEncoder
+from .single_flight import SingleFlight, normalize_text
+from .static_checks import StaticChecker, StaticCheckResult
+from .update_queue import ContextChange
+from .validation_cache import ValidationCache
+
+if TYPE_CHECKING:  # change_pipeline imports this module.
+    from .change_pipeline import ChangePipeline
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+# Default per-capability deadlines, in seconds.
+DEFAULT_DEADLINES: Dict[str, Optional[float]] = {
+    "validate_code": 30.0,
+    "generate_advice": 60.0,
+    "generate_task_starting_context": 60.0,
+}
+
+# Most references/modules filled in from the context ranking when a model
+# response names none.
+_MAX_RANKED_ITEMS = 5
+
+# Batch statuses ordered from best to worst.
+_STATUS_RANK = {
+    StatusEnum.VALID: 0,
+    StatusEnum.VALID_WITH_SUGGESTIONS: 1,
+    StatusEnum.NEEDS_REVISION: 2,
+    StatusEnum.ERROR: 3,
+}
+
+
+def _worst_status(statuses: Iterable[StatusEnum]) -> StatusEnum:
+    return max(
+        statuses,
+        key=lambda status: _STATUS_RANK.get(status, 0),
+        default=StatusEnum.VALID,
+    )
+
+
+def _with_static_feedback(
+    response: ValidateCodeResponse, static_items: List[ValidationFeedbackItem]
+) -> ValidateCodeResponse:
+    """Merges static check findings into a model's validation response."""
+    return response.model_copy(
+        update={
+            "status": _worst_status(
+                [response.status, status_for_feedback(static_items)]
+            ),
+            "feedback_items": sort_feedback([*static_items, *response.feedback_items]),
+        }
+    )
+
+
+def _batch_error_response(file_path: str, exc: Exception) -> ValidateCodeResponse:
+    return ValidateCodeResponse(
+        validation_id=f"batch-error-{uuid.uuid4().hex[:12]}",
+        status=StatusEnum.ERROR,
+        feedback_items=[
+            ValidationFeedbackItem(
+                item_id="batch-error",
+                severity=SeverityEnum.ERROR,
+                message=f"Validation failed: {exc}",
+                file_path=file_path,
+            )
+        ],
+    )
+
+
+def _module_reference(module: KeyModule) -> ReferenceItem:
+    return ReferenceItem(
+        reference_type=ReferenceTypeEnum.CODE_EXAMPLE,
+        path_or_url=(
+            module.path if module.path else f"module/{module.name.lower()}.py"
+        ),
+        description=f"Example usage in {module.name}",
+    )
+
+
+def _file_reference(path: str, note: str) -> ReferenceItem:
+    return ReferenceItem(
+        reference_type=ReferenceTypeEnum.FILE, path_or_url=path, description=note
+    )
+
+
+def _ranked_references(packed_context: PackedContext) -> List[ReferenceItem]:
+    """References to the modules and files that matched the request."""
+    references = [
+        _module_reference(module)
+        for module in packed_context.ranked_modules(matched_only=True)
+    ]
+    references.extend(
+        _file_reference(path, note)
+        for path, note in packed_context.ranked_file_annotations(matched_only=True)
+    )
+    return references[:_MAX_RANKED_ITEMS]
 
 
 class LLMInterface:
@@ -25,9 +169,61 @@ class LLMInterface:
     Interface for communication with a Large Language Model (LLM).
     This class defines methods for various LLM-driven analyses and content
     generation tasks required by the Manager Agent's capabilities.
-    Initially, these methods will return mock responses.
+    Model calls go through a pluggable LLMBackend; without one, these
+    methods return mock responses.
     """
 
+    def __init__(
+        self,
+        validation_cache: Optional[ValidationCache] = None,
+        batch_concurrency: int = 8,
+        backend: Optional[LLMBackend] = None,
+        deadlines: Optional[Dict[str, Optional[float]]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedging_policy: Optional[HedgingPolicy] = None,
+        context_packer: Optional[ContextPacker] = None,
+        static_checker: Optional[StaticChecker] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        response_cache: Optional[PersistentResponseCache] = None,
+    ):
+        # Without a backend, every capability returns mock responses.
+        self.backend = backend
+        # Per-capability deadlines in seconds (None means no deadline).
+        self.deadlines: Dict[str, Optional[float]] = {
+            **DEFAULT_DEADLINES,
+            **(deadlines or {}),
+        }
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedging_policy = hedging_policy or HedgingPolicy()
+        self.latency_tracker = LatencyTracker()
+        self._rng = random.Random()
+        # Validation results are cached by default; pass
+        # ValidationCache(max_entries=0) to disable caching.
+        self.validation_cache = (
+            validation_cache if validation_cache is not None else ValidationCache()
+        )
+        if batch_concurrency < 1:
+            raise ValueError("batch_concurrency must be >= 1")
+        self.batch_concurrency = batch_concurrency
+        # Concurrent identical requests share one model call.
+        self.single_flight = SingleFlight()
+        # Selects the context entries sent with each request.
+        self.context_packer = context_packer or ContextPacker()
+        # Coding standards that can be checked deterministically are checked
+        # before the model; pass StaticChecker(rules=[]) to disable.
+        self.static_checker = static_checker or StaticChecker()
+        # Latency, token, payload and cache metrics plus tracing spans; pass
+        # Instrumentation(enabled=False) to disable.
+        self.instrumentation = instrumentation or Instrumentation()
+        self.instrumentation.add_collector(self._cache_samples)
+        # Encodes responses for the transport (see encode_response()); shared
+        # responses such as cached validations are encoded once. Pass it to
+        # SuggestionBroker(encoder=...) to share it with the suggestion stream.
+        self.response_encoder = ResponseEncoder()
+        # Advice and task starting contexts generated by the model are shared
+        # with other worker processes (and restarts) through this open cache.
+        self.response_cache = response_cache
+
     async def analyze_code_for_validation(
         self,
         code_content: str,
@@ -35,17 +231,224 @@ class LLMInterface:
         project_context: ProjectContext,
         developer_intent: Optional[str] = None,
         # additional_context_paths: Optional[List[str]] = None # From blueprints
+        deadline: Optional[float] = None,
     ) -> ValidateCodeResponse:
         """
         Analyzes code for validation against project context, standards, & goals.
-        (Mock implementation)
+        Identical requests against an unchanged context are answered from the
+        validation cache without calling the model. If the analysis fails or
+        misses its deadline (``deadline`` seconds, or the capability default),
+        an ERROR response explaining why is returned.
+        """
+        with self.instrumentation.span("request", "validate_code"):
+            return await self._validate_within_deadline(
+                code_content,
+                file_path,
+                project_context,
+                context_fingerprint(project_context),
+                developer_intent,
+                deadline,
+            )
+
+    async def stream_code_validation(
+        self,
+        code_content: str,
+        file_path: str,
+        project_context: ProjectContext,
+        developer_intent: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncGenerator[ValidationStreamFrame, None]:
+        """
+        Streaming analyze_code_for_validation: yields a frame per feedback
+        item as soon as it is known, static check findings first (within
+        microseconds) and model findings once the model answers, then a
+        final COMPLETE frame with the overall status. Collecting the stream
+        with collect_validation_stream() gives the equivalent response.
+        """
+        validation_id = new_validation_id()
+        fingerprint = context_fingerprint(project_context)
+        sequence = itertools.count()
+        static = self._static_check(
+            code_content, file_path, project_context, fingerprint
+        )
+        for item in static.feedback_items:
+            yield ValidationStreamFrame(
+                validation_id=validation_id,
+                sequence=next(sequence),
+                stage=ValidationStageEnum.STATIC_CHECKS,
+                feedback_item=item,
+            )
+
+        model_items: List[ValidationFeedbackItem] = []
+        if static.settled:
+            status = status_for_feedback(static.feedback_items)
+        else:
+            response = await self._validate_within_deadline(
+                code_content,
+                file_path,
+                project_context,
+                fingerprint,
+                developer_intent,
+                deadline,
+                static,
+            )
+            status = response.status
+            streamed = {item.item_id for item in static.feedback_items}
+            model_items = [
+                item for item in response.feedback_items if item.item_id not in streamed
+            ]
+            for item in model_items:
+                yield ValidationStreamFrame(
+                    validation_id=validation_id,
+                    sequence=next(sequence),
+                    stage=ValidationStageEnum.MODEL,
+                    feedback_item=item,
+                )
+        yield ValidationStreamFrame(
+            validation_id=validation_id,
+            sequence=next(sequence),
+            stage=ValidationStageEnum.COMPLETE,
+            status=status,
+            summary=(
+                f"{len(static.feedback_items)} finding(s) from static checks, "
+                + (
+                    "model analysis skipped."
+                    if static.settled
+                    else f"{len(model_items)} from the model."
+                )
+            ),
+        )
+
+    async def _validate_within_deadline(
+        self,
+        code_content: str,
+        file_path: str,
+        project_context: ProjectContext,
+        fingerprint: str,
+        developer_intent: Optional[str],
+        deadline: Optional[float],
+        static: Optional[StaticCheckResult] = None,
+    ) -> ValidateCodeResponse:
+        try:
+            with deadline_scope(self._deadline_for("validate_code", deadline)):
+                return await run_within_deadline(
+                    self._validate_code(
+                        code_content,
+                        file_path,
+                        project_context,
+                        fingerprint,
+                        developer_intent,
+                        static,
+                    ),
+                    "validate_code",
+                )
+        except LLMBackendError as exc:
+            return ValidateCodeResponse(
+                validation_id=new_validation_id(),
+                status=StatusEnum.ERROR,
+                feedback_items=[
+                    ValidationFeedbackItem(
+                        item_id="validation-error",
+                        severity=SeverityEnum.ERROR,
+                        message=f"Validation could not be completed: {exc}",
+                        file_path=file_path,
+                    )
+                ],
+            )
+
+    async def _validate_code(
+        self,
+        code_content: str,
+        file_path: str,
+        project_context: ProjectContext,
+        fingerprint: str,
+        developer_intent: Optional[str] = None,
+        static: Optional[StaticCheckResult] = None,
+    ) -> ValidateCodeResponse:
+        """
+        Static checks, then the model, behind the validation cache. A
+        StaticCheckResult already computed for this code can be passed in.
+        """
+        cache = self.validation_cache
+        cache_key = cache.make_key(
+            code_content, file_path, developer_intent, fingerprint
+        )
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response
+
+        async def analyze() -> ValidateCodeResponse:
+            static_result = static or self._static_check(
+                code_content, file_path, project_context, fingerprint
+            )
+            if static_result.settled:
+                return ValidateCodeResponse(
+                    validation_id=new_validation_id(),
+                    status=status_for_feedback(static_result.feedback_items),
+                    feedback_items=static_result.feedback_items,
+                )
+            response = await self._analyze_code_for_validation(
+                code_content,
+                file_path,
+                project_context,
+                self._pack_context(
+                    "validate_code",
+                    project_context,
+                    fingerprint,
+                    f"{file_path} {developer_intent or ''} "
+                    f"{code_query_terms(code_content)}",
+                    file_path,
+                ).prompt,
+                developer_intent,
+                static_result.covered_standard_ids,
+            )
+            if static_result.feedback_items:
+                with self.instrumentation.span("build_response", "validate_code"):
+                    response = _with_static_feedback(
+                        response, static_result.feedback_items
+                    )
+            if response.status != StatusEnum.ERROR:
+                cache.put(
+                    cache_key,
+                    response,
+                    file_path,
+                    project_context.project_name,
+                    fingerprint,
+                )
+            return response
+
+        # The cache key already covers every input of the analysis.
+        return await self._run_shared(("validate_code", cache_key), analyze)
+
+    async def _analyze_code_for_validation(
+        self,
+        code_content: str,
+        file_path: str,
+        project_context: ProjectContext,
+        context_prompt: str,
+        developer_intent: Optional[str] = None,
+        statically_checked: Sequence[str] = (),
+    ) -> ValidateCodeResponse:
         """
+        Runs the model analysis behind analyze_code_for_validation.
+        (Mock implementation unless a backend is configured)
+        """
+        if self.backend is not None:
+            prompt = render_validation_prompt(
+                context_prompt,
+                code_content,
+                file_path,
+                developer_intent,
+                statically_checked,
+            )
+            return await self._complete("validate_code", prompt, ValidateCodeResponse)
+
         mock_feedback = []
         if "error" in code_content.lower():
             mock_feedback.append(
                 ValidationFeedbackItem(
                     item_id="mock-err-001",
-                    severity=SeverityEnum.error,
+                    severity=SeverityEnum.ERROR,
                     message="Mock Error: Found 'error' keyword. This code "
                     "might have issues.",
                     file_path=file_path,
@@ -58,7 +461,7 @@ class LLMInterface:
             mock_feedback.append(
                 ValidationFeedbackItem(
                     item_id="mock-sug-001",
-                    severity=SeverityEnum.suggestion,
+                    severity=SeverityEnum.SUGGESTION,
                     message="Mock Suggestion: Code looks okay. Consider more "
                     "comments.",
                     file_path=file_path,
@@ -69,25 +472,297 @@ class LLMInterface:
         return ValidateCodeResponse(
             validation_id="mock-validation-123",
             status=(
-                StatusEnum.valid_with_suggestions
+                StatusEnum.VALID_WITH_SUGGESTIONS
                 if mock_feedback
-                and mock_feedback[0].severity == SeverityEnum.suggestion
-                else StatusEnum.needs_revision
+                and mock_feedback[0].severity == SeverityEnum.SUGGESTION
+                else StatusEnum.NEEDS_REVISION
             ),
             feedback_items=mock_feedback,
         )
 
+    async def stream_batch_validation(
+        self,
+        request: BatchValidateCodeRequest,
+        project_context: ProjectContext,
+    ) -> AsyncGenerator[BatchValidationResultItem, None]:
+        """
+        Validates many files concurrently, yielding each file's result as soon
+        as it completes (not in request order). Contexts are immutable, so
+        every file is validated against the same version without copying it,
+        and its fingerprint and context index are computed once for the
+        whole batch.
+        """
+        snapshot = project_context
+        fingerprint = context_fingerprint(snapshot)
+        self.context_packer.index_for(snapshot, fingerprint)
+        concurrency = (
+            request.max_concurrency
+            if request.max_concurrency is not None
+            else self.batch_concurrency
+        )
+
+        pending: "asyncio.Queue[int]" = asyncio.Queue()
+        for index in range(len(request.files)):
+            pending.put_nowait(index)
+        results: "asyncio.Queue[BatchValidationResultItem]" = asyncio.Queue()
+        enqueued = time.perf_counter()
+
+        async def worker() -> None:
+            while not pending.empty():
+                index = pending.get_nowait()
+                file_request = request.files[index]
+                # Every file must produce a result, or the stream would wait
+                # for it forever.
+                try:
+                    self.instrumentation.observe(
+                        "queue_wait_seconds",
+                        time.perf_counter() - enqueued,
+                        capability="validate_code",
+                        queue="batch",
+                    )
+                    response = await self._validate_file_in_batch(
+                        file_request, snapshot, fingerprint
+                    )
+                except Exception as exc:
+                    response = _batch_error_response(file_request.file_path, exc)
+                results.put_nowait(
+                    BatchValidationResultItem(
+                        index=index,
+                        file_path=file_request.file_path,
+                        response=response,
+                    )
+                )
+
+        workers = [
+            asyncio.ensure_future(worker())
+            for _ in range(min(concurrency, len(request.files)))
+        ]
+        try:
+            for _ in range(len(request.files)):
+                yield await results.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def validate_batch(
+        self,
+        request: BatchValidateCodeRequest,
+        project_context: ProjectContext,
+    ) -> BatchValidateCodeResponse:
+        """Collects stream_batch_validation into a single response."""
+        results = [
+            result
+            async for result in self.stream_batch_validation(request, project_context)
+        ]
+        results.sort(key=lambda result: result.index)
+        return BatchValidateCodeResponse(
+            batch_id=f"batch-{uuid.uuid4().hex[:12]}",
+            status=_worst_status(result.response.status for result in results),
+            results=results,
+        )
+
+    async def _validate_file_in_batch(
+        self,
+        file_request: ValidateCodeRequest,
+        project_context: ProjectContext,
+        fingerprint: str,
+    ) -> ValidateCodeResponse:
+        try:
+            return await self._validate_within_deadline(
+                file_request.code_content,
+                file_request.file_path,
+                project_context,
+                fingerprint,
+                file_request.developer_intent,
+                None,
+            )
+        except Exception as exc:  # One bad file must not fail the batch.
+            return _batch_error_response(file_request.file_path, exc)
+
+    def _deadline_for(
+        self, capability: str, deadline: Optional[float]
+    ) -> Optional[float]:
+        return deadline if deadline is not None else self.deadlines.get(capability)
+
+    def _pack_context(
+        self,
+        capability: str,
+        project_context: ProjectContext,
+        fingerprint: str,
+        query: str,
+        file_path: Optional[str] = None,
+        semantic: bool = False,
+    ) -> PackedContext:
+        with self.instrumentation.span("pack_context", capability):
+            return self.context_packer.pack(
+                project_context, fingerprint, query, file_path, semantic=semantic
+            )
+
+    def _static_check(
+        self,
+        code_content: str,
+        file_path: str,
+        project_context: ProjectContext,
+        fingerprint: str,
+    ) -> StaticCheckResult:
+        with self.instrumentation.span("static_checks", "validate_code"):
+            return self.static_checker.check(
+                code_content, file_path, project_context, fingerprint
+            )
+
+    def prepare_context(
+        self,
+        project_context: ProjectContext,
+        previous: Optional[ProjectContext] = None,
+        changed_fields: Optional[AbstractSet[str]] = None,
+        version: Optional[int] = None,
+    ) -> None:
+        """
+        Builds the derived structures for a new context version (ranking
+        index, vector index rows) ahead of the first request that needs
+        them. Given the version it was derived from and the fields that
+        changed since, only the entries of those fields are rebuilt;
+        otherwise everything is built from scratch. Given its version
+        number, validation results of older versions are dropped.
+        """
+        fingerprint = context_fingerprint(project_context)
+        if version is not None:
+            self.validation_cache.observe_context(
+                project_context.project_name, fingerprint, version
+            )
+        if previous is not None and changed_fields is not None:
+            self.context_packer.advance(
+                project_context,
+                fingerprint,
+                context_fingerprint(previous),
+                changed_fields,
+            )
+        else:
+            self.context_packer.index_for(project_context, fingerprint)
+            self.context_packer.vector_index_for(project_context, fingerprint)
+
+    def on_context_change(self, change: ContextChange) -> None:
+        """UpdateQueue listener preparing each new version incrementally."""
+        self.prepare_context(
+            change.current.context,
+            change.previous.context,
+            change.changed_fields,
+            change.current.version,
+        )
+
     async def generate_advice(
         self,
         query: str,
         project_context: ProjectContext,
         current_file_path: Optional[str] = None,
         related_code_snippet: Optional[str] = None,
+        deadline: Optional[float] = None,
     ) -> GetProjectAdviceResponse:
         """
         Generates contextual advice or answers questions related to the project.
-        (Mock implementation)
+        Context entries are matched to the question lexically and by embedding
+        similarity, so paraphrased questions still find their modules.
+        Concurrent calls asking the same (normalized) question share one call,
+        and answers are reused from the response cache if one is configured.
+        Raises LLMDeadlineExceeded if no answer arrives before the deadline.
+        """
+        fingerprint = context_fingerprint(project_context)
+        key = (
+            "generate_advice",
+            fingerprint,
+            normalize_text(query),
+            current_file_path,
+            related_code_snippet,
+        )
+        with self.instrumentation.span("request", "generate_advice"):
+            with deadline_scope(self._deadline_for("generate_advice", deadline)):
+                return await run_within_deadline(
+                    self._run_shared(
+                        key,
+                        lambda: self._through_response_cache(
+                            key,
+                            GetProjectAdviceResponse,
+                            lambda: self._generate_advice(
+                                query,
+                                project_context,
+                                self._pack_context(
+                                    "generate_advice",
+                                    project_context,
+                                    fingerprint,
+                                    f"{query} {current_file_path or ''} "
+                                    f"{code_query_terms(related_code_snippet)}",
+                                    current_file_path,
+                                    semantic=True,
+                                ),
+                                current_file_path,
+                                related_code_snippet,
+                            ),
+                        ),
+                    ),
+                    "generate_advice",
+                )
+
+    def _run_shared(
+        self, key: Hashable, factory: Callable[[], Awaitable[ResponseT]]
+    ) -> Awaitable[ResponseT]:
+        """
+        Runs ``factory`` once for concurrent identical requests. The shared
+        call is not bound by the deadline of the request that started it;
+        each request's run_within_deadline() bounds only its own wait.
+        """
+        return self.single_flight.run(key, lambda: without_deadline(factory))
+
+    async def _through_response_cache(
+        self,
+        key: Tuple[Hashable, ...],
+        response_model: Type[ResponseT],
+        generate: Callable[[], Awaitable[ResponseT]],
+    ) -> ResponseT:
         """
+        Answers from the persistent response cache, or generates the response
+        and stores it there. Mock responses (without a backend) are not cached.
+        """
+        cache = self.response_cache
+        if cache is None or self.backend is None:
+            return await generate()
+        capability = str(key[0])
+        cache_key = cache.make_key(key)
+        with self.instrumentation.span("response_cache", capability):
+            cached = await cache.get(cache_key, response_model)
+        if cached is not None:
+            return cached
+        response = await generate()
+        cache.put(cache_key, capability, response)
+        return response
+
+    async def _generate_advice(
+        self,
+        query: str,
+        project_context: ProjectContext,
+        packed_context: PackedContext,
+        current_file_path: Optional[str] = None,
+        related_code_snippet: Optional[str] = None,
+    ) -> GetProjectAdviceResponse:
+        """
+        Runs the model call behind generate_advice.
+        (Mock implementation unless a backend is configured)
+        """
+        if self.backend is not None:
+            prompt = render_advice_prompt(
+                packed_context.prompt,
+                query,
+                current_file_path,
+                related_code_snippet,
+            )
+            response = await self._complete(
+                "generate_advice", prompt, GetProjectAdviceResponse
+            )
+            if not response.references:
+                with self.instrumentation.span("build_response", "generate_advice"):
+                    response.references = _ranked_references(packed_context) or None
+            return response
+
         mock_response_text = (
             f"Mock advice for '{query}': Always consult the "
             f"{project_context.project_name} docs. For example, use the "
@@ -95,24 +770,17 @@ class LLMInterface:
         )
         mock_references = [
             ReferenceItem(
-                reference_type=ReferenceTypeEnum.documentation,
+                reference_type=ReferenceTypeEnum.DOCUMENTATION,
                 path_or_url="docs/README.md",  # Assuming a generic doc
                 description="Project README for general guidelines",
             )
         ]
-        if project_context.key_modules:
-            first_module = project_context.key_modules[0]
-            mock_references.append(
-                ReferenceItem(
-                    reference_type=ReferenceTypeEnum.code_example,
-                    path_or_url=(
-                        first_module.path
-                        if first_module.path
-                        else f"module/{first_module.name.lower()}.py"
-                    ),
-                    description=f"Example usage in {first_module.name}",
-                )
-            )
+        ranked_modules = packed_context.ranked_modules()
+        if ranked_modules:
+            mock_references.append(_module_reference(ranked_modules[0]))
+        matched_files = packed_context.ranked_file_annotations(matched_only=True)
+        if matched_files:
+            mock_references.append(_file_reference(*matched_files[0]))
 
         return GetProjectAdviceResponse(
             advice_id="mock-advice-456",
@@ -131,21 +799,105 @@ class LLMInterface:
         project_context: ProjectContext,
         related_file_paths: Optional[List[str]] = None,
         user_query_for_llm: Optional[str] = None,
+        deadline: Optional[float] = None,
     ) -> GetTaskStartingContextResponse:
         """
         Provides relevant project context, guidelines, & pointers for a new task.
-        (Mock implementation)
+        Concurrent calls for the same (normalized) task share one call, and
+        answers are reused from the response cache if one is configured.
+        Raises LLMDeadlineExceeded if no answer arrives before the deadline.
         """
-        # Extract conditional expressions to variables for clarity
-        module_name = (
-            project_context.key_modules[0].name
-            if project_context.key_modules
-            else "main module"
+        fingerprint = context_fingerprint(project_context)
+        key = (
+            "generate_task_starting_context",
+            fingerprint,
+            normalize_text(task_description),
+            target_file_path,
+            tuple(sorted(related_file_paths or ())),
+            normalize_text(user_query_for_llm),
         )
+        with self.instrumentation.span("request", "generate_task_starting_context"):
+            with deadline_scope(
+                self._deadline_for("generate_task_starting_context", deadline)
+            ):
+                return await run_within_deadline(
+                    self._run_shared(
+                        key,
+                        lambda: self._through_response_cache(
+                            key,
+                            GetTaskStartingContextResponse,
+                            lambda: self._generate_task_starting_context(
+                                task_description,
+                                target_file_path,
+                                project_context,
+                                self._pack_context(
+                                    "generate_task_starting_context",
+                                    project_context,
+                                    fingerprint,
+                                    " ".join(
+                                        [
+                                            task_description,
+                                            target_file_path,
+                                            *(related_file_paths or ()),
+                                            user_query_for_llm or "",
+                                        ]
+                                    ),
+                                    target_file_path,
+                                ),
+                                related_file_paths,
+                                user_query_for_llm,
+                            ),
+                        ),
+                    ),
+                    "generate_task_starting_context",
+                )
+
+    async def _generate_task_starting_context(
+        self,
+        task_description: str,
+        target_file_path: str,
+        project_context: ProjectContext,
+        packed_context: PackedContext,
+        related_file_paths: Optional[List[str]] = None,
+        user_query_for_llm: Optional[str] = None,
+    ) -> GetTaskStartingContextResponse:
+        """
+        Runs the model call behind generate_task_starting_context.
+        (Mock implementation unless a backend is configured)
+        """
+        if self.backend is not None:
+            prompt = render_task_context_prompt(
+                packed_context.prompt,
+                task_description,
+                target_file_path,
+                related_file_paths,
+                user_query_for_llm,
+            )
+            response = await self._complete(
+                "generate_task_starting_context",
+                prompt,
+                GetTaskStartingContextResponse,
+            )
+            if not response.relevant_modules_or_interfaces:
+                with self.instrumentation.span(
+                    "build_response", "generate_task_starting_context"
+                ):
+                    response.relevant_modules_or_interfaces = [
+                        RelevantModuleOrInterface(
+                            name=module.name, description=module.description
+                        )
+                        for module in packed_context.ranked_modules(matched_only=True)[
+                            :_MAX_RANKED_ITEMS
+                        ]
+                    ] or None
+            return response
+
+        # Modules and standards are taken in order of relevance to the task
+        ranked_modules = packed_context.ranked_modules()
+        ranked_standards = packed_context.ranked_standards()
+        module_name = ranked_modules[0].name if ranked_modules else "main module"
         coding_standard = (
-            project_context.coding_standards[0].description
-            if project_context.coding_standards
-            else "PEP 8"
+            ranked_standards[0].description if ranked_standards else "PEP 8"
         )
 
         # Construct context summary with extracted variables
@@ -156,8 +908,8 @@ class LLMInterface:
         )
 
         relevant_modules = []
-        if project_context.key_modules:
-            for mod in project_context.key_modules[:2]:  # Max 2 for mock
+        if ranked_modules:
+            for mod in ranked_modules[:2]:  # Max 2 for mock
                 usage_snippet_l1 = f"# from {mod.path} import {mod.name}\n"
                 usage_snippet_l2 = f"# {mod.name.lower()} = {mod.name}()"
                 usage_example_snippet = usage_snippet_l1 + usage_snippet_l2
@@ -191,9 +943,7 @@ class LLMInterface:
                 "Repository Pattern (Mock)",
                 "Observer Pattern (Mock)",
             ],
-            code_style_reminders=[
-                cs.description for cs in project_context.coding_standards[:2]
-            ],
+            code_style_reminders=[cs.description for cs in ranked_standards[:2]],
             data_models_to_use=data_models,
             warnings_or_common_pitfalls=[
                 "Mock Warning: Avoid direct DB calls from controllers.",
@@ -209,37 +959,126 @@ class LLMInterface:
     async def stream_proactive_suggestions(
         self,
         project_context: ProjectContext,
-        # Potentially add more parameters like active_file, recent_changes etc.
+        pipeline: Optional["ChangePipeline"] = None,
     ) -> AsyncGenerator[ProactiveSuggestionItem, None]:
         """
         Streams proactive suggestions based on ongoing analysis.
-        (Mock implementation - yields a few predefined suggestions)
+        With a ChangePipeline, suggestions come from analyzing files as they
+        change, until its watcher is closed; without one, a few predefined
+        mock suggestions are yielded.
         """
+        if pipeline is not None:
+            async for suggestion in pipeline.suggestions():
+                yield suggestion
+            return
         yield ProactiveSuggestionItem(
             suggestion_id="mock-proactive-sug-001",
-            type=SuggestionTypeEnum.best_practice_tip,
+            type=SuggestionTypeEnum.BEST_PRACTICE_TIP,
             message="Mock Tip: Consider refactoring long functions for better "
             "readability.",
             file_path="src/manager_agent/agent.py",  # Example path
-            priority=PriorityEnum.low,
+            priority=PriorityEnum.LOW,
         )
         yield ProactiveSuggestionItem(
             suggestion_id="mock-proactive-sug-002",
-            type=SuggestionTypeEnum.potential_bug,
+            type=SuggestionTypeEnum.POTENTIAL_BUG,
             message="Mock Warning: A new dependency was added, ensure it's "
             "in pyproject.toml.",
-            priority=PriorityEnum.medium,
+            priority=PriorityEnum.MEDIUM,
         )
         # This is a generator, so it would yield suggestions as they are found.
         # For a mock, we just yield a couple and finish.
         if False:  # Keep Pyright happy about an empty generator
             yield
 
+    async def _complete(
+        self, capability: str, prompt: str, response_model: Type[ResponseT]
+    ) -> ResponseT:
+        completion = await call_with_retries(
+            lambda: self._call_backend(capability, prompt),
+            capability,
+            self.retry_policy,
+            self.hedging_policy,
+            self.latency_tracker,
+            self._rng,
+        )
+        with self.instrumentation.span("build_response", capability):
+            try:
+                return response_model.model_validate_json(completion.text)
+            except ValidationError as exc:
+                raise LLMBackendError(
+                    f"Model returned an invalid {response_model.__name__}: {exc}"
+                ) from exc
+
+    async def _call_backend(self, capability: str, prompt: str) -> LLMCompletion:
+        """One model call (attempt), timed as a "model_call" span."""
+        backend = self.backend
+        assert backend is not None
+        started = time.perf_counter()
+        with self.instrumentation.span("model_call", capability):
+            completion = await backend.complete(capability, prompt)
+        self.instrumentation.record_model_call(
+            capability, prompt, completion, time.perf_counter() - started
+        )
+        return completion
+
+    def encode_response(
+        self, response: BaseModel, encoding: EncodingEnum = EncodingEnum.JSON
+    ) -> bytes:
+        """
+        Encodes a response returned by this interface for the transport.
+        Responses answered from the validation cache are the same object each
+        time, so re-sending one reuses its encoding instead of dumping it again.
+        """
+        return self.response_encoder.encode(response, encoding)
+
+    def _cache_samples(self) -> List[Sample]:
+        """Hits and misses of the interface's caches."""
+        validation = self.validation_cache.stats()
+        static = self.static_checker.stats()
+        encoder = self.response_encoder.stats()
+        counts = {
+            "validation": (validation.hits, validation.misses),
+            # Requests sharing another's in-flight call count as hits.
+            "single_flight": (self.single_flight.coalesced, self.single_flight.started),
+            "context_index": (
+                self.context_packer.index_hits,
+                self.context_packer.index_misses,
+            ),
+            "static_rules": (static.compiled_hits, static.compiled_misses),
+            "response_encoding": (encoder.hits, encoder.misses),
+        }
+        if self.response_cache is not None:
+            persistent = self.response_cache.stats()
+            counts["persistent_response"] = (persistent.hits, persistent.misses)
+        samples = []
+        for cache, (hits, misses) in counts.items():
+            labels = {"cache": cache}
+            samples += [
+                Sample("cache_hits_total", labels, hits, "counter"),
+                Sample("cache_misses_total", labels, misses, "counter"),
+                Sample(
+                    "cache_hit_ratio",
+                    labels,
+                    hits / (hits + misses) if hits + misses else 0.0,
+                ),
+            ]
+        return samples
+
     async def close(self):
         """
         Clean up any resources (e.g., close HTTP client sessions).
-        (Mock implementation)
         """
+        if self.backend is not None:
+            await self.backend.close()
+        if self.response_cache is not None:
+            await self.response_cache.close()
+
+    async def __aenter__(self) -> "LLMInterface":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
 
 
 # Example usage (for testing purposes, remove later)
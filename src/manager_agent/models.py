@@ -1,8 +1,9 @@
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from .enums import (
+    EncodingEnum,
     PriorityEnum,
     ReferenceTypeEnum,
     SeverityEnum,
@@ -10,6 +11,7 @@ from .enums import (
     SubscriptionActionEnum,
     SuggestionTypeEnum,
     UpdateTypeEnum,
+    ValidationStageEnum,
 )
 
 
@@ -48,6 +50,34 @@ class ValidateCodeResponse(BaseModel):
     feedback_items: List[ValidationFeedbackItem]
 
 
+class ValidationStreamFrame(BaseModel):  # Streamed while validating
+    validation_id: str
+    sequence: int  # Position of the frame in the stream, from 0
+    stage: ValidationStageEnum
+    feedback_item: Optional[ValidationFeedbackItem] = None  # All but the last
+    # The last frame (stage "complete") carries the overall status.
+    status: Optional[StatusEnum] = None
+    summary: Optional[str] = None
+
+
+class BatchValidateCodeRequest(BaseModel):
+    files: List[ValidateCodeRequest]
+    # Overrides the LLMInterface default for this batch if set.
+    max_concurrency: Optional[int] = Field(None, ge=1)
+
+
+class BatchValidationResultItem(BaseModel):  # Streamed as each file completes
+    index: int  # Position of the file in BatchValidateCodeRequest.files
+    file_path: str
+    response: ValidateCodeResponse
+
+
+class BatchValidateCodeResponse(BaseModel):
+    batch_id: str
+    status: StatusEnum  # The worst status across all files
+    results: List[BatchValidationResultItem]  # Ordered by index
+
+
 # 4.2 Capability: get_project_advice
 class GetProjectAdviceRequest(BaseModel):
     query: str
@@ -155,6 +185,11 @@ class StreamProactiveSuggestionsSubscriptionRequest(BaseModel):  # Request from
     # define a nested model or use Dict.
     # Let's use a specific model for clarity based on the example.
     filter_preferences: Optional[FilterPreferences] = None
+    # Required by unsubscribe and update_filters: the subscription_id
+    # returned when subscribing.
+    subscription_id: Optional[str] = None
+    # How the subscription's suggestions are encoded on the stream.
+    encoding: EncodingEnum = EncodingEnum.JSON
 
 
 class StreamProactiveSuggestionsSubscriptionResponse(
@@ -0,0 +1,374 @@
+"""
+On-disk cache of generated advice and task starting contexts, shared by the
+worker processes of a host through one SQLite database in WAL mode (readers
+never block the writer, and concurrent writers wait on ``busy_timeout``).
+Entries are keyed on the normalized request fields and the fingerprint of
+the ProjectContext they were generated against, so a restarted worker, or
+another worker, answers a request it has not seen from the model call some
+process already made. The database is bounded by ``max_entries`` (least
+recently used first) and ``ttl_seconds``; the most recently used entries
+are also kept in memory, loaded when the cache is opened.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Set, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    capability TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    expires_at REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_access ON responses (accessed);
+"""
+
+
+class PersistentCacheStats(BaseModel):
+    """Point-in-time counters of a PersistentResponseCache in this process."""
+
+    hits: int = Field(0, description="Lookups answered from memory or disk.")
+    memory_hits: int = Field(0, description="Hits answered without reading disk.")
+    misses: int = Field(0, description="Lookups with no live entry.")
+    writes: int = Field(0, description="Entries written to the database.")
+    evictions: int = Field(0, description="Entries evicted to stay in bounds.")
+    expirations: int = Field(0, description="Entries dropped after their TTL.")
+    errors: int = Field(0, description="Database errors (treated as misses).")
+    warmed: int = Field(0, description="Entries loaded into memory on open.")
+    memory_size: int = Field(0, description="Entries currently kept in memory.")
+    max_entries: int = Field(..., description="Configured database entry limit.")
+
+
+class _MemoryEntry:
+    __slots__ = ("payload", "expires_at", "touched")
+
+    def __init__(self, payload: bytes, expires_at: Optional[float], touched: float):
+        self.payload = payload
+        self.expires_at = expires_at
+        self.touched = touched
+
+
+class PersistentResponseCache:
+    """
+    Cross-process response cache in the SQLite database at ``path``.
+    Open one instance per process with open() (or ``async with``); database
+    work runs in worker threads. get() returns a freshly decoded response;
+    put() updates memory at once and writes to disk in the background.
+    Database errors are logged and count as misses, so a broken or locked
+    cache slows requests down but never fails them.
+    Last-use times are written at most every ``touch_interval`` seconds per
+    entry, which keeps hits from contending for the write lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        ttl_seconds: Optional[float] = 24 * 3600.0,
+        memory_entries: int = 256,
+        busy_timeout: float = 5.0,
+        touch_interval: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if memory_entries < 0:
+            raise ValueError("memory_entries must be >= 0")
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.busy_timeout = busy_timeout
+        self.touch_interval = touch_interval
+        # Wall clock time, as expiry and last use are compared across processes.
+        self._clock = clock
+        self._connection: Optional[sqlite3.Connection] = None
+        # Serializes use of the connection (and counters) by worker threads.
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, _MemoryEntry]" = OrderedDict()
+        self._pending: Set["asyncio.Future[None]"] = set()
+        # Writes since the database was last trimmed to max_entries.
+        self._unchecked_writes = 0
+        self._hits = 0
+        self._memory_hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._errors = 0
+        self._warmed = 0
+
+    @staticmethod
+    def make_key(request_key: Tuple[Hashable, ...]) -> str:
+        """
+        Builds the key of a request from its normalized fields (the capability
+        and context fingerprint first), as used for single-flight coalescing.
+        """
+        encoded = json.dumps(request_key, separators=(",", ":"))
+        return hashlib.blake2b(encoded.encode("utf-8"), digest_size=20).hexdigest()
+
+    async def open(self) -> "PersistentResponseCache":
+        """Opens (creating if needed) the database and warms the memory tier."""
+        if self._connection is None:
+            await asyncio.to_thread(self._open)
+        return self
+
+    async def close(self) -> None:
+        """Waits for background writes, then closes the database."""
+        while self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            with self._lock:
+                connection.close()
+
+    async def __aenter__(self) -> "PersistentResponseCache":
+        return await self.open()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def get(
+        self, key: str, response_model: Type[ResponseT]
+    ) -> Optional[ResponseT]:
+        if self._connection is None:
+            raise RuntimeError("PersistentResponseCache is not open")
+        now = self._clock()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry.expires_at is not None and entry.expires_at <= now:
+                del self._memory[key]
+            else:
+                self._memory.move_to_end(key)
+                response = self._decode(key, entry.payload, response_model)
+                if response is not None:
+                    self._memory_hits += 1
+                    self._hits += 1
+                    if now - entry.touched >= self.touch_interval:
+                        entry.touched = now
+                        self._in_background(self._touch, key, now)
+                    return response
+
+        try:
+            row = await asyncio.to_thread(self._read, key, now)
+        except sqlite3.Error:
+            self._errors += 1
+            logger.warning("Reading the response cache failed", exc_info=True)
+            row = None
+        response = None
+        if row is not None:
+            payload, expires_at = row
+            response = self._decode(key, payload, response_model)
+            if response is not None:
+                self._remember(key, _MemoryEntry(payload, expires_at, now))
+        if response is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return response
+
+    def put(self, key: str, capability: str, response: BaseModel) -> None:
+        """Stores a response; it is written to the database in the background."""
+        if self._connection is None:
+            raise RuntimeError("PersistentResponseCache is not open")
+        now = self._clock()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds is not None else None
+        payload = response.model_dump_json().encode("utf-8")
+        self._remember(key, _MemoryEntry(payload, expires_at, now))
+        self._in_background(self._write, key, capability, payload, expires_at, now)
+
+    def stats(self) -> PersistentCacheStats:
+        return PersistentCacheStats(
+            hits=self._hits,
+            memory_hits=self._memory_hits,
+            misses=self._misses,
+            writes=self._writes,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            errors=self._errors,
+            warmed=self._warmed,
+            memory_size=len(self._memory),
+            max_entries=self.max_entries,
+        )
+
+    async def clear(self) -> None:
+        """Removes every entry, for all processes sharing the database."""
+        self._memory.clear()
+        await asyncio.to_thread(self._execute, "DELETE FROM responses")
+
+    def _decode(
+        self, key: str, payload: bytes, response_model: Type[ResponseT]
+    ) -> Optional[ResponseT]:
+        try:
+            return response_model.model_validate_json(payload)
+        except ValidationError:
+            # Written by an incompatible version of the response model.
+            self._memory.pop(key, None)
+            self._in_background(
+                self._execute, "DELETE FROM responses WHERE key = ?", key
+            )
+            return None
+
+    def _remember(self, key: str, entry: _MemoryEntry) -> None:
+        if self.memory_entries == 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _in_background(self, function: Callable[..., None], *args: Any) -> None:
+        task = asyncio.ensure_future(asyncio.to_thread(self._guarded, function, *args))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _guarded(self, function: Callable[..., None], *args: Any) -> None:
+        try:
+            function(*args)
+        except sqlite3.Error:
+            with self._lock:
+                self._errors += 1
+            logger.warning("Writing to the response cache failed", exc_info=True)
+
+    # The methods below run in worker threads.
+
+    def _open(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            isolation_level=None,  # Autocommit; transactions are explicit.
+            check_same_thread=False,
+        )
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints only: a crash may lose the last few
+            # entries, which are then regenerated.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+        except sqlite3.Error:
+            connection.close()
+            raise
+        self._connection = connection
+        self._trim(self._clock())
+        rows = self._query(
+            "SELECT key, payload, expires_at FROM responses"
+            " WHERE expires_at IS NULL OR expires_at > ?"
+            " ORDER BY accessed DESC LIMIT ?",
+            self._clock(),
+            self.memory_entries,
+        )
+        now = self._clock()
+        for key, payload, expires_at in reversed(rows):
+            self._remember(key, _MemoryEntry(bytes(payload), expires_at, now))
+        self._warmed = len(rows)
+
+    def _query(self, sql: str, *parameters: Any) -> List[Tuple[Any, ...]]:
+        assert self._connection is not None
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _execute(self, sql: str, *parameters: Any) -> int:
+        assert self._connection is not None
+        with self._lock:
+            return self._connection.execute(sql, parameters).rowcount
+
+    def _read(self, key: str, now: float) -> Optional[Tuple[bytes, Optional[float]]]:
+        with self._lock:
+            return self._read_locked(key, now)
+
+    def _read_locked(
+        self, key: str, now: float
+    ) -> Optional[Tuple[bytes, Optional[float]]]:
+        rows = self._query(
+            "SELECT payload, expires_at, accessed FROM responses WHERE key = ?", key
+        )
+        if not rows:
+            return None
+        payload, expires_at, accessed = rows[0]
+        if expires_at is not None and expires_at <= now:
+            if self._execute(
+                "DELETE FROM responses WHERE key = ? AND expires_at <= ?", key, now
+            ):
+                self._expirations += 1
+            return None
+        if now - accessed >= self.touch_interval:
+            self._touch(key, now)
+        return bytes(payload), expires_at
+
+    def _touch(self, key: str, now: float) -> None:
+        self._execute(
+            "UPDATE responses SET accessed = ? WHERE key = ? AND accessed < ?",
+            now,
+            key,
+            now,
+        )
+
+    def _write(
+        self,
+        key: str,
+        capability: str,
+        payload: bytes,
+        expires_at: Optional[float],
+        now: float,
+    ) -> None:
+        with self._lock:
+            self._write_locked(key, capability, payload, expires_at, now)
+
+    def _write_locked(
+        self,
+        key: str,
+        capability: str,
+        payload: bytes,
+        expires_at: Optional[float],
+        now: float,
+    ) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO responses"
+            " (key, capability, payload, expires_at, accessed)"
+            " VALUES (?, ?, ?, ?, ?)",
+            key,
+            capability,
+            payload,
+            expires_at,
+            now,
+        )
+        self._writes += 1
+        self._unchecked_writes += 1
+        # Counting rows is linear, so bounds are checked every few writes;
+        # the database may exceed max_entries by up to a tenth meanwhile.
+        if self._unchecked_writes >= max(1, self.max_entries // 10):
+            self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        with self._lock:
+            self._trim_locked(now)
+
+    def _trim_locked(self, now: float) -> None:
+        self._unchecked_writes = 0
+        self._expirations += self._execute(
+            "DELETE FROM responses WHERE expires_at <= ?", now
+        )
+        (count,) = self._query("SELECT COUNT(*) FROM responses")[0]
+        if count > self.max_entries:
+            self._evictions += self._execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                count - self.max_entries,
+            )
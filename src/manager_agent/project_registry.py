@@ -0,0 +1,302 @@
+import sys
+import time
+import types
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from pydantic import BaseModel, Field
+
+from .context_manager import ContextManager, ContextVersion, ProjectContext
+from .models import UpdateManagerContextRequest
+
+# Builds (or incrementally updates) one derived structure of a project from
+# a new context version and the structure built for the previous version.
+DerivedBuilder = Callable[[ProjectContext, Optional[Any]], Any]
+
+# Called with the project id and its last resident state after an eviction.
+EvictionListener = Callable[[str, "ResidentProject"], None]
+
+_SKIPPED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+)
+_ATOMIC_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def approximate_size(root: Any) -> int:
+    """
+    Approximate memory footprint of an object graph in bytes. Each object
+    is counted once; buffers exposing ``nbytes`` (numpy arrays) count their
+    data. Functions, classes and modules are not followed.
+    """
+    seen: Set[int] = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+        nbytes = getattr(obj, "nbytes", None)
+        if isinstance(nbytes, int):
+            total += nbytes + sys.getsizeof(obj, 0)
+            continue
+        total += sys.getsizeof(obj, 0)
+        if isinstance(obj, _ATOMIC_TYPES):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            attributes = getattr(obj, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if slot not in ("__dict__", "__weakref__"):
+                        stack.append(getattr(obj, slot, None))
+    return total
+
+
+class ProjectResidencyStats(BaseModel):
+    project_id: str
+    resident: bool = Field(..., description="Whether the project is in memory.")
+    version: Optional[int] = Field(None, description="Resident context version.")
+    footprint_bytes: int = Field(0, description="Approximate memory when resident.")
+    requests: int = Field(0, description="Lookups through the registry.")
+    loads: int = Field(0, description="Times the project was loaded from disk.")
+    evictions: int = Field(0, description="Times the project was evicted.")
+    last_load_seconds: float = Field(0.0, description="Duration of the last load.")
+    total_load_seconds: float = Field(0.0, description="Time spent loading.")
+
+
+class RegistryStats(BaseModel):
+    memory_ceiling_bytes: int
+    footprint_bytes: int = Field(..., description="Sum over resident projects.")
+    resident_projects: int
+    loads: int
+    evictions: int
+    projects: List[ProjectResidencyStats]
+
+
+class ResidentProject:
+    """A project held in memory: its context version and derived structures."""
+
+    __slots__ = (
+        "project_id",
+        "version",
+        "derived",
+        "footprint_bytes",
+        "estimated_bytes",
+        "in_use",
+    )
+
+    def __init__(self, project_id: str, version: ContextVersion):
+        self.project_id = project_id
+        self.version = version
+        self.derived: Dict[str, Any] = {}
+        self.footprint_bytes = 0
+        # Part of footprint_bytes estimated from updates since it was measured.
+        self.estimated_bytes = 0
+        # Requests currently using the project; it is not evicted meanwhile.
+        self.in_use = 0
+
+    @property
+    def context(self) -> ProjectContext:
+        return self.version.context
+
+
+class ProjectRegistry:
+    """
+    Keeps the contexts of many projects, and structures derived from them,
+    resident in memory within ``memory_ceiling_bytes``.
+    Projects are loaded lazily through the ContextManager on first use.
+    Each one's footprint (context plus derived structures) is measured when
+    it is loaded. Updates through apply_updates() only add their own size to
+    it, so writes do not walk the whole project; it is measured again once
+    those estimates add up to ``remeasure_ratio`` of the footprint (updates
+    that replace entries make the estimate too high, never too low for
+    long). When the total exceeds the ceiling, the
+    least recently used projects that are not in use are evicted: their
+    store is compacted to disk and they are dropped from memory, to be
+    reloaded on the next request. The ContextManager therefore needs a
+    ``store_directory``.
+    ``derived_builders`` maps names to functions building per-project
+    structures (indexes, caches); they are rebuilt, or updated from the
+    previous structure, when the project's context changes.
+    """
+
+    def __init__(
+        self,
+        context_manager: ContextManager,
+        memory_ceiling_bytes: int = 512 * 1024 * 1024,
+        derived_builders: Optional[Dict[str, DerivedBuilder]] = None,
+        remeasure_ratio: float = 0.25,
+    ):
+        if context_manager.store_directory is None:
+            raise ValueError("ProjectRegistry needs a ContextManager with a store")
+        self.context_manager = context_manager
+        self.memory_ceiling_bytes = memory_ceiling_bytes
+        self.derived_builders = dict(derived_builders or {})
+        self.remeasure_ratio = remeasure_ratio
+        self._resident: "OrderedDict[str, ResidentProject]" = OrderedDict()
+        self._stats: Dict[str, ProjectResidencyStats] = {}
+        self._listeners: List[EvictionListener] = []
+
+    def add_eviction_listener(self, listener: EvictionListener) -> None:
+        self._listeners.append(listener)
+
+    @property
+    def footprint_bytes(self) -> int:
+        return sum(project.footprint_bytes for project in self._resident.values())
+
+    @asynccontextmanager
+    async def use(self, project_id: str) -> AsyncIterator[ResidentProject]:
+        """Holds a project resident (and its version pinned) for a request."""
+        project = await self._get(project_id, in_use=True)
+        try:
+            with self.context_manager.snapshots.pin(project_id, project.version):
+                yield project
+        finally:
+            project.in_use -= 1
+
+    async def get(self, project_id: str) -> ResidentProject:
+        """Returns a project, loading it if needed."""
+        return await self._get(project_id, in_use=False)
+
+    async def get_version(self, project_id: str) -> ContextVersion:
+        return (await self.get(project_id)).version
+
+    async def apply_updates(
+        self,
+        project_id: str,
+        updates: Sequence[Tuple[str, UpdateManagerContextRequest]],
+    ) -> Tuple[ContextVersion, ContextVersion]:
+        """ContextManager.apply_updates() keeping residency up to date."""
+        async with self.use(project_id) as project:
+            previous, current = await self.context_manager.apply_updates(
+                project_id, updates
+            )
+            self._refresh(project, current, updates)
+        await self._enforce_ceiling()
+        return previous, current
+
+    async def evict(self, project_id: str) -> bool:
+        """Writes a project to disk and drops it from memory."""
+        project = self._resident.pop(project_id, None)
+        if project is None:
+            return False
+        await self.context_manager.unload(project_id)
+        self._stats[project_id].evictions += 1
+        for listener in list(self._listeners):
+            listener(project_id, project)
+        return True
+
+    async def close(self) -> None:
+        for project_id in list(self._resident):
+            await self.evict(project_id)
+
+    def stats(self) -> RegistryStats:
+        projects = []
+        for project_id, stats in self._stats.items():
+            project = self._resident.get(project_id)
+            projects.append(
+                stats.model_copy(
+                    update={
+                        "resident": project is not None,
+                        "version": project.version.version if project else None,
+                        "footprint_bytes": project.footprint_bytes if project else 0,
+                    }
+                )
+            )
+        return RegistryStats(
+            memory_ceiling_bytes=self.memory_ceiling_bytes,
+            footprint_bytes=self.footprint_bytes,
+            resident_projects=len(self._resident),
+            loads=sum(stats.loads for stats in self._stats.values()),
+            evictions=sum(stats.evictions for stats in self._stats.values()),
+            projects=projects,
+        )
+
+    async def _get(self, project_id: str, in_use: bool) -> ResidentProject:
+        stats = self._stats.get(project_id)
+        if stats is None:
+            stats = self._stats[project_id] = ProjectResidencyStats(
+                project_id=project_id, resident=False
+            )
+        stats.requests += 1
+
+        loading = not self.context_manager.is_loaded(project_id)
+        started = time.perf_counter()
+        version = await self.context_manager.get_version(project_id)
+        project = self._resident.get(project_id)
+        if project is None:
+            project = self._resident[project_id] = ResidentProject(project_id, version)
+            self._refresh(project, version)
+        elif project.version is not version:
+            self._refresh(project, version)
+        if loading:
+            elapsed = time.perf_counter() - started
+            stats.loads += 1
+            stats.last_load_seconds = elapsed
+            stats.total_load_seconds += elapsed
+
+        self._resident.move_to_end(project_id)
+        if in_use:
+            project.in_use += 1
+        await self._enforce_ceiling()
+        return project
+
+    def _refresh(
+        self,
+        project: ResidentProject,
+        version: ContextVersion,
+        updates: Optional[Sequence[Tuple[str, UpdateManagerContextRequest]]] = None,
+    ) -> None:
+        """
+        Moves a project to a new version, rebuilding its derived structures.
+        With the ``updates`` leading to it, the footprint is estimated rather
+        than measured while the estimates stay within ``remeasure_ratio``.
+        """
+        project.version = version
+        for name, builder in self.derived_builders.items():
+            project.derived[name] = builder(version.context, project.derived.get(name))
+        if updates is not None:
+            growth = approximate_size(list(updates))
+            measured_bytes = project.footprint_bytes - project.estimated_bytes
+            if (
+                project.estimated_bytes + growth
+                <= self.remeasure_ratio * measured_bytes
+            ):
+                project.footprint_bytes += growth
+                project.estimated_bytes += growth
+                return
+        project.footprint_bytes = approximate_size(
+            [version.context, list(project.derived.values())]
+        )
+        project.estimated_bytes = 0
+
+    async def _enforce_ceiling(self) -> None:
+        while self.footprint_bytes > self.memory_ceiling_bytes:
+            # Least recently used first; the most recent project always stays.
+            candidates = list(self._resident.values())[:-1]
+            victim = next((p for p in candidates if not p.in_use), None)
+            if victim is None:
+                return
+            await self.evict(victim.project_id)
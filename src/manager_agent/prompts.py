@@ -0,0 +1,164 @@
+import json
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+
+from .context_manager import (
+    CodingStandard,
+    KeyModule,
+    ProjectContext,
+    ProjectRequirement,
+)
+from .models import (
+    GetProjectAdviceResponse,
+    GetTaskStartingContextResponse,
+    ValidateCodeResponse,
+)
+
+
+def render_context_prompt(project_context: ProjectContext) -> str:
+    """
+    Renders a ProjectContext as the shared prefix of every model prompt.
+    The rendering is deterministic so that requests against the same context
+    produce byte-identical prefixes.
+    """
+    return render_context_sections(
+        project_context.project_name,
+        project_context.project_goals,
+        (
+            [project_context.architecture_overview]
+            if project_context.architecture_overview
+            else []
+        ),
+        project_context.key_modules,
+        project_context.coding_standards,
+        project_context.requirements,
+        list(project_context.file_annotations.items()),
+    )
+
+
+def render_context_sections(
+    project_name: str,
+    project_goals: Sequence[str],
+    architecture_paragraphs: Sequence[str],
+    key_modules: Sequence[KeyModule],
+    coding_standards: Sequence[CodingStandard],
+    requirements: Sequence[ProjectRequirement],
+    file_annotations: Sequence[Tuple[str, str]] = (),
+) -> str:
+    """Renders a (possibly partial) selection of context entries."""
+    sections: List[str] = [f"Project: {project_name}"]
+    if project_goals:
+        sections.append("Goals:\n" + "\n".join(f"- {goal}" for goal in project_goals))
+    if architecture_paragraphs:
+        sections.append("Architecture:\n" + "\n\n".join(architecture_paragraphs))
+    if key_modules:
+        sections.append(
+            "Key modules:\n"
+            + "\n".join(
+                f"- {module.name}"
+                + (f" ({module.path})" if module.path else "")
+                + f": {module.description}"
+                for module in key_modules
+            )
+        )
+    if coding_standards:
+        sections.append(
+            "Coding standards:\n"
+            + "\n".join(
+                f"- [{standard.id}]"
+                + (f" ({standard.category})" if standard.category else "")
+                + f" {standard.description}"
+                for standard in coding_standards
+            )
+        )
+    if requirements:
+        sections.append(
+            "Requirements:\n"
+            + "\n".join(
+                f"- [{requirement.id}] ({requirement.priority}) "
+                f"{requirement.description}"
+                for requirement in requirements
+            )
+        )
+    if file_annotations:
+        sections.append(
+            "Annotated files:\n"
+            + "\n".join(f"- {path}: {note}" for path, note in file_annotations)
+        )
+    return "\n\n".join(sections)
+
+
+@lru_cache(maxsize=None)
+def _response_schema(response_model: Type[BaseModel]) -> str:
+    return json.dumps(response_model.model_json_schema(), separators=(",", ":"))
+
+
+def _with_response_format(prompt: str, response_model: Type[BaseModel]) -> str:
+    return (
+        f"{prompt}\n\nRespond only with a JSON object matching this schema:\n"
+        f"{_response_schema(response_model)}"
+    )
+
+
+def render_validation_prompt(
+    context_prompt: str,
+    code_content: str,
+    file_path: str,
+    developer_intent: Optional[str] = None,
+    statically_checked: Sequence[str] = (),
+) -> str:
+    parts = [
+        context_prompt,
+        "Validate the following code against the project context above, its "
+        "coding standards and goals.",
+        f"File: {file_path}",
+    ]
+    if statically_checked:
+        parts.append(
+            "Static checks already report layout, naming and docstring "
+            "violations of standards " + ", ".join(statically_checked) + "; "
+            "do not report those again."
+        )
+    if developer_intent:
+        parts.append(f"Developer intent: {developer_intent}")
+    parts.append(f"Code:\n{code_content}")
+    return _with_response_format("\n\n".join(parts), ValidateCodeResponse)
+
+
+def render_advice_prompt(
+    context_prompt: str,
+    query: str,
+    current_file_path: Optional[str] = None,
+    related_code_snippet: Optional[str] = None,
+) -> str:
+    parts = [
+        context_prompt,
+        f"Answer the developer's question about this project: {query}",
+    ]
+    if current_file_path:
+        parts.append(f"Current file: {current_file_path}")
+    if related_code_snippet:
+        parts.append(f"Related code:\n{related_code_snippet}")
+    return _with_response_format("\n\n".join(parts), GetProjectAdviceResponse)
+
+
+def render_task_context_prompt(
+    context_prompt: str,
+    task_description: str,
+    target_file_path: str,
+    related_file_paths: Optional[List[str]] = None,
+    user_query_for_llm: Optional[str] = None,
+) -> str:
+    parts = [
+        context_prompt,
+        "Prepare the context a developer needs before starting this task: "
+        f"{task_description}",
+        f"Target file: {target_file_path}",
+    ]
+    if related_file_paths:
+        parts.append("Related files: " + ", ".join(related_file_paths))
+    if user_query_for_llm:
+        parts.append(f"Developer's question: {user_query_for_llm}")
+    return _with_response_format("\n\n".join(parts), GetTaskStartingContextResponse)
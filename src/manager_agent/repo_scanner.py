@@ -0,0 +1,553 @@
+import ast
+import hashlib
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from .code_units import parse_module
+from .context_manager import KeyModule, ProjectContext
+from .enums import UpdateTypeEnum
+from .models import DataModelToUse, UpdateManagerContextRequest
+
+# Directories never scanned, wherever they appear in the tree.
+DEFAULT_EXCLUDED_DIRS = frozenset(
+    (
+        ".git",
+        ".hg",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".tox",
+        ".venv",
+        "__pycache__",
+        "build",
+        "dist",
+        "node_modules",
+        "venv",
+    )
+)
+
+# Base classes and decorators that mark a class as a data model.
+DATA_MODEL_BASES = frozenset(
+    ("BaseModel", "DeclarativeBase", "Model", "NamedTuple", "Schema", "TypedDict")
+)
+DATA_MODEL_DECORATORS = frozenset(("dataclass", "define", "frozen", "s", "attrs"))
+
+# Symbols named in a KeyModule description, per kind.
+MAX_LISTED_SYMBOLS = 8
+
+MANIFEST_FORMAT = 1
+
+
+class SymbolSummary(BaseModel):
+    """A public class or function defined at module level."""
+
+    name: str
+    kind: str  # "class" or "function"
+    line: int
+    docstring: Optional[str] = None  # First line only
+    data_model: bool = False
+
+
+class ModuleSummary(BaseModel):
+    """What the scanner extracted from one Python file."""
+
+    path: str = Field(..., description="Path relative to the scanned root.")
+    module: str = Field(..., description="Dotted module name.")
+    docstring: Optional[str] = Field(None, description="First paragraph.")
+    symbols: List[SymbolSummary] = Field(default_factory=list)
+    error: Optional[str] = Field(None, description="Why the file was not parsed.")
+
+
+class ManifestEntry(BaseModel):
+    mtime_ns: int
+    size: int
+    digest: str
+    summary: ModuleSummary
+
+
+class ScanManifest(BaseModel):
+    """Per-file state of the last scan, persisted between scans."""
+
+    format: int = MANIFEST_FORMAT
+    files: Dict[str, ManifestEntry] = Field(default_factory=dict)
+
+
+class ScanStats(BaseModel):
+    files: int = Field(0, description="Python files found.")
+    parsed: int = Field(0, description="Files read and parsed by this scan.")
+    unchanged: int = Field(0, description="Files reused from the manifest.")
+    removed: int = Field(0, description="Manifest files no longer present.")
+    failed: int = Field(0, description="Files that could not be read or parsed.")
+    seconds: float = 0.0
+
+
+class ScanResult(BaseModel):
+    files: Dict[str, ModuleSummary]
+    key_modules: List[KeyModule]
+    data_models: List[DataModelToUse]
+    stats: ScanStats
+    # Names of key modules whose directory no longer holds Python files.
+    removed_modules: List[str] = Field(default_factory=list)
+
+    def apply_to(self, project_context: ProjectContext) -> ProjectContext:
+        """
+        Returns the context with the scanned key modules merged in: scanned
+        modules replace hand-written ones of the same name, others are kept.
+        """
+        scanned = {module.name: module for module in self.key_modules}
+        modules = [
+            scanned.pop(module.name, module) for module in project_context.key_modules
+        ]
+        modules.extend(scanned.values())
+        removed = set(self.removed_modules)
+        modules = [module for module in modules if module.name not in removed]
+        return project_context.model_copy(update={"key_modules": modules})
+
+    def context_updates(self) -> List[UpdateManagerContextRequest]:
+        """
+        The same changes as apply_to(), as SOURCE_SCAN updates for a
+        ContextManager or UpdateQueue, so they are logged and coalesced
+        like any other update.
+        """
+        updates = [
+            UpdateManagerContextRequest(
+                update_type=UpdateTypeEnum.SOURCE_SCAN,
+                summary=module.name,
+                details_uri_or_text=module.description,
+                relevant_file_paths=[module.path] if module.path else None,
+            )
+            for module in self.key_modules
+        ]
+        updates.extend(
+            UpdateManagerContextRequest(
+                update_type=UpdateTypeEnum.SOURCE_SCAN,
+                summary=name,
+                details_uri_or_text="",
+            )
+            for name in self.removed_modules
+        )
+        return updates
+
+
+def is_excluded(
+    path: str, excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS
+) -> bool:
+    """Whether a relative path lies in an excluded directory."""
+    excluded = frozenset(excluded_dirs)
+    return any(
+        part in excluded or part.endswith(".egg-info")
+        for part in path.replace(os.sep, "/").split("/")[:-1]
+    )
+
+
+def walk_files(
+    root: str,
+    excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+    suffixes: Optional[Tuple[str, ...]] = (".py",),
+) -> Dict[str, os.stat_result]:
+    """
+    Stats every file under ``root`` ending with one of ``suffixes`` (any
+    file when None), by path relative to the root with "/" separators.
+    """
+    excluded = frozenset(excluded_dirs)
+    found: Dict[str, os.stat_result] = {}
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = sorted(
+            name
+            for name in subdirectories
+            if name not in excluded and not name.endswith(".egg-info")
+        )
+        relative = os.path.relpath(directory, root).replace(os.sep, "/")
+        for filename in filenames:
+            if suffixes is not None and not filename.endswith(suffixes):
+                continue
+            try:
+                stat = os.stat(os.path.join(directory, filename))
+            except OSError:
+                continue  # Removed while walking.
+            found[filename if relative == "." else f"{relative}/{filename}"] = stat
+    return found
+
+
+def _first_paragraph(docstring: Optional[str]) -> Optional[str]:
+    if not docstring:
+        return None
+    return " ".join(docstring.strip().split("\n\n", 1)[0].split())
+
+
+def _first_line(docstring: Optional[str]) -> Optional[str]:
+    lines = docstring.strip().splitlines() if docstring else []
+    return lines[0] if lines else None
+
+
+def _dotted_name(node: ast.expr) -> str:
+    """Last component of a name or attribute ("pydantic.BaseModel" -> BaseModel)."""
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ""
+
+
+def _is_data_model(node: ast.ClassDef) -> bool:
+    return any(_dotted_name(base) in DATA_MODEL_BASES for base in node.bases) or any(
+        _dotted_name(decorator) in DATA_MODEL_DECORATORS
+        for decorator in node.decorator_list
+    )
+
+
+def _exported_names(tree: ast.Module) -> Optional[List[str]]:
+    """The module's literal ``__all__``, if it has one."""
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and any(
+                isinstance(target, ast.Name) and target.id == "__all__"
+                for target in node.targets
+            )
+            and isinstance(node.value, (ast.List, ast.Tuple))
+        ):
+            return [
+                element.value
+                for element in node.value.elts
+                if isinstance(element, ast.Constant) and isinstance(element.value, str)
+            ]
+    return None
+
+
+def module_name(path: str) -> str:
+    """Dotted module name of a relative path ("src/pkg/mod.py" -> pkg.mod)."""
+    parts = path.replace(os.sep, "/").split("/")
+    parts[-1] = parts[-1][: -len(".py")] if parts[-1].endswith(".py") else parts[-1]
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    if len(parts) > 1 and parts[0] in ("src", "lib"):
+        parts.pop(0)
+    return ".".join(parts)
+
+
+def summarize_source(source: str, path: str) -> ModuleSummary:
+    """Extracts the docstring and public top-level symbols of a module."""
+    summary = ModuleSummary(path=path, module=module_name(path))
+    tree = parse_module(source)
+    if tree is None:
+        summary.error = "Not valid Python"
+        return summary
+    summary.docstring = _first_paragraph(ast.get_docstring(tree))
+    exported = _exported_names(tree)
+    for node in tree.body:
+        if not isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if exported is not None:
+            if node.name not in exported:
+                continue
+        elif node.name.startswith("_"):
+            continue
+        is_class = isinstance(node, ast.ClassDef)
+        summary.symbols.append(
+            SymbolSummary(
+                name=node.name,
+                kind="class" if is_class else "function",
+                line=node.lineno,
+                docstring=_first_line(ast.get_docstring(node)),
+                data_model=is_class and _is_data_model(node),
+            )
+        )
+    return summary
+
+
+def _scan_file(
+    task: Tuple[str, str, Optional[str]]
+) -> Tuple[str, str, Optional[ModuleSummary]]:
+    """
+    Reads and summarizes one file in a worker process. Returns (path,
+    digest, summary); the summary is None when the content still matches
+    ``previous_digest``. A file that cannot be summarized gets a summary
+    with ``error`` set rather than failing the scan.
+    """
+    root, path, previous_digest = task
+    try:
+        with open(os.path.join(root, path), "rb") as source_file:
+            data = source_file.read()
+    except OSError as exc:
+        return (
+            path,
+            "",
+            ModuleSummary(path=path, module=module_name(path), error=str(exc)),
+        )
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == previous_digest:
+        return path, digest, None
+    try:
+        summary = summarize_source(data.decode("utf-8", "replace"), path)
+    except (IndexError, RecursionError, ValueError) as exc:  # Incl. decode errors.
+        summary = ModuleSummary(
+            path=path, module=module_name(path), error=f"{type(exc).__name__}: {exc}"
+        )
+    return path, digest, summary
+
+
+def _package_description(summaries: Sequence[ModuleSummary]) -> str:
+    init = next((s for s in summaries if s.path.endswith("__init__.py")), None)
+    documented = [s for s in summaries if s.docstring]
+    docstring = (init.docstring if init else None) or (
+        documented[0].docstring if len(documented) == 1 else None
+    )
+    symbols = [symbol for summary in summaries for symbol in summary.symbols]
+    parts = [docstring.rstrip(".")] if docstring else []
+    for kind, label in (("class", "Classes"), ("function", "Functions")):
+        names = [symbol.name for symbol in symbols if symbol.kind == kind]
+        if names:
+            listed = ", ".join(names[:MAX_LISTED_SYMBOLS])
+            more = len(names) - MAX_LISTED_SYMBOLS
+            parts.append(
+                f"{label}: {listed}" + (f" (+{more} more)" if more > 0 else "")
+            )
+    return ". ".join(parts) + "." if parts else f"{len(summaries)} Python modules."
+
+
+def key_modules_from(
+    summaries: Iterable[ModuleSummary], root_name: str = "root"
+) -> List[KeyModule]:
+    """One KeyModule per directory holding Python files, in path order."""
+    by_directory: Dict[str, List[ModuleSummary]] = defaultdict(list)
+    for summary in summaries:
+        by_directory[os.path.dirname(summary.path)].append(summary)
+    modules = []
+    for directory in sorted(by_directory):
+        package = by_directory[directory]
+        package.sort(key=lambda summary: summary.path)
+        modules.append(
+            KeyModule(
+                name=module_name(directory) if directory else root_name,
+                description=_package_description(package),
+                path=f"{directory}/" if directory else None,
+            )
+        )
+    return modules
+
+
+def data_models_from(summaries: Iterable[ModuleSummary]) -> List[DataModelToUse]:
+    return [
+        DataModelToUse(
+            name=symbol.name,
+            definition_path_or_snippet=f"{summary.path}:{symbol.line}",
+        )
+        for summary in sorted(summaries, key=lambda summary: summary.path)
+        for symbol in summary.symbols
+        if symbol.data_model
+    ]
+
+
+class RepositoryScanner:
+    """
+    Bootstraps ProjectContext entries from a Python source tree.
+    Files are read, hashed and parsed with ``ast`` in a process pool; each
+    yields its docstring and public classes and functions, and classes
+    that look like data models (pydantic models, dataclasses, TypedDicts,
+    ORM models). Every directory of Python files becomes a KeyModule.
+    Scans are incremental: a manifest of each file's mtime, size and
+    content hash (persisted at ``manifest_path`` when given) lets the next
+    scan reuse every file whose stat is unchanged, and skip parsing files
+    that were touched but whose content is the same.
+    Scanning blocks; run it with asyncio.to_thread() from async code.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        manifest_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+        min_parallel_files: int = 64,
+    ):
+        self.root = os.path.abspath(root)
+        self.manifest_path = manifest_path
+        # Worker processes (None: one per CPU; 0: scan in this process).
+        self.max_workers = max_workers
+        self.excluded_dirs = frozenset(excluded_dirs)
+        # Fewer changed files than this are scanned without starting a pool.
+        self.min_parallel_files = min_parallel_files
+        self._manifest: Optional[ScanManifest] = None
+
+    def _load_manifest(self) -> ScanManifest:
+        if self._manifest is None:
+            self._manifest = ScanManifest()
+            if self.manifest_path and os.path.exists(self.manifest_path):
+                with open(self.manifest_path, "rb") as manifest_file:
+                    manifest = ScanManifest.model_validate_json(manifest_file.read())
+                if manifest.format == MANIFEST_FORMAT:
+                    self._manifest = manifest
+        return self._manifest
+
+    def _save_manifest(self, manifest: ScanManifest) -> None:
+        if not self.manifest_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            manifest_file.write(manifest.model_dump_json())
+        os.replace(temp_path, self.manifest_path)
+
+    def _run(
+        self, tasks: List[Tuple[str, str, Optional[str]]]
+    ) -> Iterator[Tuple[str, str, Optional[ModuleSummary]]]:
+        if self.max_workers == 0 or len(tasks) < self.min_parallel_files:
+            yield from map(_scan_file, tasks)
+            return
+        workers = self.max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as executor:
+            chunksize = max(1, min(64, len(tasks) // (workers * 4)))
+            yield from executor.map(_scan_file, tasks, chunksize=chunksize)
+
+    def scan(self) -> ScanResult:
+        """Scans the tree, re-reading only files changed since the last scan."""
+        started = time.perf_counter()
+        previous = self._load_manifest().files
+        found = walk_files(self.root, self.excluded_dirs)
+        entries: Dict[str, ManifestEntry] = {}
+        stats, changed = self._update(found, previous, entries)
+        stats.files = len(found)
+        stats.removed = len(previous.keys() - found.keys())
+
+        summaries = self._commit(entries, stats, changed)
+        stats.seconds = time.perf_counter() - started
+        return ScanResult(
+            files={summary.path: summary for summary in summaries},
+            key_modules=key_modules_from(
+                [summary for summary in summaries if not summary.error],
+                self.root_name,
+            ),
+            data_models=data_models_from(
+                summary for summary in summaries if not summary.error
+            ),
+            stats=stats,
+        )
+
+    def refresh(self, paths: Iterable[str]) -> ScanResult:
+        """
+        Rescans only ``paths`` (relative to the root, as reported by a
+        FileWatcher), which may have changed or been deleted; a path ending
+        with "/" stands for every known file under that directory. The
+        result holds their summaries and the KeyModules of their
+        directories only; ``removed_modules`` names directories left
+        without Python files. A directory with a file that fails to parse
+        (such as one saved half-typed) gets no KeyModule, so the one in the
+        context is kept until the file parses again.
+        """
+        started = time.perf_counter()
+        previous = self._load_manifest().files
+        requested = {path.replace(os.sep, "/") for path in paths}
+        for directory in [path for path in requested if path.endswith("/")]:
+            requested.update(path for path in previous if path.startswith(directory))
+        paths = {
+            path
+            for path in requested
+            if path.endswith(".py") and not is_excluded(path, self.excluded_dirs)
+        }
+        found: Dict[str, os.stat_result] = {}
+        for path in paths:
+            try:
+                found[path] = os.stat(os.path.join(self.root, path))
+            except OSError:
+                continue
+        entries = dict(previous)
+        for path in paths - found.keys():
+            entries.pop(path, None)
+        stats, changed = self._update(found, previous, entries)
+        stats.files = len(entries)
+        stats.removed = len(previous.keys() & (paths - found.keys()))
+
+        summaries = self._commit(entries, stats, changed)
+        directories = {os.path.dirname(path) for path in paths}
+        failing = {
+            os.path.dirname(summary.path) for summary in summaries if summary.error
+        }
+        affected = [
+            summary
+            for summary in summaries
+            if os.path.dirname(summary.path) in directories - failing
+        ]
+        key_modules = key_modules_from(affected, self.root_name)
+        remaining = {os.path.dirname(path) for path in entries}
+        stats.seconds = time.perf_counter() - started
+        return ScanResult(
+            files={path: entries[path].summary for path in sorted(found)},
+            key_modules=key_modules,
+            data_models=data_models_from(
+                entries[path].summary
+                for path in found
+                if not entries[path].summary.error
+            ),
+            stats=stats,
+            removed_modules=[
+                module_name(directory) if directory else self.root_name
+                for directory in sorted(directories - remaining)
+                if any(os.path.dirname(path) == directory for path in previous)
+            ],
+        )
+
+    def summary(self, path: str) -> Optional[ModuleSummary]:
+        """The summary of a file as of the last scan or refresh."""
+        entry = self._load_manifest().files.get(path.replace(os.sep, "/"))
+        return entry.summary if entry is not None else None
+
+    @property
+    def root_name(self) -> str:
+        """Name of the KeyModule for Python files directly in the root."""
+        return os.path.basename(self.root)
+
+    def _update(
+        self,
+        found: Dict[str, os.stat_result],
+        previous: Dict[str, ManifestEntry],
+        entries: Dict[str, ManifestEntry],
+    ) -> Tuple[ScanStats, bool]:
+        """
+        Puts an up-to-date manifest entry for every found file in
+        ``entries``. Also returns whether any file had to be read.
+        """
+        stats = ScanStats()
+        tasks: List[Tuple[str, str, Optional[str]]] = []
+        for path, stat in found.items():
+            entry = previous.get(path)
+            if (
+                entry is not None
+                and entry.mtime_ns == stat.st_mtime_ns
+                and entry.size == stat.st_size
+            ):
+                entries[path] = entry
+                stats.unchanged += 1
+            else:
+                tasks.append((self.root, path, entry.digest if entry else None))
+        for path, digest, summary in self._run(tasks):
+            stat = found[path]
+            if summary is None:
+                summary = previous[path].summary
+                stats.unchanged += 1
+            else:
+                stats.parsed += 1
+            entries[path] = ManifestEntry(
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                digest=digest,
+                summary=summary,
+            )
+        return stats, bool(tasks)
+
+    def _commit(
+        self, entries: Dict[str, ManifestEntry], stats: ScanStats, changed: bool
+    ) -> List[ModuleSummary]:
+        """Makes ``entries`` the manifest, saving it if anything changed."""
+        self._manifest = ScanManifest(files=entries)
+        if changed or stats.removed:
+            self._save_manifest(self._manifest)
+        stats.failed = sum(1 for entry in entries.values() if entry.summary.error)
+        return [entry.summary for entry in self._manifest.files.values()]
@@ -0,0 +1,239 @@
+import asyncio
+import contextvars
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+from .llm_backends import LLMBackendError, TransientLLMBackendError
+
+T = TypeVar("T")
+
+# Absolute deadline (time.monotonic()) of the current request, if any. Being a
+# context variable, it follows the request into tasks spawned on its behalf.
+_current_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "manager_agent_deadline", default=None
+)
+
+
+class LLMDeadlineExceeded(LLMBackendError):
+    """Raised when a request does not finish before its deadline."""
+
+
+class RetryPolicy(BaseModel):
+    """Bounded retries with exponential backoff and full jitter."""
+
+    max_attempts: int = Field(3, ge=1, description="Attempts including the first.")
+    base_delay: float = Field(0.1, ge=0, description="Backoff before retry 1 (s).")
+    max_delay: float = Field(2.0, ge=0, description="Upper bound of one backoff (s).")
+
+    def backoff(self, retry_number: int, rng: random.Random) -> float:
+        """Returns a random delay in [0, min(max_delay, base_delay * 2**n)]."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (retry_number - 1)))
+        return rng.uniform(0, ceiling)
+
+
+class HedgingPolicy(BaseModel):
+    """
+    Sends a second, identical request when the first has been running for
+    longer than the given latency quantile of recent calls.
+    """
+
+    enabled: bool = Field(False, description="Whether to hedge at all.")
+    quantile: float = Field(0.95, gt=0, lt=1, description="Latency quantile.")
+    min_samples: int = Field(
+        20, ge=1, description="Samples needed before hedging is attempted."
+    )
+    min_delay: float = Field(0.05, ge=0, description="Never hedge earlier (s).")
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies, per capability."""
+
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, capability: str, seconds: float) -> None:
+        samples = self._samples.get(capability)
+        if samples is None:
+            samples = self._samples[capability] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def quantile(
+        self, capability: str, quantile: float, min_samples: int = 1
+    ) -> Optional[float]:
+        samples = self._samples.get(capability)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class RateLimiter:
+    """
+    Token bucket: allows ``rate`` acquisitions per second on average, with
+    bursts of up to ``burst``. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if burst < 1:
+            raise ValueError("burst must be >= 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Takes a token if one is available right now."""
+        self._refill()
+        if self._tokens >= 1 and not self._lock.locked():
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        """Waits for a token and takes it."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Bounds everything awaited inside the block to ``timeout`` seconds from
+    now. A scope can only tighten the deadline of an enclosing scope.
+    Yields the absolute deadline in effect.
+    """
+    outer = _current_deadline.get()
+    deadline = outer
+    if timeout is not None:
+        candidate = time.monotonic() + timeout
+        deadline = candidate if outer is None else min(outer, candidate)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+async def without_deadline(call: Callable[[], Awaitable[T]]) -> T:
+    """
+    Runs ``call`` with no deadline in effect. Meant as the body of a task
+    shared by several requests (which copies the context of the request that
+    started it): each request bounds its own wait with run_within_deadline()
+    instead of imposing its deadline on the others.
+    """
+    _current_deadline.set(None)
+    return await call()
+
+
+async def run_within_deadline(awaitable: Awaitable[T], what: str) -> T:
+    """Awaits ``awaitable``, cancelling it when the current deadline passes."""
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError as exc:
+        raise LLMDeadlineExceeded(
+            f"{what} did not complete before its deadline"
+        ) from exc
+
+
+async def _hedged(call: Callable[[], Awaitable[T]], hedge_after: Optional[float]) -> T:
+    """Runs ``call``, starting a second copy after ``hedge_after`` seconds."""
+    first = asyncio.ensure_future(call())
+    if hedge_after is None:
+        return await first
+    attempts = {first}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+        if not done:
+            attempts.add(asyncio.ensure_future(call()))
+        failure: Optional[BaseException] = None
+        while attempts:
+            done, attempts = await asyncio.wait(
+                attempts, return_when=asyncio.FIRST_COMPLETED
+            )
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+                failure = attempt.exception()
+        assert failure is not None
+        raise failure
+    finally:
+        for attempt in attempts:
+            attempt.cancel()
+
+
+async def call_with_retries(
+    call: Callable[[], Awaitable[T]],
+    capability: str,
+    retry_policy: RetryPolicy,
+    hedging_policy: HedgingPolicy,
+    latency_tracker: LatencyTracker,
+    rng: Optional[random.Random] = None,
+) -> T:
+    """
+    Calls a model, retrying transient failures with jittered exponential
+    backoff and optionally hedging slow attempts. Neither attempts nor
+    backoff sleeps run past the current deadline.
+    """
+    rng = rng or random.Random()
+    last_error: Optional[TransientLLMBackendError] = None
+    for attempt_number in range(1, retry_policy.max_attempts + 1):
+        if attempt_number > 1:
+            delay = retry_policy.backoff(attempt_number - 1, rng)
+            remaining = remaining_time()
+            if remaining is not None and delay >= remaining:
+                raise LLMDeadlineExceeded(
+                    f"{capability} did not complete before its deadline "
+                    f"(last error: {last_error})"
+                ) from last_error
+            await asyncio.sleep(delay)
+
+        hedge_after = None
+        if hedging_policy.enabled:
+            quantile = latency_tracker.quantile(
+                capability, hedging_policy.quantile, hedging_policy.min_samples
+            )
+            if quantile is not None:
+                hedge_after = max(quantile, hedging_policy.min_delay)
+
+        started = time.monotonic()
+        try:
+            result = await run_within_deadline(_hedged(call, hedge_after), capability)
+        except TransientLLMBackendError as exc:
+            last_error = exc
+            continue
+        latency_tracker.record(capability, time.monotonic() - started)
+        return result
+
+    raise LLMBackendError(
+        f"{capability} failed after {retry_policy.max_attempts} attempts: "
+        f"{last_error}"
+    ) from last_error
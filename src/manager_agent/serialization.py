@@ -0,0 +1,117 @@
+"""
+Encoding of MCP responses for the transport. Responses are immutable once
+returned (cached validation results and broadcast suggestions are shared
+objects), so ResponseEncoder keeps the encoded form of each object it has
+seen and encodes a shared object only once however many times, or to
+however many subscribers, it is sent. Besides JSON, payloads can be
+encoded as MessagePack (when the ``msgpack`` package is installed), which
+is smaller and suited to the streaming channel.
+"""
+
+from collections import OrderedDict
+from typing import Any, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel, Field
+
+from .enums import EncodingEnum
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def msgpack_available() -> bool:
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _msgpack() -> Any:
+    try:
+        import msgpack
+    except ImportError as exc:
+        raise ImportError(
+            "MessagePack encoding requires the 'msgpack' package"
+        ) from exc
+    return msgpack
+
+
+def encode(model: BaseModel, encoding: EncodingEnum = EncodingEnum.JSON) -> bytes:
+    """
+    Encodes a model without caching. JSON is model_dump_json(); MessagePack
+    leaves out fields that are None (decoding restores them as defaults).
+    """
+    if encoding is EncodingEnum.JSON:
+        return model.model_dump_json().encode("utf-8")
+    return _msgpack().packb(
+        model.model_dump(mode="json", exclude_none=True), use_bin_type=True
+    )
+
+
+def decode(
+    data: Union[bytes, str],
+    response_model: Type[ModelT],
+    encoding: EncodingEnum = EncodingEnum.JSON,
+) -> ModelT:
+    if encoding is EncodingEnum.JSON:
+        return response_model.model_validate_json(data)
+    return response_model.model_validate(_msgpack().unpackb(data, raw=False))
+
+
+class EncoderStats(BaseModel):
+    """Point-in-time counters of a ResponseEncoder."""
+
+    hits: int = Field(0, description="Encodings reused for an already seen object.")
+    misses: int = Field(0, description="Objects encoded.")
+    evictions: int = Field(0, description="Encodings dropped because it was full.")
+    size: int = Field(0, description="Encodings currently kept.")
+    max_entries: int = Field(..., description="Configured entry limit.")
+
+
+class ResponseEncoder:
+    """
+    Encodes responses, keeping the encoded form of the last ``max_entries``
+    objects (by identity, per encoding). An encoded object must not be
+    mutated afterwards, as its cached form would no longer match it.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        # (id, encoding) -> (object, encoded); the object is kept so its id
+        # cannot be reused while the entry exists.
+        self._entries: "OrderedDict[Tuple[int, EncodingEnum], Tuple[Any, bytes]]" = (
+            OrderedDict()
+        )
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def encode(
+        self, model: BaseModel, encoding: EncodingEnum = EncodingEnum.JSON
+    ) -> bytes:
+        key = (id(model), encoding)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is model:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+        self._misses += 1
+        data = encode(model, encoding)
+        if self.max_entries > 0:
+            self._entries[key] = (model, data)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return data
+
+    def stats(self) -> EncoderStats:
+        return EncoderStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._entries),
+            max_entries=self.max_entries,
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalizes free text (queries, task descriptions) for use in keys."""
+    if not text:
+        return ""
+    return " ".join(text.split()).casefold()
+
+
+class _InFlightCall:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight task.
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task and receive the same result (or
+    exception). Results are shared objects and must not be mutated.
+    A waiter that is cancelled only stops waiting; the shared task is
+    cancelled when its last waiter goes away, so abandoned work does not keep
+    running. Keys are forgotten as soon as the task finishes, so this is not
+    a cache.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _InFlightCall(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(
+                lambda _, key=key, call=call: self._forget(key, call)
+            )
+            self.started += 1
+        else:
+            self.coalesced += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every waiter was cancelled; nobody wants the result anymore.
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _InFlightCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
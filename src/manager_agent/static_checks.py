@@ -0,0 +1,480 @@
+import ast
+import re
+import textwrap
+import time
+from collections import OrderedDict, defaultdict
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from pydantic import BaseModel, Field
+
+from .context_manager import CodingStandard, ProjectContext
+from .enums import SeverityEnum
+from .feedback import sort_feedback
+from .models import LineRange, ValidationFeedbackItem
+
+# PEP 8's maximum line length, used unless a standard names another one.
+DEFAULT_MAX_LINE_LENGTH = 79
+# Files the checker parses; other languages go to the model unchecked.
+PYTHON_SUFFIXES = (".py", ".pyi")
+
+_SNAKE_CASE = re.compile(r"_*[a-z][a-z0-9_]*")
+_UPPER_CASE = re.compile(r"_*[A-Z][A-Z0-9_]*")
+_CAP_WORDS = re.compile(r"_*[A-Z][a-zA-Z0-9]*")
+_NOQA = re.compile(r"#\s*noqa\b", re.IGNORECASE)
+_LINE_LENGTH = re.compile(
+    r"(\d{2,3})\s*(?:characters|chars|columns)|line length\D{0,20}(\d{2,3})",
+    re.IGNORECASE,
+)
+
+# A finding before it is tied to standards: (start_line, end_line, message,
+# suggested fix).
+Finding = Tuple[int, int, str, Optional[str]]
+
+
+class Scoped(NamedTuple):
+    """An AST node with the kind of scope it is defined in."""
+
+    node: ast.AST
+    scope: str  # "module", "class" or "function"
+    public: bool  # Reachable from outside: not nested in a private name
+
+
+class SourceView:
+    """What rules look at: the code's lines and its AST nodes, by type."""
+
+    def __init__(self, code_content: str):
+        self.lines = code_content.splitlines()
+        self.tree: Optional[ast.Module] = None
+        self.syntax_error: Optional[SyntaxError] = None
+        self.nodes: Dict[Type[ast.AST], List[Scoped]] = defaultdict(list)
+        try:
+            # Dedenting lets fragments (a method on its own) parse; line
+            # numbers are unchanged.
+            self.tree = ast.parse(textwrap.dedent(code_content))
+        except SyntaxError as exc:
+            self.syntax_error = exc
+            return
+        except ValueError as exc:  # Null bytes in the source
+            self.syntax_error = SyntaxError(str(exc))
+            return
+        self._collect(self.tree)
+
+    def _collect(self, tree: ast.Module) -> None:
+        """Groups every node by type in one traversal, tracking scopes."""
+        stack: List[Tuple[ast.AST, str, bool]] = [(tree, "module", True)]
+        while stack:
+            node, scope, public = stack.pop()
+            self.nodes[type(node)].append(Scoped(node, scope, public))
+            inner_scope, inner_public = scope, public
+            if isinstance(node, ast.ClassDef):
+                inner_scope = "class"
+                inner_public = public and not node.name.startswith("_")
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                inner_scope, inner_public = "function", False
+            for child in ast.iter_child_nodes(node):
+                stack.append((child, inner_scope, inner_public))
+
+    def noqa(self, line_number: int) -> bool:
+        line = self.lines[line_number - 1] if line_number <= len(self.lines) else ""
+        return bool(_NOQA.search(line))
+
+
+class Rule:
+    """
+    A deterministic check of one convention. ``pattern`` selects the rule
+    for coding standards whose category or description matches it.
+    """
+
+    def __init__(
+        self,
+        rule_id: str,
+        pattern: str,
+        severity: SeverityEnum,
+        check: Callable[[SourceView, int], Iterable[Finding]],
+    ):
+        self.rule_id = rule_id
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.severity = severity
+        self.check = check
+
+
+def _check_line_length(source: SourceView, limit: int) -> Iterator[Finding]:
+    for number, line in enumerate(source.lines, 1):
+        if len(line) > limit and not _NOQA.search(line):
+            yield number, number, (
+                f"Line is {len(line)} characters long (limit is {limit})."
+            ), None
+
+
+def _check_trailing_whitespace(source: SourceView, _: int) -> Iterator[Finding]:
+    for number, line in enumerate(source.lines, 1):
+        if line != line.rstrip() and not _NOQA.search(line):
+            yield number, number, "Trailing whitespace.", line.rstrip()
+
+
+def _check_tab_indentation(source: SourceView, _: int) -> Iterator[Finding]:
+    for number, line in enumerate(source.lines, 1):
+        indentation = line[: len(line) - len(line.lstrip())]
+        if "\t" in indentation and not _NOQA.search(line):
+            yield number, number, "Indentation uses tabs instead of spaces.", (
+                indentation.expandtabs(4) + line.lstrip()
+            )
+
+
+def _check_bare_except(source: SourceView, _: int) -> Iterator[Finding]:
+    for scoped in source.nodes[ast.ExceptHandler]:
+        handler = scoped.node
+        assert isinstance(handler, ast.ExceptHandler)
+        if handler.type is None and not source.noqa(handler.lineno):
+            yield handler.lineno, handler.lineno, (
+                "Bare 'except:' also catches SystemExit and KeyboardInterrupt; "
+                "catch Exception or a narrower type."
+            ), None
+
+
+def _check_none_comparison(source: SourceView, _: int) -> Iterator[Finding]:
+    for scoped in source.nodes[ast.Compare]:
+        compare = scoped.node
+        assert isinstance(compare, ast.Compare)
+        for operator, operand in zip(compare.ops, compare.comparators):
+            if (
+                isinstance(operator, (ast.Eq, ast.NotEq))
+                and isinstance(operand, ast.Constant)
+                and operand.value is None
+                and not source.noqa(compare.lineno)
+            ):
+                identity = "is not" if isinstance(operator, ast.NotEq) else "is"
+                yield compare.lineno, compare.lineno, (
+                    f"Comparison to None should use '{identity}'."
+                ), None
+
+
+def _functions(source: SourceView) -> Iterator[Scoped]:
+    yield from source.nodes[ast.FunctionDef]
+    yield from source.nodes[ast.AsyncFunctionDef]
+
+
+def _check_function_names(source: SourceView, _: int) -> Iterator[Finding]:
+    for scoped in _functions(source):
+        function = scoped.node
+        assert isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef))
+        name = function.name
+        if name.startswith("__") and name.endswith("__"):
+            continue
+        if not _SNAKE_CASE.fullmatch(name) and not source.noqa(function.lineno):
+            yield function.lineno, function.lineno, (
+                f"Function name '{name}' should be snake_case."
+            ), None
+
+
+def _check_variable_names(source: SourceView, _: int) -> Iterator[Finding]:
+    reported = set()
+    for scoped in source.nodes[ast.Name]:
+        name_node = scoped.node
+        assert isinstance(name_node, ast.Name)
+        name = name_node.id
+        if not isinstance(name_node.ctx, ast.Store) or name in reported:
+            continue
+        if _SNAKE_CASE.fullmatch(name):
+            continue
+        # Module and class constants are UPPER_CASE; class aliases CapWords.
+        if scoped.scope != "function" and (
+            _UPPER_CASE.fullmatch(name) or _CAP_WORDS.fullmatch(name)
+        ):
+            continue
+        if source.noqa(name_node.lineno):
+            continue
+        reported.add(name)
+        yield name_node.lineno, name_node.lineno, (
+            f"Variable name '{name}' should be snake_case."
+        ), None
+    for scoped in source.nodes[ast.arg]:
+        argument = scoped.node
+        assert isinstance(argument, ast.arg)
+        if argument.arg in reported or _SNAKE_CASE.fullmatch(argument.arg):
+            continue
+        reported.add(argument.arg)
+        yield argument.lineno, argument.lineno, (
+            f"Argument name '{argument.arg}' should be snake_case."
+        ), None
+
+
+def _check_class_names(source: SourceView, _: int) -> Iterator[Finding]:
+    for scoped in source.nodes[ast.ClassDef]:
+        cls = scoped.node
+        assert isinstance(cls, ast.ClassDef)
+        if not _CAP_WORDS.fullmatch(cls.name) and not source.noqa(cls.lineno):
+            yield cls.lineno, cls.lineno, (
+                f"Class name '{cls.name}' should use CapWords."
+            ), None
+
+
+def _check_docstrings(source: SourceView, _: int) -> Iterator[Finding]:
+    definitions = [*source.nodes[ast.ClassDef], *_functions(source)]
+    for scoped in definitions:
+        node = scoped.node
+        assert isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef))
+        if (
+            not scoped.public
+            or scoped.scope == "function"
+            or node.name.startswith("_")
+            or ast.get_docstring(node) is not None
+            or source.noqa(node.lineno)
+        ):
+            continue
+        kind = "class" if isinstance(node, ast.ClassDef) else "function"
+        yield node.lineno, node.lineno, (
+            f"Public {kind} '{node.name}' has no docstring."
+        ), None
+
+
+_PEP8 = r"\bpep\s*-?\s*8\b"
+
+# The rule set, in reporting order. A standard may select several rules.
+RULES: List[Rule] = [
+    Rule(
+        "line-length",
+        _PEP8 + r"|line length|characters per line|long lines",
+        SeverityEnum.SUGGESTION,
+        _check_line_length,
+    ),
+    Rule(
+        "trailing-whitespace",
+        _PEP8 + r"|trailing whitespace",
+        SeverityEnum.SUGGESTION,
+        _check_trailing_whitespace,
+    ),
+    Rule(
+        "tab-indentation",
+        _PEP8 + r"|\btabs?\b|indentation",
+        SeverityEnum.WARNING,
+        _check_tab_indentation,
+    ),
+    Rule(
+        "bare-except", _PEP8 + r"|bare except", SeverityEnum.WARNING, _check_bare_except
+    ),
+    Rule(
+        "none-comparison",
+        _PEP8 + r"|comparisons? to none",
+        SeverityEnum.SUGGESTION,
+        _check_none_comparison,
+    ),
+    Rule(
+        "function-naming",
+        _PEP8 + r"|snake[\s_-]?case",
+        SeverityEnum.WARNING,
+        _check_function_names,
+    ),
+    Rule(
+        "variable-naming",
+        r"(?:variable|argument|parameter).*snake[\s_-]?case"
+        r"|snake[\s_-]?case.*(?:variable|argument|parameter)",
+        SeverityEnum.WARNING,
+        _check_variable_names,
+    ),
+    Rule(
+        "class-naming",
+        _PEP8 + r"|cap[\s_-]?words|pascal[\s_-]?case|camel[\s_-]?case",
+        SeverityEnum.WARNING,
+        _check_class_names,
+    ),
+    Rule("docstrings", r"docstring", SeverityEnum.WARNING, _check_docstrings),
+]
+
+
+def _standard_text(standard: CodingStandard) -> str:
+    return f"{standard.category or ''} {standard.description}"
+
+
+def _line_length_limit(standards: Sequence[CodingStandard]) -> int:
+    for standard in standards:
+        match = _LINE_LENGTH.search(standard.description)
+        if match:
+            return int(match.group(1) or match.group(2))
+    return DEFAULT_MAX_LINE_LENGTH
+
+
+class CompiledRule(NamedTuple):
+    rule: Rule
+    standard_ids: Tuple[str, ...]  # Standards the rule enforces
+    option: int  # Rule parameter (the line length limit)
+
+
+class CompiledRules(NamedTuple):
+    rules: List[CompiledRule]
+    covered_standard_ids: Tuple[str, ...]  # Standards with at least one rule
+
+
+def compile_rules(
+    coding_standards: Sequence[CodingStandard], rules: Sequence[Rule] = RULES
+) -> CompiledRules:
+    """Maps coding standards to the rules that check them."""
+    compiled = []
+    covered = set()
+    for rule in rules:
+        standards = [
+            standard
+            for standard in coding_standards
+            if rule.pattern.search(_standard_text(standard))
+        ]
+        if not standards:
+            continue
+        option = _line_length_limit(standards) if rule.rule_id == "line-length" else 0
+        standard_ids = tuple(standard.id for standard in standards)
+        compiled.append(CompiledRule(rule, standard_ids, option))
+        covered.update(standard_ids)
+    return CompiledRules(
+        compiled,
+        tuple(standard.id for standard in coding_standards if standard.id in covered),
+    )
+
+
+class StaticCheckResult(NamedTuple):
+    feedback_items: List[ValidationFeedbackItem]
+    # Standards whose rules ran; their findings need not come from a model.
+    covered_standard_ids: Tuple[str, ...]
+    # The findings settle the validation (the code does not parse), so no
+    # model call is needed.
+    settled: bool
+
+
+class RuleStats(BaseModel):
+    rule_id: str
+    runs: int = Field(0, description="Times the rule was run.")
+    findings: int = Field(0, description="Feedback items it produced.")
+    seconds: float = Field(0.0, description="Time spent in the rule.")
+
+
+class StaticCheckStats(BaseModel):
+    """Point-in-time counters of a StaticChecker."""
+
+    requests: int = Field(0, description="Code submissions checked.")
+    settled: int = Field(0, description="Submissions settled without a model.")
+    parse_seconds: float = Field(0.0, description="Time spent parsing code.")
+    compiled_hits: int = Field(0, description="Checks reusing compiled rules.")
+    compiled_misses: int = Field(0, description="Checks compiling rules first.")
+    rules: List[RuleStats] = Field(default_factory=list)
+
+    @property
+    def settled_fraction(self) -> float:
+        return self.settled / self.requests if self.requests else 0.0
+
+
+class StaticChecker:
+    """
+    Checks code against the coding standards that can be verified without a
+    model (PEP 8 layout, naming, docstrings). Each standard is mapped to
+    rules by matching its category and description; the code is parsed
+    once and every rule runs over the shared lines and AST nodes.
+    Findings carry exact line ranges and cite the standards they enforce.
+    Only Python files (``.py``/``.pyi``) are checked; a Python file that
+    does not parse settles the validation on its own, unless no rule applies
+    to the project's standards.
+    Compiled rule sets are kept per context fingerprint.
+    """
+
+    def __init__(self, rules: Sequence[Rule] = RULES, max_compiled: int = 8):
+        self.rules = list(rules)
+        self.max_compiled = max_compiled
+        self._compiled: "OrderedDict[str, CompiledRules]" = OrderedDict()
+        self._stats = StaticCheckStats()
+        self._rule_stats: Dict[str, RuleStats] = {
+            rule.rule_id: RuleStats(rule_id=rule.rule_id) for rule in self.rules
+        }
+
+    def rules_for(
+        self, project_context: ProjectContext, fingerprint: str
+    ) -> CompiledRules:
+        compiled = self._compiled.get(fingerprint)
+        if compiled is None:
+            self._stats.compiled_misses += 1
+            compiled = compile_rules(project_context.coding_standards, self.rules)
+            self._compiled[fingerprint] = compiled
+            while len(self._compiled) > self.max_compiled:
+                self._compiled.popitem(last=False)
+        else:
+            self._stats.compiled_hits += 1
+            self._compiled.move_to_end(fingerprint)
+        return compiled
+
+    def check(
+        self,
+        code_content: str,
+        file_path: str,
+        project_context: ProjectContext,
+        fingerprint: str,
+    ) -> StaticCheckResult:
+        compiled = self.rules_for(project_context, fingerprint)
+        self._stats.requests += 1
+        if not compiled.rules or not file_path.endswith(PYTHON_SUFFIXES):
+            return StaticCheckResult([], (), False)
+        started = time.perf_counter()
+        source = SourceView(code_content)
+        self._stats.parse_seconds += time.perf_counter() - started
+
+        items: List[ValidationFeedbackItem] = []
+        if source.syntax_error is not None:
+            error = source.syntax_error
+            line = error.lineno or 1
+            items.append(
+                ValidationFeedbackItem(
+                    item_id=f"static-syntax-error-L{line}",
+                    severity=SeverityEnum.ERROR,
+                    message=f"Syntax error: {error.msg}.",
+                    file_path=file_path,
+                    line_range=LineRange(start_line=line, end_line=line),
+                )
+            )
+            self._stats.settled += 1
+            return StaticCheckResult(items, compiled.covered_standard_ids, True)
+
+        # Findings of one rule on one line after the first get a sequence
+        # number, so that item ids stay unique.
+        seen: Dict[Tuple[str, int], int] = {}
+        for compiled_rule in compiled.rules:
+            rule = compiled_rule.rule
+            citation = ", ".join(compiled_rule.standard_ids)
+            started = time.perf_counter()
+            findings = list(rule.check(source, compiled_rule.option))
+            stats = self._rule_stats[rule.rule_id]
+            stats.seconds += time.perf_counter() - started
+            stats.runs += 1
+            stats.findings += len(findings)
+            for start_line, end_line, message, fix in findings:
+                item_id = f"static-{rule.rule_id}-L{start_line}"
+                count = seen[rule.rule_id, start_line] = (
+                    seen.get((rule.rule_id, start_line), 0) + 1
+                )
+                if count > 1:
+                    item_id += f"-{count}"
+                items.append(
+                    ValidationFeedbackItem(
+                        item_id=item_id,
+                        severity=rule.severity,
+                        message=f"[{citation}] {message}",
+                        file_path=file_path,
+                        line_range=LineRange(start_line=start_line, end_line=end_line),
+                        suggested_code_fix=fix,
+                    )
+                )
+        return StaticCheckResult(
+            sort_feedback(items), compiled.covered_standard_ids, False
+        )
+
+    def stats(self) -> StaticCheckStats:
+        return self._stats.model_copy(
+            update={
+                "rules": [stats.model_copy() for stats in self._rule_stats.values()]
+            }
+        )
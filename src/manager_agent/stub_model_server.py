@@ -0,0 +1,263 @@
+"""
+A local stand-in for a model server, speaking the protocol expected by
+HTTPLLMBackend. It answers every capability with a canned, schema-valid
+response after a configurable latency, and can inject errors, so pool,
+retry and throughput behavior can be exercised offline.
+
+Run standalone with ``python -m manager_agent.stub_model_server --port 8099``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .enums import ReferenceTypeEnum, SeverityEnum, StatusEnum
+from .models import (
+    GetProjectAdviceResponse,
+    GetTaskStartingContextResponse,
+    ReferenceItem,
+    ValidateCodeResponse,
+    ValidationFeedbackItem,
+)
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable"}
+
+
+class StubServerStats(BaseModel):
+    connections_opened: int = 0
+    active_connections: int = 0
+    requests: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    errors_injected: int = 0
+
+
+def _canned_response(capability: str, prompt: str) -> Optional[BaseModel]:
+    if capability == "validate_code":
+        return ValidateCodeResponse(
+            validation_id="stub-validation",
+            status=StatusEnum.VALID_WITH_SUGGESTIONS,
+            feedback_items=[
+                ValidationFeedbackItem(
+                    item_id="stub-sug-001",
+                    severity=SeverityEnum.SUGGESTION,
+                    message="Stub Suggestion: Consider more comments.",
+                    file_path="stub.py",
+                )
+            ],
+        )
+    if capability == "generate_advice":
+        return GetProjectAdviceResponse(
+            advice_id="stub-advice",
+            response_text="Stub advice: consult the project documentation.",
+            references=[
+                ReferenceItem(
+                    reference_type=ReferenceTypeEnum.DOCUMENTATION,
+                    path_or_url="docs/README.md",
+                    description="Project README",
+                )
+            ],
+        )
+    if capability == "generate_task_starting_context":
+        return GetTaskStartingContextResponse(
+            context_id="stub-context",
+            context_summary="Stub context: follow the project coding standards.",
+        )
+    return None
+
+
+class StubModelServer:
+    """
+    Minimal HTTP/1.1 keep-alive server answering ``POST /v1/complete``.
+    ``latency_seconds`` (plus up to ``latency_jitter_seconds``) is waited
+    before each response, and a fraction ``error_rate`` of requests fail
+    with ``error_status``. Connection and concurrency counters are kept in
+    ``stats`` so connection reuse can be checked.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats = StubServerStats()
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "StubModelServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.stats.connections_opened += 1
+        self.stats.active_connections += 1
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as exc:
+                    # Where the next request would start is unknown.
+                    self._write_response(writer, 400, {"error": str(exc)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                path, headers, body = request
+                status, payload = await self._respond(path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # Also on cancellation (shutting down with a request in progress):
+            # the client gets a closed connection, a transient failure.
+            self.stats.active_connections -= 1
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, Dict[str, str], bytes]]:
+        """
+        Reads one request; returns None once the client is done. Raises
+        ValueError if the request line or Content-Length is malformed.
+        """
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ValueError(f"Malformed request line {request_line!r}")
+        path = parts[1]
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        content_length = headers.get("content-length", "0")
+        if not (content_length.isascii() and content_length.isdigit()):
+            raise ValueError(f"Invalid Content-Length {content_length!r}")
+        body = await reader.readexactly(int(content_length))
+        return path, headers, body
+
+    async def _respond(self, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+        try:
+            delay = self.latency_seconds + self._random.uniform(
+                0, self.latency_jitter_seconds
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if path != "/v1/complete":
+                return 404, {"error": f"Unknown path {path}"}
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats.errors_injected += 1
+                return self.error_status, {"error": "Injected failure"}
+            try:
+                request = json.loads(body)
+                capability, prompt = request["capability"], request["prompt"]
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": "Expected {capability, prompt} JSON body"}
+            response = _canned_response(capability, prompt)
+            if response is None:
+                return 400, {"error": f"Unknown capability {capability}"}
+            text = response.model_dump_json()
+            return 200, {
+                "text": text,
+                "usage": {
+                    "prompt_tokens": len(prompt.split()),
+                    "completion_tokens": len(text.split()),
+                },
+            }
+        finally:
+            self.stats.in_flight -= 1
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Dict[str, Any],
+        keep_alive: bool,
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def serve() -> None:
+        server = StubModelServer(
+            args.host,
+            args.port,
+            latency_seconds=args.latency,
+            latency_jitter_seconds=args.jitter,
+            error_rate=args.error_rate,
+        )
+        logger.info("Stub model server listening on %s", await server.start())
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
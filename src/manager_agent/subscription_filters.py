@@ -0,0 +1,115 @@
+from typing import Dict, Generic, List, NamedTuple, Optional, Tuple, TypeVar
+
+from .enums import PriorityEnum, SuggestionTypeEnum
+from .models import FilterPreferences, ProactiveSuggestionItem
+
+T = TypeVar("T")
+
+PRIORITY_RANK = {PriorityEnum.LOW: 0, PriorityEnum.MEDIUM: 1, PriorityEnum.HIGH: 2}
+TYPE_BITS = {
+    suggestion_type: 1 << position
+    for position, suggestion_type in enumerate(SuggestionTypeEnum)
+}
+ALL_TYPES = (1 << len(TYPE_BITS)) - 1
+
+
+def matches_filters(
+    filter_preferences: Optional[FilterPreferences], item: ProactiveSuggestionItem
+) -> bool:
+    """Evaluates FilterPreferences directly; the reference for CompiledFilter."""
+    if filter_preferences is None:
+        return True
+    min_priority = filter_preferences.min_priority
+    if min_priority is not None and (
+        PRIORITY_RANK[item.priority] < PRIORITY_RANK[min_priority]
+    ):
+        return False
+    types = filter_preferences.types_to_include
+    return types is None or item.type in types
+
+
+class CompiledFilter(NamedTuple):
+    """FilterPreferences as a bitmask of accepted types and a priority rank."""
+
+    type_mask: int
+    min_rank: int
+
+    def accepts(self, item: ProactiveSuggestionItem) -> bool:
+        return bool(self.type_mask & TYPE_BITS[item.type]) and (
+            PRIORITY_RANK[item.priority] >= self.min_rank
+        )
+
+
+ACCEPT_ALL = CompiledFilter(ALL_TYPES, 0)
+
+
+def compile_filters(filter_preferences: Optional[FilterPreferences]) -> CompiledFilter:
+    if filter_preferences is None:
+        return ACCEPT_ALL
+    types = filter_preferences.types_to_include
+    type_mask = ALL_TYPES
+    if types is not None:
+        type_mask = 0
+        for suggestion_type in types:
+            type_mask |= TYPE_BITS[suggestion_type]
+    min_priority = filter_preferences.min_priority
+    return CompiledFilter(
+        type_mask, PRIORITY_RANK[min_priority] if min_priority is not None else 0
+    )
+
+
+class FilterGroups(Generic[T]):
+    """
+    Subscribers grouped by identical CompiledFilter, so one check routes a
+    suggestion to a whole group. Which groups accept a (type, priority)
+    pair is cached until a group is added or removed, so routing a
+    suggestion costs one dictionary lookup however many filters exist.
+    """
+
+    def __init__(self) -> None:
+        self._groups: Dict[CompiledFilter, Dict[str, T]] = {}
+        self._routes: Dict[
+            Tuple[SuggestionTypeEnum, PriorityEnum], List[Dict[str, T]]
+        ] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of members across all groups."""
+        return self._size
+
+    @property
+    def group_count(self) -> int:
+        return len(self._groups)
+
+    def add(self, key: str, compiled: CompiledFilter, member: T) -> None:
+        group = self._groups.get(compiled)
+        if group is None:
+            group = self._groups[compiled] = {}
+            self._routes.clear()
+        if key not in group:
+            self._size += 1
+        group[key] = member
+
+    def remove(self, key: str, compiled: CompiledFilter) -> Optional[T]:
+        group = self._groups.get(compiled)
+        if group is None or key not in group:
+            return None
+        member = group.pop(key)
+        self._size -= 1
+        if not group:
+            del self._groups[compiled]
+            self._routes.clear()
+        return member
+
+    def route(self, item: ProactiveSuggestionItem) -> List[Dict[str, T]]:
+        """The groups (member dicts keyed like add()) accepting ``item``."""
+        route_key = (item.type, item.priority)
+        groups = self._routes.get(route_key)
+        if groups is None:
+            type_bit, rank = TYPE_BITS[item.type], PRIORITY_RANK[item.priority]
+            groups = self._routes[route_key] = [
+                members
+                for compiled, members in self._groups.items()
+                if compiled.type_mask & type_bit and rank >= compiled.min_rank
+            ]
+        return groups
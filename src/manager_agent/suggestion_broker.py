@@ -0,0 +1,419 @@
+import asyncio
+import itertools
+import logging
+import random
+import uuid
+from collections import OrderedDict
+from enum import Enum
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .enums import EncodingEnum, StatusEnum, SubscriptionActionEnum
+from .models import (
+    FilterPreferences,
+    ProactiveSuggestionItem,
+    StreamProactiveSuggestionsSubscriptionRequest,
+    StreamProactiveSuggestionsSubscriptionResponse,
+)
+from .resilience import RetryPolicy
+from .serialization import ResponseEncoder, msgpack_available
+from .subscription_filters import FilterGroups, compile_filters
+
+logger = logging.getLogger(__name__)
+
+# Produces the suggestion stream of one project, e.g.
+# lambda project_id: llm_interface.stream_proactive_suggestions(ctx, pipeline).
+SuggestionProducer = Callable[[str], AsyncIterator[ProactiveSuggestionItem]]
+
+
+class OverflowPolicy(str, Enum):
+    """What a full subscriber queue does with a new suggestion."""
+
+    # Discard the oldest queued suggestion.
+    DROP_OLDEST = "drop_oldest"
+    # Replace a queued suggestion about the same thing (file, type and
+    # lines) in place; otherwise discard the oldest.
+    COALESCE = "coalesce"
+
+
+def coalesce_key(item: ProactiveSuggestionItem) -> Hashable:
+    """Suggestions with equal keys are about the same code; newer wins."""
+    line_range = item.line_range
+    return (
+        item.file_path,
+        item.type,
+        (line_range.start_line, line_range.end_line) if line_range else None,
+    )
+
+
+def new_subscription_id() -> str:
+    return f"sub-{uuid.uuid4().hex[:12]}"
+
+
+class SubscriptionStats(BaseModel):
+    subscription_id: str
+    project_id: str
+    queued: int = Field(0, description="Suggestions waiting to be consumed.")
+    delivered: int = Field(0, description="Suggestions consumed.")
+    dropped: int = Field(0, description="Suggestions discarded when full.")
+    coalesced: int = Field(0, description="Suggestions replaced by a newer one.")
+
+
+class BrokerStats(BaseModel):
+    """Point-in-time counters of a SuggestionBroker."""
+
+    projects: int = Field(0, description="Projects with a running producer.")
+    subscriptions: int = Field(0, description="Open subscriptions.")
+    filter_groups: int = Field(0, description="Distinct filters in use.")
+    published: int = Field(0, description="Suggestions produced.")
+    routed: int = Field(0, description="Suggestions queued for a subscriber.")
+    delivered: int = Field(0, description="Suggestions consumed.")
+    dropped: int = Field(0, description="Suggestions discarded when full.")
+    coalesced: int = Field(0, description="Suggestions replaced by a newer one.")
+    restarts: int = Field(0, description="Producers restarted after failing.")
+
+
+class Subscription:
+    """
+    One subscriber's view of a project's suggestions: a bounded queue that
+    never blocks the producer. Iterate over it to consume suggestions; the
+    iteration ends once the subscription is closed. get_encoded() returns
+    them encoded for the stream instead; suggestions are shared by all
+    subscribers, so ``encoder`` encodes each once per encoding.
+    """
+
+    def __init__(
+        self,
+        subscription_id: str,
+        project_id: str,
+        filter_preferences: Optional[FilterPreferences],
+        max_queued: int,
+        overflow_policy: OverflowPolicy,
+        encoding: EncodingEnum = EncodingEnum.JSON,
+        encoder: Optional[ResponseEncoder] = None,
+    ):
+        if max_queued < 1:
+            raise ValueError("max_queued must be >= 1")
+        self.subscription_id = subscription_id
+        self.project_id = project_id
+        self.filter_preferences = filter_preferences
+        self.compiled_filter = compile_filters(filter_preferences)
+        self.max_queued = max_queued
+        self.overflow_policy = overflow_policy
+        self.encoding = encoding
+        self.encoder = encoder or ResponseEncoder()
+        self._items: "OrderedDict[Hashable, ProactiveSuggestionItem]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._stats = SubscriptionStats(
+            subscription_id=subscription_id, project_id=project_id
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def offer(self, item: ProactiveSuggestionItem) -> None:
+        """Queues a suggestion without waiting, making room if full."""
+        if self._closed:
+            return
+        if self.overflow_policy is OverflowPolicy.COALESCE:
+            key = coalesce_key(item)
+        else:
+            key = next(self._sequence)
+        if key in self._items:
+            # Keeps the queued suggestion's place in line.
+            self._items[key] = item
+            self._stats.coalesced += 1
+        else:
+            if len(self._items) >= self.max_queued:
+                self._items.popitem(last=False)
+                self._stats.dropped += 1
+            self._items[key] = item
+        self._ready.set()
+
+    async def get(self) -> Optional[ProactiveSuggestionItem]:
+        """Waits for the next suggestion; None once the subscription is closed."""
+        while not self._items:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        self._stats.delivered += 1
+        return self._items.popitem(last=False)[1]
+
+    async def get_encoded(self) -> Optional[bytes]:
+        """get(), encoded with the subscription's encoding."""
+        item = await self.get()
+        return None if item is None else self.encoder.encode(item, self.encoding)
+
+    def close(self) -> None:
+        """Ends the subscription; queued suggestions are discarded."""
+        self.finish()
+        self._items.clear()
+
+    def finish(self) -> None:
+        """Ends the subscription once its queued suggestions are consumed."""
+        self._closed = True
+        self._ready.set()
+
+    def stats(self) -> SubscriptionStats:
+        return self._stats.model_copy(update={"queued": len(self._items)})
+
+    def __aiter__(self) -> AsyncIterator[ProactiveSuggestionItem]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[ProactiveSuggestionItem]:
+        while True:
+            item = await self.get()
+            if item is None:
+                return
+            yield item
+
+
+class SuggestionBroker:
+    """
+    Fans each project's proactive suggestions out to all its subscribers,
+    so they are produced (and paid for) once however many IDEs subscribe.
+    A project's producer is started with its first subscription and
+    cancelled with its last. A producer that fails is restarted with
+    backoff (``restart_policy``, with ``max_attempts`` consecutive failures
+    before giving up); when it gives up or its stream ends, the project's
+    subscriptions are closed so that their consumers stop waiting.
+    Each subscription has its own bounded queue,
+    filled without waiting: when a subscriber falls behind, its queue
+    coalesces or drops its oldest suggestions (``overflow_policy``) rather
+    than slowing the producer or other subscribers.
+    Filters are compiled and subscribers grouped by identical filter, so
+    routing a suggestion checks each distinct filter at most once.
+    handle() implements the subscribe, unsubscribe and update_filters
+    actions of stream_proactive_suggestions.
+    """
+
+    def __init__(
+        self,
+        producer: SuggestionProducer,
+        max_queued: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.COALESCE,
+        encoder: Optional[ResponseEncoder] = None,
+        restart_policy: Optional[RetryPolicy] = None,
+    ):
+        self.producer = producer
+        self.max_queued = max_queued
+        self.overflow_policy = overflow_policy
+        # Shared by all subscriptions, so each suggestion is encoded once.
+        self.encoder = encoder or ResponseEncoder()
+        self.restart_policy = restart_policy or RetryPolicy(
+            max_attempts=5, base_delay=0.5, max_delay=30.0
+        )
+        self._rng = random.Random()
+        self._subscriptions: Dict[str, Subscription] = {}
+        self._by_project: Dict[str, FilterGroups[Subscription]] = {}
+        self._producers: Dict[str, "asyncio.Future[None]"] = {}
+        self._stats = BrokerStats()
+        # Counters of closed subscriptions, kept in the totals.
+        self._closed_stats = SubscriptionStats(subscription_id="", project_id="")
+
+    async def handle(
+        self, request: StreamProactiveSuggestionsSubscriptionRequest
+    ) -> StreamProactiveSuggestionsSubscriptionResponse:
+        """Applies a subscription management request."""
+        if request.action == SubscriptionActionEnum.SUBSCRIBE:
+            if request.encoding == EncodingEnum.MSGPACK and not msgpack_available():
+                return StreamProactiveSuggestionsSubscriptionResponse(
+                    status=StatusEnum.ERROR,
+                    message="MessagePack encoding is not available.",
+                )
+            subscription = self.subscribe(
+                request.project_id, request.filter_preferences, request.encoding
+            )
+            return StreamProactiveSuggestionsSubscriptionResponse(
+                subscription_id=subscription.subscription_id,
+                status=StatusEnum.SUBSCRIBED,
+                message=f"Subscribed to suggestions for {request.project_id}.",
+            )
+
+        subscription = self._subscriptions.get(request.subscription_id or "")
+        if subscription is None or subscription.project_id != request.project_id:
+            return StreamProactiveSuggestionsSubscriptionResponse(
+                subscription_id=request.subscription_id,
+                status=StatusEnum.ERROR,
+                message=(
+                    f"Unknown subscription {request.subscription_id!r} "
+                    f"for project {request.project_id!r}."
+                ),
+            )
+        if request.action == SubscriptionActionEnum.UNSUBSCRIBE:
+            await self.unsubscribe(subscription.subscription_id)
+            return StreamProactiveSuggestionsSubscriptionResponse(
+                subscription_id=subscription.subscription_id,
+                status=StatusEnum.UNSUBSCRIBED,
+                message="Unsubscribed.",
+            )
+        self.update_filters(subscription.subscription_id, request.filter_preferences)
+        return StreamProactiveSuggestionsSubscriptionResponse(
+            subscription_id=subscription.subscription_id,
+            status=StatusEnum.UPDATED,
+            message="Filters updated.",
+        )
+
+    def subscribe(
+        self,
+        project_id: str,
+        filter_preferences: Optional[FilterPreferences] = None,
+        encoding: EncodingEnum = EncodingEnum.JSON,
+    ) -> Subscription:
+        """Opens a subscription, starting the project's producer if needed."""
+        subscription = Subscription(
+            new_subscription_id(),
+            project_id,
+            filter_preferences,
+            self.max_queued,
+            self.overflow_policy,
+            encoding,
+            self.encoder,
+        )
+        self._subscriptions[subscription.subscription_id] = subscription
+        self._by_project.setdefault(project_id, FilterGroups()).add(
+            subscription.subscription_id, subscription.compiled_filter, subscription
+        )
+        if project_id not in self._producers:
+            self._producers[project_id] = asyncio.ensure_future(
+                self._produce(project_id)
+            )
+        return subscription
+
+    def get(self, subscription_id: str) -> Optional[Subscription]:
+        return self._subscriptions.get(subscription_id)
+
+    def update_filters(
+        self, subscription_id: str, filter_preferences: Optional[FilterPreferences]
+    ) -> bool:
+        """Replaces (and recompiles) a subscription's filters; False if unknown."""
+        subscription = self._subscriptions.get(subscription_id)
+        if subscription is None:
+            return False
+        groups = self._by_project[subscription.project_id]
+        groups.remove(subscription_id, subscription.compiled_filter)
+        subscription.filter_preferences = filter_preferences
+        subscription.compiled_filter = compile_filters(filter_preferences)
+        groups.add(subscription_id, subscription.compiled_filter, subscription)
+        return True
+
+    async def unsubscribe(self, subscription_id: str) -> bool:
+        """
+        Closes a subscription; the project's producer is stopped with its
+        last subscription. False if the subscription is unknown.
+        """
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return False
+        self._retire(subscription)
+        subscription.close()
+        subscribers = self._by_project[subscription.project_id]
+        subscribers.remove(subscription_id, subscription.compiled_filter)
+        if not subscribers:
+            del self._by_project[subscription.project_id]
+            producer = self._producers.pop(subscription.project_id, None)
+            if producer is not None:
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+        return True
+
+    def publish(self, project_id: str, item: ProactiveSuggestionItem) -> int:
+        """
+        Queues a suggestion for every matching subscriber of the project.
+        Never waits; returns the number of subscribers it was queued for.
+        """
+        self._stats.published += 1
+        groups = self._by_project.get(project_id)
+        if groups is None:
+            return 0
+        routed = 0
+        for members in groups.route(item):
+            for subscription in members.values():
+                subscription.offer(item)
+            routed += len(members)
+        self._stats.routed += routed
+        return routed
+
+    async def close(self) -> None:
+        for subscription_id in list(self._subscriptions):
+            await self.unsubscribe(subscription_id)
+
+    def stats(self) -> BrokerStats:
+        totals = self._closed_stats.model_copy()
+        for subscription in self._subscriptions.values():
+            stats = subscription.stats()
+            totals.delivered += stats.delivered
+            totals.dropped += stats.dropped
+            totals.coalesced += stats.coalesced
+        return self._stats.model_copy(
+            update={
+                "projects": len(self._producers),
+                "subscriptions": len(self._subscriptions),
+                "filter_groups": sum(
+                    groups.group_count for groups in self._by_project.values()
+                ),
+                "delivered": totals.delivered,
+                "dropped": totals.dropped,
+                "coalesced": totals.coalesced,
+            }
+        )
+
+    def subscription_stats(self) -> List[SubscriptionStats]:
+        return [subscription.stats() for subscription in self._subscriptions.values()]
+
+    def _retire(self, subscription: Subscription) -> None:
+        stats = subscription.stats()
+        self._closed_stats.delivered += stats.delivered
+        self._closed_stats.dropped += stats.dropped
+        self._closed_stats.coalesced += stats.coalesced
+
+    async def _produce(self, project_id: str) -> None:
+        try:
+            await self._produce_with_restarts(project_id)
+        finally:
+            if self._producers.get(project_id) is asyncio.current_task():
+                del self._producers[project_id]
+        # Not cancelled: nothing more will be produced for the subscribers.
+        self._close_project(project_id)
+
+    async def _produce_with_restarts(self, project_id: str) -> None:
+        failures = 0
+        while True:
+            try:
+                async for item in self.producer(project_id):
+                    failures = 0
+                    self.publish(project_id, item)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                failures += 1
+                if failures >= self.restart_policy.max_attempts:
+                    logger.exception(
+                        "Suggestion producer for %s failed; closing its subscriptions",
+                        project_id,
+                    )
+                    return
+                logger.exception(
+                    "Suggestion producer for %s failed; restarting", project_id
+                )
+            self._stats.restarts += 1
+            await asyncio.sleep(self.restart_policy.backoff(failures, self._rng))
+
+    def _close_project(self, project_id: str) -> None:
+        groups = self._by_project.pop(project_id, None)
+        if groups is None:
+            return
+        for subscription_id in [
+            subscription_id
+            for subscription_id, subscription in self._subscriptions.items()
+            if subscription.project_id == project_id
+        ]:
+            subscription = self._subscriptions.pop(subscription_id)
+            self._retire(subscription)
+            subscription.finish()
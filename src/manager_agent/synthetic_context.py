@@ -0,0 +1,194 @@
+"""
+Synthetic, arbitrarily large ProjectContexts and Python sources for
+benchmarks, grown from a real context (such as
+data/sample_project_context.json) so entries keep its vocabulary and shape.
+Generation is deterministic for a given seed.
+"""
+
+import random
+from typing import List, Sequence, Tuple
+
+from .context_manager import (
+    CodingStandard,
+    KeyModule,
+    ProjectContext,
+    ProjectRequirement,
+)
+
+_DOMAINS = [
+    "user",
+    "order",
+    "payment",
+    "inventory",
+    "notification",
+    "billing",
+    "search",
+    "report",
+    "session",
+    "audit",
+    "catalog",
+    "shipping",
+]
+_ROLES = [
+    "service",
+    "repository",
+    "client",
+    "handler",
+    "validator",
+    "scheduler",
+    "cache",
+    "gateway",
+    "worker",
+    "models",
+]
+_VERBS = ["load", "save", "validate", "process", "render", "sync", "fetch", "update"]
+_CATEGORIES = ["Formatting", "Naming", "Documentation", "Security", "Testing"]
+_PRIORITIES = ["high", "medium", "low"]
+
+
+def _words(rng: random.Random, vocabulary: Sequence[str], count: int) -> str:
+    return " ".join(rng.choice(vocabulary) for _ in range(count))
+
+
+def _vocabulary(base: ProjectContext) -> List[str]:
+    text = " ".join(
+        [
+            *(module.description for module in base.key_modules),
+            *(standard.description for standard in base.coding_standards),
+            *(requirement.description for requirement in base.requirements),
+            *base.project_goals,
+        ]
+    )
+    words = [word.strip(".,:;()'\"").lower() for word in text.split()]
+    return [word for word in words if len(word) > 3] or list(_DOMAINS)
+
+
+def scale_context(
+    base: ProjectContext,
+    modules: int,
+    standards: int,
+    requirements: int,
+    file_annotations: int = 0,
+    seed: int = 0,
+) -> ProjectContext:
+    """
+    Grows ``base`` to the given number of key modules, coding standards,
+    requirements and file annotations. The base's own entries come first;
+    generated ones reuse its vocabulary and id patterns.
+    """
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(base)
+    package = base.project_name.lower().replace(" ", "_")
+
+    key_modules = list(base.key_modules[:modules])
+    for i in range(len(key_modules), modules):
+        domain, role = rng.choice(_DOMAINS), rng.choice(_ROLES)
+        key_modules.append(
+            KeyModule(
+                name=f"{domain.title()}{role.title()}{i}",
+                description=f"{domain.title()} {role}: "
+                f"{_words(rng, vocabulary, rng.randint(6, 16))}.",
+                path=f"src/{package}/{domain}_{i % 97}/{role}_{i}.py",
+            )
+        )
+
+    coding_standards = list(base.coding_standards[:standards])
+    for i in range(len(coding_standards), standards):
+        description = _words(rng, vocabulary, rng.randint(8, 20))
+        coding_standards.append(
+            CodingStandard(
+                id=f"CS-{i:05d}",
+                description=f"{description.capitalize()}.",
+                category=rng.choice(_CATEGORIES),
+            )
+        )
+
+    project_requirements = list(base.requirements[:requirements])
+    for i in range(len(project_requirements), requirements):
+        project_requirements.append(
+            ProjectRequirement(
+                id=f"REQ-{i:05d}",
+                description=f"The system must "
+                f"{_words(rng, vocabulary, rng.randint(8, 20))}.",
+                priority=rng.choice(_PRIORITIES),
+            )
+        )
+
+    annotations = dict(base.file_annotations)
+    for i in range(file_annotations):
+        path = f"src/{package}/{rng.choice(_DOMAINS)}_{i % 97}/file_{i}.py"
+        annotations[path] = _words(rng, vocabulary, rng.randint(5, 12))
+
+    return base.model_copy(
+        update={
+            "key_modules": key_modules,
+            "coding_standards": coding_standards,
+            "requirements": project_requirements,
+            "file_annotations": annotations,
+        }
+    )
+
+
+def synthetic_source(lines: int, seed: int = 0) -> str:
+    """
+    A parseable Python module of at least ``lines`` lines (whole
+    definitions only): imports, then classes with documented methods and
+    module-level functions.
+    """
+    rng = random.Random(seed)
+    out = ["import logging", "from typing import Dict, List, Optional", ""]
+    index = 0
+    while len(out) < lines:
+        domain = rng.choice(_DOMAINS)
+        index += 1
+        if rng.random() < 0.5:
+            out += [
+                "",
+                f"class {domain.title()}Record{index}:",
+                f'    """Holds one {domain} record."""',
+                "",
+                "    def __init__(self, key: str, values: Dict[str, int]):",
+                "        self.key = key",
+                "        self.values = values",
+            ]
+            for _ in range(rng.randint(1, 4)):
+                verb = rng.choice(_VERBS)
+                out += [
+                    "",
+                    f"    def {verb}_{domain}(self, limit: int = 10) -> List[int]:",
+                    f'        """{verb.title()}s up to ``limit`` values."""',
+                    "        result = []",
+                    "        for name, value in sorted(self.values.items()):",
+                    "            if len(result) >= limit:",
+                    "                break",
+                    "            result.append(value * 2)",
+                    "        return result",
+                ]
+        else:
+            verb = rng.choice(_VERBS)
+            out += [
+                "",
+                "",
+                f"def {verb}_{domain}_{index}(items: List[str]) -> Optional[str]:",
+                f'    """{verb.title()}s {domain} items, returning the first match."""',
+                "    for item in items:",
+                f"        if item.startswith({domain!r}):",
+                f'            logging.getLogger(__name__).debug("{verb} %s", item)',
+                "            return item",
+                "    return None",
+            ]
+    return "\n".join(out).rstrip() + "\n"
+
+
+def synthetic_files(
+    count: int, lines: int, seed: int = 0, package: str = "synthetic"
+) -> List[Tuple[str, str]]:
+    """(relative path, source) pairs spread over a few packages."""
+    rng = random.Random(seed)
+    return [
+        (
+            f"{package}/{rng.choice(_DOMAINS)}_{i % 16}/module_{i}.py",
+            synthetic_source(lines, seed + i),
+        )
+        for i in range(count)
+    ]
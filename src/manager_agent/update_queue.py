@@ -0,0 +1,271 @@
+import asyncio
+import inspect
+import logging
+from collections import OrderedDict
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel, Field
+
+from .context_manager import (
+    ContextManager,
+    ContextVersion,
+    ProjectContext,
+    new_update_id,
+    update_targets,
+)
+from .enums import StatusEnum
+from .models import UpdateManagerContextRequest, UpdateManagerContextResponse
+from .project_registry import ProjectRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ContextChange(NamedTuple):
+    """One applied batch of updates, as passed to UpdateQueue listeners."""
+
+    project_id: str
+    previous: ContextVersion
+    current: ContextVersion
+    update_ids: List[str]  # Applied updates, in order (superseded ones excluded)
+    changed_fields: FrozenSet[str]  # ProjectContext fields that were replaced
+
+
+ContextListener = Callable[[ContextChange], Optional[Awaitable[None]]]
+
+
+class UpdateQueueStats(BaseModel):
+    """Point-in-time counters of an UpdateQueue."""
+
+    submitted: int = Field(0, description="Updates accepted.")
+    coalesced: int = Field(0, description="Updates superseded by a later one.")
+    batches: int = Field(0, description="Batches applied (one version each).")
+    applied: int = Field(0, description="Updates applied, superseded included.")
+    failed: int = Field(0, description="Updates whose batch failed to apply.")
+    pending: int = Field(0, description="Updates waiting to be applied.")
+
+
+class _PendingUpdate:
+    __slots__ = ("update_id", "update", "targets", "absorbed")
+
+    def __init__(self, update_id: str, update: UpdateManagerContextRequest):
+        self.update_id = update_id
+        self.update = update
+        self.targets = update_targets(update)
+        # Ids of earlier updates this one superseded.
+        self.absorbed: List[str] = []
+
+
+def changed_fields(previous: ProjectContext, current: ProjectContext) -> FrozenSet[str]:
+    """
+    Names of the fields that differ between two versions. apply_update()
+    shares untouched values, so this is an identity check per field.
+    """
+    return frozenset(
+        name
+        for name in type(current).model_fields
+        if getattr(previous, name) is not getattr(current, name)
+    )
+
+
+class UpdateQueue:
+    """
+    Write-behind queue for update_manager_context.
+    submit() returns at once with UPDATE_QUEUED; a worker per project then
+    applies queued updates in batches of up to ``max_batch_size``, each as a
+    single context version (and a single log write and fsync when the
+    ContextManager is persistent). A queued update that overwrites
+    everything an earlier queued update would write (the same file
+    annotations, standard id, requirement id or dependency) supersedes it:
+    only the later one is applied, and both complete together.
+    After each batch, listeners are called with a ContextChange so derived
+    structures (indexes, caches) can be refreshed for what changed; the
+    updates then reach CONTEXT_UPDATED, observable through status() and
+    wait().
+    Updates go through a ProjectRegistry instead when one is given, so
+    resident projects and their derived structures stay current.
+    """
+
+    def __init__(
+        self,
+        context_manager: Union[ContextManager, ProjectRegistry],
+        max_batch_size: int = 256,
+        batch_delay: float = 0.01,
+        max_tracked: int = 10000,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.context_manager = context_manager
+        self.max_batch_size = max_batch_size
+        # Time a worker waits before taking a batch, so bursts group up.
+        self.batch_delay = batch_delay
+        # Number of finished update statuses kept for status() and wait().
+        self.max_tracked = max_tracked
+        self._listeners: List[ContextListener] = []
+        self._pending: Dict[str, "OrderedDict[str, _PendingUpdate]"] = {}
+        self._by_target: Dict[str, Dict[Tuple[str, str], _PendingUpdate]] = {}
+        self._workers: Dict[str, "asyncio.Future[None]"] = {}
+        self._queued: Dict[str, UpdateManagerContextResponse] = {}
+        self._finished: "OrderedDict[str, UpdateManagerContextResponse]" = OrderedDict()
+        self._waiters: Dict[str, "asyncio.Future[UpdateManagerContextResponse]"] = {}
+        self._stats = UpdateQueueStats()
+
+    def add_listener(self, listener: ContextListener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ContextListener) -> None:
+        self._listeners.remove(listener)
+
+    def submit(
+        self, project_id: str, update: UpdateManagerContextRequest
+    ) -> UpdateManagerContextResponse:
+        """Queues an update and acknowledges it without waiting."""
+        item = _PendingUpdate(new_update_id(), update)
+        pending = self._pending.setdefault(project_id, OrderedDict())
+        by_target = self._by_target.setdefault(project_id, {})
+        if item.targets:
+            earlier = {
+                id(by_target[target]): by_target[target]
+                for target in item.targets
+                if target in by_target
+            }
+            for superseded in earlier.values():
+                if superseded.targets <= item.targets:
+                    del pending[superseded.update_id]
+                    item.absorbed.extend(superseded.absorbed)
+                    item.absorbed.append(superseded.update_id)
+                    self._stats.coalesced += 1
+            for target in item.targets:
+                by_target[target] = item
+        pending[item.update_id] = item
+
+        response = UpdateManagerContextResponse(
+            update_id=item.update_id,
+            status=StatusEnum.UPDATE_QUEUED,
+            message="Update queued.",
+        )
+        self._queued[item.update_id] = response
+        self._stats.submitted += 1
+        if project_id not in self._workers:
+            self._workers[project_id] = asyncio.ensure_future(self._drain(project_id))
+        return response
+
+    def status(self, update_id: str) -> Optional[UpdateManagerContextResponse]:
+        """Current status of an update, or None if it is unknown."""
+        return self._queued.get(update_id) or self._finished.get(update_id)
+
+    async def wait(
+        self, update_id: str, timeout: Optional[float] = None
+    ) -> UpdateManagerContextResponse:
+        """Waits until an update is applied (or failed) and returns its status."""
+        finished = self._finished.get(update_id)
+        if finished is not None:
+            return finished
+        if update_id not in self._queued:
+            raise KeyError(f"Unknown update id {update_id!r}")
+        waiter = self._waiters.get(update_id)
+        if waiter is None:
+            waiter = self._waiters[update_id] = (
+                asyncio.get_running_loop().create_future()
+            )
+        return await asyncio.wait_for(asyncio.shield(waiter), timeout)
+
+    async def flush(self, project_id: Optional[str] = None) -> None:
+        """Waits until every update queued so far has been applied."""
+        while True:
+            if project_id is None:
+                workers = list(self._workers.values())
+            else:
+                worker = self._workers.get(project_id)
+                workers = [worker] if worker is not None else []
+            if not workers:
+                return
+            await asyncio.gather(*(asyncio.shield(worker) for worker in workers))
+
+    async def close(self) -> None:
+        await self.flush()
+
+    def stats(self) -> UpdateQueueStats:
+        return self._stats.model_copy(
+            update={"pending": sum(len(pending) for pending in self._pending.values())}
+        )
+
+    async def _drain(self, project_id: str) -> None:
+        pending = self._pending[project_id]
+        by_target = self._by_target[project_id]
+        try:
+            while pending:
+                if self.batch_delay:
+                    await asyncio.sleep(self.batch_delay)
+                batch: List[_PendingUpdate] = []
+                while pending and len(batch) < self.max_batch_size:
+                    batch.append(pending.popitem(last=False)[1])
+                for item in batch:
+                    for target in item.targets:
+                        if by_target.get(target) is item:
+                            del by_target[target]
+                await self._apply(project_id, batch)
+        finally:
+            del self._workers[project_id]
+
+    async def _apply(self, project_id: str, batch: List[_PendingUpdate]) -> None:
+        count = sum(1 + len(item.absorbed) for item in batch)
+        try:
+            previous, current = await self.context_manager.apply_updates(
+                project_id, [(item.update_id, item.update) for item in batch]
+            )
+        except Exception as exc:
+            logger.exception("Applying %d context updates failed", len(batch))
+            self._stats.failed += count
+            for item in batch:
+                for update_id in [*item.absorbed, item.update_id]:
+                    self._finish(update_id, StatusEnum.ERROR, f"Update failed: {exc}")
+            return
+
+        self._stats.batches += 1
+        self._stats.applied += count
+        change = ContextChange(
+            project_id,
+            previous,
+            current,
+            [item.update_id for item in batch],
+            changed_fields(previous.context, current.context),
+        )
+        for listener in list(self._listeners):
+            try:
+                result = listener(change)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Context change listener failed")
+
+        for item in batch:
+            message = f"Applied in context version {current.version}."
+            self._finish(item.update_id, StatusEnum.CONTEXT_UPDATED, message)
+            for update_id in item.absorbed:
+                self._finish(
+                    update_id,
+                    StatusEnum.CONTEXT_UPDATED,
+                    f"Superseded by {item.update_id}. {message}",
+                )
+
+    def _finish(self, update_id: str, status: StatusEnum, message: str) -> None:
+        self._queued.pop(update_id, None)
+        response = UpdateManagerContextResponse(
+            update_id=update_id, status=status, message=message
+        )
+        self._finished[update_id] = response
+        while len(self._finished) > self.max_tracked:
+            self._finished.popitem(last=False)
+        waiter = self._waiters.pop(update_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(response)
@@ -0,0 +1,205 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from .models import ValidateCodeResponse
+
+
+class ValidationCacheStats(BaseModel):
+    """Point-in-time counters of a ValidationCache, used to size it."""
+
+    hits: int = Field(0, description="Lookups answered from the cache.")
+    misses: int = Field(0, description="Lookups that had to call the model.")
+    evictions: int = Field(0, description="Entries dropped because the cache was full.")
+    expirations: int = Field(0, description="Entries dropped because of TTL.")
+    invalidations: int = Field(
+        0, description="Entries dropped because their project context changed."
+    )
+    size: int = Field(0, description="Number of entries currently cached.")
+    max_entries: int = Field(..., description="Configured entry limit.")
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _CacheEntry:
+    __slots__ = ("response", "file_path", "project_name", "fingerprint", "expires_at")
+
+    def __init__(
+        self,
+        response: ValidateCodeResponse,
+        file_path: str,
+        project_name: str,
+        fingerprint: str,
+        expires_at: Optional[float],
+    ):
+        self.response = response
+        self.file_path = file_path
+        self.project_name = project_name
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+
+
+class ValidationCache:
+    """
+    Content-addressed LRU cache of ValidateCodeResponse objects.
+    Entries are keyed on a hash of the code, file path, developer intent and
+    the fingerprint of the ProjectContext they were validated against, so a
+    lookup never returns an entry of another context version. When a
+    project's context version moves forward (see observe_context), entries
+    of the versions it replaces are dropped at once, and responses computed
+    late against them are not stored; other stale entries age out by LRU
+    and TTL.
+    Cached responses are shared between callers and must not be mutated.
+    A cache with ``max_entries=0`` never stores anything.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_retired: int = 1024,
+    ):
+        if max_entries < 0:
+            raise ValueError("max_entries must be >= 0")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_retired = max_retired
+        self._clock = clock
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._keys_by_fingerprint: Dict[str, Set[str]] = {}
+        # Latest (version, fingerprint) observed per project.
+        self._project_versions: Dict[str, Tuple[int, str]] = {}
+        # Fingerprints of replaced versions, oldest first.
+        self._retired: "OrderedDict[str, None]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(
+        code_content: str,
+        file_path: str,
+        developer_intent: Optional[str],
+        context_fingerprint: str,
+    ) -> str:
+        """Builds the content-addressed key for a validation request."""
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (file_path, developer_intent or "", context_fingerprint):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(code_content.encode("utf-8"))
+        return digest.hexdigest()
+
+    def observe_context(
+        self, project_name: str, context_fingerprint: str, version: int
+    ) -> None:
+        """
+        Records that a project's context is at ``version``. If that is newer
+        than the last version observed, the entries of the older version are
+        dropped and later put() calls for its fingerprint are ignored.
+        Observing an older version does nothing, so requests still holding
+        a previous version cannot evict the entries of the current one.
+        """
+        previous = self._project_versions.get(project_name)
+        if previous is not None and previous[0] >= version:
+            return
+        self._project_versions[project_name] = (version, context_fingerprint)
+        self._retired.pop(context_fingerprint, None)
+        if previous is None or previous[1] == context_fingerprint:
+            return
+        self._invalidations += self.invalidate_fingerprint(previous[1])
+        self._retired[previous[1]] = None
+        while len(self._retired) > self.max_retired:
+            self._retired.popitem(last=False)
+
+    def get(self, key: str) -> Optional[ValidateCodeResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        if entry.expires_at is not None and entry.expires_at <= self._clock():
+            self._remove(key)
+            self._expirations += 1
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry.response
+
+    def put(
+        self,
+        key: str,
+        response: ValidateCodeResponse,
+        file_path: str,
+        project_name: str,
+        context_fingerprint: str,
+    ) -> None:
+        if self.max_entries == 0 or context_fingerprint in self._retired:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = (
+            self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        )
+        self._entries[key] = _CacheEntry(
+            response, file_path, project_name, context_fingerprint, expires_at
+        )
+        self._keys_by_fingerprint.setdefault(context_fingerprint, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._evictions += 1
+
+    def invalidate_fingerprint(self, context_fingerprint: str) -> int:
+        """Drops every entry computed against the given context fingerprint."""
+        keys = self._keys_by_fingerprint.pop(context_fingerprint, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        return len(keys)
+
+    def invalidate_file(self, file_path: str) -> int:
+        """Drops every entry validated for the given file path."""
+        stale = [
+            key for key, entry in self._entries.items() if entry.file_path == file_path
+        ]
+        for key in stale:
+            self._remove(key)
+        self._invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_fingerprint.clear()
+        self._project_versions.clear()
+        self._retired.clear()
+
+    def stats(self) -> ValidationCacheStats:
+        return ValidationCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            invalidations=self._invalidations,
+            size=len(self._entries),
+            max_entries=self.max_entries,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        keys = self._keys_by_fingerprint.get(entry.fingerprint)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_fingerprint[entry.fingerprint]
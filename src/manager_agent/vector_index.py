@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+_WORD_RE = re.compile(r"[A-Za-z][a-z0-9]*|[A-Z]+(?![a-z])|\d+")
+
+_MATRIX_FILE = "vectors.npy"
+_METADATA_FILE = "index.json"
+
+
+@lru_cache(maxsize=65536)
+def _feature_slot(feature: str, dimensions: int) -> Tuple[int, float]:
+    digest = int.from_bytes(
+        hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+    return digest % dimensions, 1.0 if digest >> 63 else -1.0
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline text embedding built from hashed features: every
+    word and every character n-gram of every word is hashed to a signed slot
+    of a fixed-size vector, which is then L2-normalized. Texts sharing word
+    stems ("refund", "refunds", "refunding") land close together, which lets
+    paraphrased questions match without a model or network access.
+    """
+
+    def __init__(
+        self,
+        dimensions: int = 512,
+        min_n: int = 3,
+        max_n: int = 5,
+        word_weight: float = 2.0,
+    ):
+        if dimensions < 1:
+            raise ValueError("dimensions must be >= 1")
+        if not 1 <= min_n <= max_n:
+            raise ValueError("n-gram sizes must satisfy 1 <= min_n <= max_n")
+        self.dimensions = dimensions
+        self.min_n = min_n
+        self.max_n = max_n
+        self.word_weight = word_weight
+
+    @property
+    def signature(self) -> Dict[str, float]:
+        """Parameters that determine the embedding; stored with saved indexes."""
+        return {
+            "dimensions": self.dimensions,
+            "min_n": self.min_n,
+            "max_n": self.max_n,
+            "word_weight": self.word_weight,
+        }
+
+    def _features(self, text: str) -> Iterable[Tuple[str, float]]:
+        for word in (match.lower() for match in _WORD_RE.findall(text)):
+            yield "w:" + word, self.word_weight
+            padded = f"<{word}>"
+            for n in range(self.min_n, min(self.max_n, len(padded)) + 1):
+                for start in range(len(padded) - n + 1):
+                    yield padded[start : start + n], 1.0
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeds texts into the rows of a (len(texts), dimensions) matrix."""
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                column, sign = _feature_slot(feature, self.dimensions)
+                rows.append(row)
+                columns.append(column)
+                values.append(sign * weight)
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (rows, columns), values)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+
+class VectorHit(NamedTuple):
+    key: str
+    score: float  # Cosine similarity to the query
+
+
+def _text_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class VectorIndex:
+    """
+    In-process embedding index. All vectors live in one contiguous float32
+    matrix, one row per slot; a key-to-slot map makes updates incremental
+    (changing one entry re-embeds and rewrites one row, removing one frees
+    its row for reuse), and unchanged texts are never re-embedded.
+    Top-k queries score every row with a single matrix product.
+    Indexes can be saved to a directory and loaded back memory-mapped.
+    """
+
+    def __init__(
+        self, embedder: Optional[HashingEmbedder] = None, initial_capacity: int = 64
+    ):
+        self.embedder = embedder or HashingEmbedder()
+        capacity = max(1, initial_capacity)
+        self._matrix = np.zeros((capacity, self.embedder.dimensions), dtype=np.float32)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._keys: List[Optional[str]] = [None] * capacity
+        self._slots: Dict[str, int] = {}
+        self._digests: Dict[str, str] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        # Number of texts embedded so far, to check that updates stay incremental.
+        self.embedded = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slots
+
+    @property
+    def capacity(self) -> int:
+        return len(self._keys)
+
+    def keys(self) -> List[str]:
+        return list(self._slots)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        new_capacity = max(capacity * 2, capacity + needed)
+        matrix = np.zeros((new_capacity, self._matrix.shape[1]), dtype=np.float32)
+        matrix[:capacity] = self._matrix
+        active = np.zeros(new_capacity, dtype=bool)
+        active[:capacity] = self._active
+        self._matrix = matrix
+        self._active = active
+        self._keys.extend([None] * (new_capacity - capacity))
+        self._free.extend(range(new_capacity - 1, capacity - 1, -1))
+
+    def upsert_many(self, items: Iterable[Tuple[str, str]]) -> int:
+        """
+        Inserts or replaces (key, text) pairs, embedding only texts that
+        changed. Returns the number of rows written.
+        """
+        changed: Dict[str, str] = {}
+        for key, text in items:
+            digest = _text_digest(text)
+            if self._digests.get(key) != digest:
+                changed[key] = text
+                self._digests[key] = digest
+        if not changed:
+            return 0
+        new_keys = [key for key in changed if key not in self._slots]
+        if len(new_keys) > len(self._free):
+            self._grow(len(new_keys) - len(self._free))
+        for key in new_keys:
+            slot = self._free.pop()
+            self._slots[key] = slot
+            self._keys[slot] = key
+        slots = [self._slots[key] for key in changed]
+        self._matrix[slots] = self.embedder.embed_many(list(changed.values()))
+        self._active[slots] = True
+        self.embedded += len(changed)
+        return len(changed)
+
+    def upsert(self, key: str, text: str) -> bool:
+        """Inserts or replaces one entry. Returns False if it was unchanged."""
+        return self.upsert_many([(key, text)]) == 1
+
+    def remove(self, key: str) -> bool:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        del self._digests[key]
+        self._matrix[slot] = 0.0
+        self._active[slot] = False
+        self._keys[slot] = None
+        self._free.append(slot)
+        return True
+
+    def sync(
+        self, documents: Dict[str, str], prefixes: Optional[Tuple[str, ...]] = None
+    ) -> int:
+        """
+        Makes the index hold exactly ``documents`` (key to text), touching
+        only entries that were added, changed or removed. With ``prefixes``,
+        only the keys starting with one of them are synced and other entries
+        are left alone. Returns the number of rows written or freed.
+        """
+        removed = [
+            key
+            for key in self._slots
+            if key not in documents and (prefixes is None or key.startswith(prefixes))
+        ]
+        for key in removed:
+            self.remove(key)
+        return len(removed) + self.upsert_many(documents.items())
+
+    def search_many(
+        self, queries: Sequence[str], k: int = 5, min_score: Optional[float] = None
+    ) -> List[List[VectorHit]]:
+        """Returns the top-k hits of each query, best first."""
+        if not queries:
+            return []
+        k = min(k, len(self._slots))
+        if k <= 0:
+            return [[] for _ in queries]
+        scores = self.embedder.embed_many(queries) @ self._matrix.T
+        scores[:, ~self._active] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results: List[List[VectorHit]] = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates], kind="stable")]
+            results.append(
+                [
+                    VectorHit(self._keys[slot], float(scores[row, slot]))
+                    for slot in ordered
+                    if min_score is None or scores[row, slot] >= min_score
+                ]
+            )
+        return results
+
+    def search(
+        self, query: str, k: int = 5, min_score: Optional[float] = None
+    ) -> List[VectorHit]:
+        return self.search_many([query], k, min_score)[0]
+
+    def save(self, directory: str) -> None:
+        """Writes the index to ``directory`` (created if missing)."""
+        os.makedirs(directory, exist_ok=True)
+        matrix_path = os.path.join(directory, _MATRIX_FILE)
+        metadata_path = os.path.join(directory, _METADATA_FILE)
+        with open(matrix_path + ".tmp", "wb") as matrix_file:
+            np.save(matrix_file, self._matrix)
+        with open(metadata_path + ".tmp", "w", encoding="utf-8") as metadata_file:
+            json.dump(
+                {
+                    "embedder": self.embedder.signature,
+                    "keys": self._keys,
+                    "digests": self._digests,
+                },
+                metadata_file,
+            )
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(metadata_path + ".tmp", metadata_path)
+
+    @classmethod
+    def load(
+        cls,
+        directory: str,
+        embedder: Optional[HashingEmbedder] = None,
+        mmap: bool = True,
+    ) -> "VectorIndex":
+        """
+        Loads an index written by save(). With ``mmap``, the matrix is mapped
+        copy-on-write: rows are paged in on demand and updates never touch
+        the file.
+        """
+        with open(os.path.join(directory, _METADATA_FILE), encoding="utf-8") as f:
+            metadata = json.load(f)
+        embedder = embedder or HashingEmbedder(**metadata["embedder"])
+        if embedder.signature != metadata["embedder"]:
+            raise ValueError(
+                "Saved index was built with a different embedder: "
+                f"{metadata['embedder']}"
+            )
+        matrix = np.load(
+            os.path.join(directory, _MATRIX_FILE), mmap_mode="c" if mmap else None
+        )
+        keys: List[Optional[str]] = metadata["keys"]
+        if matrix.shape != (len(keys), embedder.dimensions):
+            raise ValueError(f"Corrupt vector index in {directory}")
+
+        index = cls(embedder, initial_capacity=1)
+        index._matrix = matrix
+        index._keys = keys
+        index._slots = {key: slot for slot, key in enumerate(keys) if key is not None}
+        index._active = np.array([key is not None for key in keys], dtype=bool)
+        index._free = [
+            slot for slot in range(len(keys) - 1, -1, -1) if keys[slot] is None
+        ]
+        index._digests = metadata["digests"]
+        return index
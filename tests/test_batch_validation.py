@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from manager_agent.context_manager import ProjectContext
+from manager_agent.enums import StatusEnum
+from manager_agent.llm_backends import LLMBackend, LLMBackendError, LLMCompletion
+from manager_agent.llm_interface import LLMInterface
+from manager_agent.models import BatchValidateCodeRequest, ValidateCodeRequest
+
+VALID = json.dumps({"validation_id": "v", "status": "valid", "feedback_items": []})
+
+
+class RecordingBackend(LLMBackend):
+    """Answers every file as valid, slowly for ``slow.py``, failing ``bad.py``."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def complete(self, capability: str, prompt: str) -> LLMCompletion:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.2 if "slow.py" in prompt else 0.01)
+            if "bad.py" in prompt:
+                raise LLMBackendError("model rejected the request")
+            return LLMCompletion(text=VALID)
+        finally:
+            self.active -= 1
+
+
+def batch(*paths: str, max_concurrency=None) -> BatchValidateCodeRequest:
+    return BatchValidateCodeRequest(
+        files=[
+            ValidateCodeRequest(code_content=f"value = {i}\n", file_path=path)
+            for i, path in enumerate(paths)
+        ],
+        max_concurrency=max_concurrency,
+    )
+
+
+@pytest.fixture
+def context() -> ProjectContext:
+    return ProjectContext(project_name="demo")
+
+
+@pytest.mark.asyncio
+async def test_results_stream_in_completion_order(context):
+    llm = LLMInterface(backend=RecordingBackend())
+    request = batch("slow.py", "a.py", "b.py")
+
+    indexes = [
+        result.index async for result in llm.stream_batch_validation(request, context)
+    ]
+
+    assert sorted(indexes) == [0, 1, 2]
+    assert indexes[-1] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(context):
+    backend = RecordingBackend()
+    llm = LLMInterface(backend=backend, batch_concurrency=8)
+    request = batch(*(f"f{i}.py" for i in range(12)), max_concurrency=3)
+
+    response = await llm.validate_batch(request, context)
+
+    assert [result.index for result in response.results] == list(range(12))
+    assert backend.max_active == 3
+
+
+@pytest.mark.asyncio
+async def test_failing_file_does_not_fail_the_batch(context):
+    llm = LLMInterface(backend=RecordingBackend())
+
+    response = await llm.validate_batch(batch("a.py", "bad.py", "b.py"), context)
+
+    statuses = [result.response.status for result in response.results]
+    assert statuses == [StatusEnum.VALID, StatusEnum.ERROR, StatusEnum.VALID]
+    assert response.status == StatusEnum.ERROR
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_cancels_remaining_work(context):
+    backend = RecordingBackend()
+    llm = LLMInterface(backend=backend)
+    stream = llm.stream_batch_validation(batch("a.py", "slow.py"), context)
+
+    first = await stream.__anext__()
+    await stream.aclose()
+
+    assert first.file_path == "a.py"
+    assert backend.active == 0
+
+
+@pytest.mark.parametrize("max_concurrency", [0, -1])
+def test_non_positive_concurrency_is_rejected(max_concurrency):
+    with pytest.raises(ValidationError):
+        batch("a.py", max_concurrency=max_concurrency)
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from manager_agent.context_manager import ProjectContext
+from manager_agent.context_store import ContextStore
+from manager_agent.enums import UpdateTypeEnum
+from manager_agent.models import UpdateManagerContextRequest
+
+
+def annotation(path: str, note: str) -> UpdateManagerContextRequest:
+    return UpdateManagerContextRequest(
+        update_type=UpdateTypeEnum.FILE_ANNOTATION,
+        summary=note,
+        details_uri_or_text=note,
+        relevant_file_paths=[path],
+    )
+
+
+@pytest.fixture
+def initial_context() -> ProjectContext:
+    return ProjectContext(project_name="demo", project_goals=["Ship it"])
+
+
+async def fill(store: ContextStore, count: int) -> None:
+    for i in range(count):
+        await store.append(annotation(f"src/f{i}.py", f"note {i}"), f"update-{i}")
+
+
+@pytest.mark.asyncio
+async def test_replay_restores_latest_version(tmp_path, initial_context):
+    async with ContextStore(str(tmp_path), initial_context, fsync=False) as store:
+        await fill(store, 5)
+        expected = store.current
+
+    async with ContextStore(str(tmp_path), initial_context, fsync=False) as store:
+        assert store.current.version == 5
+        assert store.current.context == expected.context
+        assert store.stats().replayed_entries == 5
+
+
+@pytest.mark.asyncio
+async def test_torn_last_line_is_dropped(tmp_path, initial_context):
+    async with ContextStore(str(tmp_path), initial_context, fsync=False) as store:
+        await fill(store, 3)
+        log_path = store.log_path
+    with open(log_path, "ab") as log_file:
+        log_file.write(b'{"version":4,"upd')
+
+    async with ContextStore(str(tmp_path), initial_context, fsync=False) as store:
+        assert store.current.version == 3
+        await store.append(annotation("src/new.py", "after the tear"), "update-new")
+
+    async with ContextStore(str(tmp_path), initial_context, fsync=False) as store:
+        assert store.current.version == 4
+        assert "src/new.py" in store.current.context.file_annotations
+
+
+@pytest.mark.asyncio
+async def test_corruption_before_later_records_raises(tmp_path, initial_context):
+    async with ContextStore(str(tmp_path), initial_context, fsync=False) as store:
+        await fill(store, 3)
+        log_path = store.log_path
+    with open(log_path, "rb") as log_file:
+        lines = log_file.readlines()
+    lines[1] = b"not json\n"
+    with open(log_path, "wb") as log_file:
+        log_file.writelines(lines)
+
+    with pytest.raises(ValueError, match=f"byte {len(lines[0])} "):
+        await ContextStore(str(tmp_path), initial_context, fsync=False).open()
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        [1, 2],
+        {"version": 1},
+        {"version": "1", "updates": []},
+        {"version": 1, "updates": [{"update_id": "update-0"}]},
+        {"version": 1, "updates": ["update-0"]},
+    ],
+)
+@pytest.mark.asyncio
+async def test_malformed_record_raises_value_error(tmp_path, initial_context, record):
+    async with ContextStore(str(tmp_path), initial_context, fsync=False) as store:
+        log_path = store.log_path
+    with open(log_path, "wb") as log_file:
+        log_file.write(json.dumps(record).encode("utf-8") + b"\n")
+
+    with pytest.raises(ValueError, match="byte 0 "):
+        await ContextStore(str(tmp_path), initial_context, fsync=False).open()
+
+
+@pytest.mark.asyncio
+async def test_compaction_writes_snapshot_and_keeps_tail(tmp_path, initial_context):
+    async with ContextStore(
+        str(tmp_path), initial_context, snapshot_every=4, fsync=False
+    ) as store:
+        await fill(store, 10)
+        await store.compact()
+        await fill(store, 2)
+        expected = store.current
+        stats = store.stats()
+        assert stats.snapshot_version == 10
+        assert stats.log_entries == 2
+
+    async with ContextStore(str(tmp_path), initial_context, fsync=False) as store:
+        assert store.current == expected
+        assert store.stats().replayed_entries == 2
@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+import pytest
+
+from manager_agent.file_watcher import InotifyWatcher
+
+pytestmark = pytest.mark.skipif(
+    not InotifyWatcher.available(), reason="inotify is not available"
+)
+
+
+def write(root, relative: str) -> None:
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as source_file:
+        source_file.write("value = 1\n")
+
+
+@pytest.mark.asyncio
+async def test_files_in_new_directories_are_reported(tmp_path):
+    watcher = await InotifyWatcher(str(tmp_path), debounce=0.1).start()
+    try:
+        expected = set()
+        for i in range(10):
+            for relative in (f"pkg/d{i}/a.py", f"pkg/d{i}/sub/b.py"):
+                write(tmp_path, relative)
+                expected.add(relative)
+
+        seen = set()
+        while not expected <= seen:
+            batch = await asyncio.wait_for(watcher.next_batch(), timeout=5)
+            seen |= batch.changed
+        assert watcher.stats().watched_directories == 1 + 1 + 2 * 10
+
+        write(tmp_path, "pkg/d3/sub/late.py")
+        batch = await asyncio.wait_for(watcher.next_batch(), timeout=5)
+        assert "pkg/d3/sub/late.py" in batch.changed
+    finally:
+        await watcher.close()
+    assert await watcher.next_batch() is None
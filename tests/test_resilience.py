@@ -0,0 +1,105 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from manager_agent.context_manager import ProjectContext
+from manager_agent.llm_backends import (
+    LLMBackend,
+    LLMBackendError,
+    LLMCompletion,
+    TransientLLMBackendError,
+)
+from manager_agent.llm_interface import LLMInterface
+from manager_agent.resilience import (
+    HedgingPolicy,
+    LatencyTracker,
+    LLMDeadlineExceeded,
+    RetryPolicy,
+    call_with_retries,
+    deadline_scope,
+    remaining_time,
+    run_within_deadline,
+)
+
+ADVICE = json.dumps({"advice_id": "advice-1", "response_text": "Use the cache."})
+
+
+class SlowBackend(LLMBackend):
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def complete(self, capability: str, prompt: str) -> LLMCompletion:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return LLMCompletion(text=ADVICE)
+
+
+async def retry(call, max_attempts=3):
+    return await call_with_retries(
+        call,
+        "get_project_advice",
+        RetryPolicy(max_attempts=max_attempts, base_delay=0.01),
+        HedgingPolicy(),
+        LatencyTracker(),
+        random.Random(0),
+    )
+
+
+def test_deadline_scope_only_tightens():
+    assert remaining_time() is None
+    with deadline_scope(0.5):
+        with deadline_scope(10.0):
+            assert remaining_time() <= 0.5
+        with deadline_scope(None):
+            assert remaining_time() <= 0.5
+    assert remaining_time() is None
+
+
+@pytest.mark.asyncio
+async def test_run_within_deadline_cancels_the_call():
+    with deadline_scope(0.05):
+        with pytest.raises(LLMDeadlineExceeded):
+            await run_within_deadline(asyncio.sleep(1), "sleep")
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise TransientLLMBackendError("try again")
+        return "ok"
+
+    assert await retry(flaky) == "ok"
+    assert attempts == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded():
+    async def failing():
+        raise TransientLLMBackendError("down")
+
+    with pytest.raises(LLMBackendError, match="after 2 attempts"):
+        await retry(failing, max_attempts=2)
+
+
+@pytest.mark.asyncio
+async def test_coalesced_request_keeps_its_own_deadline():
+    backend = SlowBackend(latency=0.3)
+    llm = LLMInterface(backend=backend)
+    context = ProjectContext(project_name="demo")
+
+    short = asyncio.ensure_future(llm.generate_advice("q", context, deadline=0.1))
+    await asyncio.sleep(0)
+    long = asyncio.ensure_future(llm.generate_advice("q", context, deadline=5.0))
+    results = await asyncio.gather(short, long, return_exceptions=True)
+
+    assert isinstance(results[0], LLMDeadlineExceeded)
+    assert results[1].advice_id == "advice-1"
+    assert backend.calls == 1
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from manager_agent.single_flight import SingleFlight, normalize_text
+
+
+def test_normalize_text():
+    assert normalize_text("  How do I\n ADD  a route? ") == "how do i add a route?"
+    assert normalize_text(None) == ""
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_task():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return object()
+
+    waiters = [asyncio.ensure_future(flight.run("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flight.in_flight == 1
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert (flight.started, flight.coalesced, flight.in_flight) == (1, 4, 0)
+
+
+@pytest.mark.asyncio
+async def test_exception_is_shared_and_key_forgotten():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flight.run("key", fail), flight.run("key", fail), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert flight.started == 1
+
+    async def succeed():
+        return "ok"
+
+    assert await flight.run("key", succeed) == "ok"
+    assert flight.started == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_task():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.run("key", work))
+    second = asyncio.ensure_future(flight.run("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_shared_task_is_cancelled_with_its_last_waiter():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiters = [asyncio.ensure_future(flight.run("key", work)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    assert flight.in_flight == 0
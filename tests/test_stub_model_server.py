@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import pytest
+
+from manager_agent.stub_model_server import StubModelServer
+
+
+async def exchange(server: StubModelServer, request: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        return await asyncio.wait_for(reader.read(), timeout=2)
+    finally:
+        writer.close()
+
+
+@pytest.mark.parametrize(
+    "request_head",
+    [
+        b"POST /v1/complete HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+        b"POST /v1/complete HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+        b"GARBAGE\r\n\r\n",
+    ],
+)
+@pytest.mark.asyncio
+async def test_malformed_request_gets_400(request_head):
+    async with StubModelServer() as server:
+        response = await exchange(server, request_head)
+
+    assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+    assert b"Connection: close" in response
+
+
+@pytest.mark.asyncio
+async def test_completes_valid_request():
+    body = json.dumps({"capability": "validate_code", "prompt": "x = 1"}).encode()
+    async with StubModelServer() as server:
+        response = await exchange(
+            server,
+            b"POST /v1/complete HTTP/1.1\r\nConnection: close\r\n"
+            b"Content-Length: %d\r\n\r\n%s" % (len(body), body),
+        )
+
+    head, _, payload = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert json.loads(json.loads(payload)["text"])["validation_id"] == "stub-validation"
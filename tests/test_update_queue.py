@@ -0,0 +1,75 @@
+import pytest
+
+from manager_agent.context_manager import ContextManager, ProjectContext
+from manager_agent.enums import StatusEnum, UpdateTypeEnum
+from manager_agent.models import UpdateManagerContextRequest
+from manager_agent.update_queue import UpdateQueue
+
+
+def annotation(note: str, *paths: str) -> UpdateManagerContextRequest:
+    return UpdateManagerContextRequest(
+        update_type=UpdateTypeEnum.FILE_ANNOTATION,
+        summary=note,
+        details_uri_or_text=note,
+        relevant_file_paths=list(paths),
+    )
+
+
+@pytest.fixture
+def context_manager(tmp_path) -> ContextManager:
+    path = tmp_path / "context.json"
+    path.write_text(ProjectContext(project_name="demo").model_dump_json())
+    return ContextManager(initial_context_path=str(path))
+
+
+@pytest.mark.asyncio
+async def test_later_update_supersedes_queued_one(context_manager):
+    queue = UpdateQueue(context_manager)
+    changes = []
+    queue.add_listener(changes.append)
+
+    first = queue.submit("demo", annotation("first", "src/a.py"))
+    second = queue.submit("demo", annotation("second", "src/a.py"))
+    last = queue.submit("demo", annotation("last", "src/a.py"))
+    await queue.flush("demo")
+
+    context = await context_manager.get_context("demo")
+    assert context.file_annotations == {"src/a.py": "last"}
+    stats = queue.stats()
+    assert (stats.submitted, stats.coalesced, stats.batches) == (3, 2, 1)
+    assert [change.update_ids for change in changes] == [[last.update_id]]
+    assert changes[0].changed_fields == {"file_annotations"}
+    for response in (first, second):
+        status = await queue.wait(response.update_id)
+        assert status.status == StatusEnum.CONTEXT_UPDATED
+        assert status.message.startswith(f"Superseded by {last.update_id}.")
+
+
+@pytest.mark.asyncio
+async def test_partial_overlap_is_not_coalesced(context_manager):
+    queue = UpdateQueue(context_manager)
+
+    queue.submit("demo", annotation("both", "src/a.py", "src/b.py"))
+    queue.submit("demo", annotation("only a", "src/a.py"))
+    await queue.flush("demo")
+
+    context = await context_manager.get_context("demo")
+    assert context.file_annotations == {"src/a.py": "only a", "src/b.py": "both"}
+    assert queue.stats().coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_batches_are_bounded(context_manager):
+    queue = UpdateQueue(context_manager, max_batch_size=4, batch_delay=0)
+
+    responses = [
+        queue.submit("demo", annotation(f"note {i}", f"src/f{i}.py")) for i in range(10)
+    ]
+    await queue.flush()
+
+    assert queue.stats().batches == 3
+    for response in responses:
+        status = await queue.wait(response.update_id)
+        assert status.status == StatusEnum.CONTEXT_UPDATED
+    context = await context_manager.get_context("demo")
+    assert len(context.file_annotations) == 10